@@ -56,10 +56,29 @@ def _write_if_changed(path: Path, content: str) -> None:
     path.write_text(content, encoding="utf-8")
 
 
+LINE_LENGTH = 88
+
+
 def _format_default(value: Any) -> str:
+    if isinstance(value, str) and '"' not in value:
+        # Double quotes, like the formatter writes them.
+        return f'"{repr(value)[1:-1]}"'
     return repr(value)
 
 
+def _format_signature(name: str, parameters: list[str], return_type: str) -> str:
+    """A stub method, wrapped the way ``ruff format`` wraps long signatures."""
+    line = f"    def {name}({', '.join(parameters)}) -> {return_type}: ..."
+    if len(line) <= LINE_LENGTH:
+        return line
+    closing = f"    ) -> {return_type}: ..."
+    joined = f"        {', '.join(parameters)}"
+    if len(joined) <= LINE_LENGTH:
+        return f"    def {name}(\n{joined}\n{closing}"
+    wrapped = "".join(f"        {parameter},\n" for parameter in parameters)
+    return f"    def {name}(\n{wrapped}{closing}"
+
+
 def _format_manual_method(name: str, func: Any, return_type: str) -> str:
     signature = inspect.signature(func)
     rendered = []
@@ -81,7 +100,7 @@ def _format_manual_method(name: str, func: Any, return_type: str) -> str:
             chunk = f"{chunk} = {_format_default(parameter.default)}"
         rendered.append(chunk)
 
-    return f"    def {name}({', '.join(rendered)}) -> {return_type}: ..."
+    return _format_signature(name, rendered, return_type)
 
 
 def _format_plugin_method(plugin: Any, return_type: str) -> str:
@@ -93,7 +112,11 @@ def _format_plugin_method(plugin: Any, return_type: str) -> str:
         if param in defaults:
             chunk = f"{chunk} = {_format_default(defaults[param])}"
         rendered.append(chunk)
-    return f"    def {plugin.name}({', '.join(rendered)}) -> {return_type}: ..."
+    deprecated = plugin.deprecated_params or {}
+    if deprecated:
+        rendered.append("*")
+        rendered.extend(f"{param}: Any = None" for param in deprecated)
+    return _format_signature(plugin.name, rendered, return_type)
 
 
 def _plugin_input_arg_names(plugin: Any) -> tuple[str, ...]:
@@ -214,7 +237,7 @@ def _render_texture_stub(runtime: dict[str, Any]) -> str:
     lines = [
         "from __future__ import annotations",
         "",
-        "from typing import Any, Iterator, Optional, TYPE_CHECKING",
+        "from typing import TYPE_CHECKING, Any, Iterator, Optional",
         "",
         "if TYPE_CHECKING:",
         "    from .color import ColorTexture",
@@ -238,7 +261,16 @@ def _render_texture_stub(runtime: dict[str, Any]) -> str:
                 "    label: Optional[str]",
                 "    should_cache: bool",
                 "    kind: str",
-                "    def render(self, ctx: Any, params: Optional[dict[str, Any]] = ..., cache: Any = ...) -> Any: ...",
+                _format_signature(
+                    "render",
+                    [
+                        "self",
+                        "ctx: Any",
+                        "params: Optional[dict[str, Any]] = ...",
+                        "cache: Any = ...",
+                    ],
+                    "Any",
+                ),
                 "    def __iter__(self) -> Iterator[Any]: ...",
             ],
         ).rstrip(),
@@ -258,10 +290,13 @@ def _render_color_stub(runtime: dict[str, Any]) -> str:
     lines = [
         "from __future__ import annotations",
         "",
-        "from typing import Any",
+        "from typing import TYPE_CHECKING, Any",
         "",
         "from .texture import PostNamespace, TextureNode",
         "",
+        "if TYPE_CHECKING:",
+        "    from .sdf import SDFTexture",
+        "",
         "class ColorSpaceMode:",
         "    LAB: str",
         "    RGB: str",
@@ -312,6 +347,7 @@ def _render_api_stub(runtime: dict[str, Any]) -> str:
 def _render_core_init_stub() -> str:
     return "\n".join(
         [
+            "from .cache import DiskCache, GreedyDualSizePolicy, LRUPolicy, RenderCache",
             "from .color import ColorSpaceMode, ColorTexture",
             "from .context import Context, decrease_tex_registry, show_texture",
             "from .expressions import Expr, cos, param, percent, percent_of_min, percent_x, percent_y, sin",
@@ -21,9 +21,7 @@ TITLE_TEXT_COLOR = "#f6f7f9"
 SUBTITLE_TEXT_COLOR = "#dde4ec"
 
 def _over(base, *layers):
-    for layer in layers:
-        base = base.alpha_overlay(layer)
-    return base
+    return color.stack((base, *layers))
 
 
 def github_banner_example(output="banner.png"):
@@ -2,6 +2,7 @@
 
 __docformat__ = "google"
 
+from .cache import DiskCache, GreedyDualSizePolicy, LRUPolicy, RenderCache
 from .color import ColorSpaceMode, ColorTexture
 from .context import Context, DispatchConfig, decrease_tex_registry, show_texture
 from .expressions import (
@@ -18,12 +19,16 @@ from .sdf import SDFTexture
 
 __all__ = [
     "Context",
+    "DiskCache",
     "DispatchConfig",
     "decrease_tex_registry",
     "show_texture",
     "ColorSpaceMode",
     "ColorTexture",
     "Expr",
+    "GreedyDualSizePolicy",
+    "LRUPolicy",
+    "RenderCache",
     "SDFTexture",
     "cos",
     "param",
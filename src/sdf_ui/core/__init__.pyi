@@ -1,3 +1,4 @@
+from .cache import DiskCache, GreedyDualSizePolicy, LRUPolicy, RenderCache
 from .color import ColorSpaceMode, ColorTexture
 from .context import Context, decrease_tex_registry, show_texture
 from .expressions import Expr, cos, param, percent, percent_of_min, percent_x, percent_y, sin
@@ -8,36 +8,80 @@ from .texture import MultiOutputResult
 
 class SDFNamespace:
     def annulus(self, center: Any, radius: Any, thickness: Any = 8.0) -> SDFTexture: ...
-    def arc(self, center: Any, radius: Any, start_angle: Any, end_angle: Any) -> SDFTexture: ...
+    def arc(
+        self, center: Any, radius: Any, start_angle: Any, end_angle: Any
+    ) -> SDFTexture: ...
     def bezier(self, a: Any, b: Any, c: Any) -> SDFTexture: ...
     def capsule(self, a: Any, b: Any, radius: Any) -> SDFTexture: ...
     def circle(self, center: Any, radius: Any) -> SDFTexture: ...
+    def circles(
+        self, centers: Any, radii: Any, k: Any = 0.0, max_distance: Any = None
+    ) -> SDFTexture: ...
     def convex_polygon(self, points: Any) -> SDFTexture: ...
     def diamond(self, center: Any, radii: Any) -> SDFTexture: ...
     def disc(self, center: Any, radius: Any) -> SDFTexture: ...
     def ellipse(self, center: Any, radii: Any) -> SDFTexture: ...
     def grid(self, offset: Any, size: Any, angle: Any = 0.0) -> SDFTexture: ...
     def half_plane(self, point: Any, normal: Any) -> SDFTexture: ...
+    def instances(
+        self, kind: Any, params: Any, k: Any = 0.0, max_distance: Any = None
+    ) -> SDFTexture: ...
     def line(self, a: Any, b: Any) -> SDFTexture: ...
-    def ngon(self, center: Any, radius: Any, sides: Any = 6, rotation: Any = 0.0) -> SDFTexture: ...
+    def ngon(
+        self, center: Any, radius: Any, sides: Any = 6, rotation: Any = 0.0
+    ) -> SDFTexture: ...
     def parallelogram(self, center: Any, size: Any, skew: Any = 0.0) -> SDFTexture: ...
-    def pie(self, center: Any, radius: Any, start_angle: Any, end_angle: Any) -> SDFTexture: ...
+    def pie(
+        self, center: Any, radius: Any, start_angle: Any, end_angle: Any
+    ) -> SDFTexture: ...
     def polygon(self, points: Any) -> SDFTexture: ...
-    def rect(self, center: Any, size: Any, corner_radius: Any = 0.0, angle: Any = 0.0) -> SDFTexture: ...
+    def rect(
+        self, center: Any, size: Any, corner_radius: Any = 0.0, angle: Any = 0.0
+    ) -> SDFTexture: ...
     def rhombus(self, center: Any, radii: Any) -> SDFTexture: ...
     def ring(self, center: Any, radius: Any, thickness: Any = 8.0) -> SDFTexture: ...
-    def rounded_rect(self, center: Any, size: Any, corner_radius: Any, angle: Any = 0.0) -> SDFTexture: ...
-    def sector(self, center: Any, radius: Any, start_angle: Any, end_angle: Any) -> SDFTexture: ...
+    def rounded_rect(
+        self, center: Any, size: Any, corner_radius: Any, angle: Any = 0.0
+    ) -> SDFTexture: ...
+    def sector(
+        self, center: Any, radius: Any, start_angle: Any, end_angle: Any
+    ) -> SDFTexture: ...
     def segment(self, a: Any, b: Any, radius: Any) -> SDFTexture: ...
-    def text(self, value: Any, size: Any = 64, ox: Any = 0, oy: Any = 0, path: Any = 'fonts/georgia_regular.ttf', samples: Any = 16, cache_size: Any = 128, line_height: Any = 1.2, oversample: Any = 2.0, min_render_size: Any = 64) -> SDFTexture: ...
+    def text(
+        self,
+        value: Any,
+        size: Any = 64,
+        ox: Any = 0,
+        oy: Any = 0,
+        path: Any = "fonts/georgia_regular.ttf",
+        tolerance: Any = 0.1,
+        cache_size: Any = 128,
+        line_height: Any = 1.2,
+        oversample: Any = 2.0,
+        min_render_size: Any = 64,
+        band: Any = 64.0,
+        msdf: Any = False,
+        *,
+        samples: Any = None,
+    ) -> SDFTexture: ...
     def triangle(self, point_1: Any, point_2: Any, point_3: Any) -> SDFTexture: ...
-    def wedge(self, center: Any, radius: Any, start_angle: Any, end_angle: Any) -> SDFTexture: ...
+    def wedge(
+        self, center: Any, radius: Any, start_angle: Any, end_angle: Any
+    ) -> SDFTexture: ...
 
 class ColorNamespace:
     def clear(self, color: Any) -> ColorTexture: ...
     def clear_color(self, color: Any) -> ColorTexture: ...
     def film_grain(self) -> ColorTexture: ...
-    def linear_gradient(self, a: Any, b: Any, color1: Any, color2: Any) -> ColorTexture: ...
+    def image(self, pixels: Any) -> ColorTexture: ...
+    def linear_gradient(
+        self, a: Any, b: Any, color1: Any, color2: Any
+    ) -> ColorTexture: ...
     def noise(self) -> ColorTexture: ...
     def perlin_noise(self) -> ColorTexture: ...
-    def radial_gradient(self, a: Any, color1: Any, color2: Any, inner: Any = 0, outer: Any = 100) -> ColorTexture: ...
+    def radial_gradient(
+        self, a: Any, color1: Any, color2: Any, inner: Any = 0, outer: Any = 100
+    ) -> ColorTexture: ...
+    def stack(
+        self, layers: Any, blend_modes: Any = "normal", opacities: Any = 1.0
+    ) -> ColorTexture: ...
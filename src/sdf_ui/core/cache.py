@@ -0,0 +1,384 @@
+"""Render result caches with a GPU memory budget and replacement policies."""
+
+__docformat__ = "google"
+
+import heapq
+import os
+import tempfile
+import time
+from collections.abc import MutableMapping
+from itertools import count
+from pathlib import Path
+
+import numpy as np
+
+MIB = 1024 * 1024
+_MTIME_SLACK_NS = 50_000_000
+"""Files written this soon after a directory scan may not change its mtime."""
+
+
+def texture_bytes(tex):
+    """Return the GPU memory used by a texture, from its size and format."""
+    width, height = tex.size
+    dtype = getattr(tex, "dtype", "f1")
+    return int(width) * int(height) * int(tex.components) * int(dtype[1:])
+
+
+def result_bytes(result):
+    """Return the GPU memory of the textures held by a render result."""
+    if isinstance(result, (list, tuple)):
+        return sum(result_bytes(item) for item in result)
+    tex = getattr(result, "tex", None)
+    return texture_bytes(tex) if tex is not None else 0
+
+
+class LRUPolicy:
+    """Evict the least recently used entry first and admit everything."""
+
+    def __init__(self):
+        self._clock = count(1)
+
+    def admit(self, cost, size):
+        return True
+
+    def priority(self, cost, size, inflation):
+        return float(next(self._clock))
+
+
+class GreedyDualSizePolicy:
+    """GreedyDual-Size: keep entries that are expensive per byte.
+
+    An entry's priority is ``inflation + cost / size`` when it is stored or
+    hit, the entry with the lowest priority is evicted first and its
+    priority becomes the new inflation value. Entries that are not used
+    again age out as the inflation grows past them, expensive results
+    (e.g. ``text``) outlive cheap full-canvas dispatches of the same size.
+
+    Args:
+        min_cost_per_mib: Results that took fewer seconds per MiB of texture
+            to render are not cached, recomputing them is cheaper than
+            holding the memory.
+    """
+
+    def __init__(self, min_cost_per_mib=0.0):
+        self.min_cost_per_mib = min_cost_per_mib
+
+    def admit(self, cost, size):
+        return size == 0 or cost * MIB / size >= self.min_cost_per_mib
+
+    def priority(self, cost, size, inflation):
+        return inflation + cost / max(size, 1)
+
+
+class _Entry:
+    __slots__ = ("value", "size", "cost", "priority")
+
+    def __init__(self, value, size, cost, priority):
+        self.value = value
+        self.size = size
+        self.cost = cost
+        self.priority = priority
+
+
+class RenderCache(MutableMapping):
+    """Render cache bounded by texture memory.
+
+    The cache can be passed anywhere a plain ``dict`` cache is accepted.
+    Entries are sized with ``result_bytes`` when they are stored. Renderers
+    store results together with their measured render time through
+    ``store``, and evict entries chosen by ``policy`` once ``total_bytes``
+    exceeds ``max_bytes``. ``LRUPolicy`` is used by default. With a ``disk``
+    tier, results missing in memory are looked up there before rendering.
+
+    Example:
+    >>> cache = RenderCache(256 * MIB, policy=GreedyDualSizePolicy())
+    >>> with Canvas((1920, 1080)) as ctx, ctx.session(cache=cache) as renderer:
+    ...     for frame in range(1000):
+    ...         renderer.render(scene, params={"t": frame / 60})
+    """
+
+    def __init__(self, max_bytes=None, policy=None, disk=None):
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("max_bytes must be positive or None")
+        self.max_bytes = max_bytes
+        self.policy = LRUPolicy() if policy is None else policy
+        self.disk = disk
+        self.total_bytes = 0
+        self.evictions = 0
+        self.rejections = 0
+        self.inflation = 0.0
+        self._entries = {}
+        self._newest = None
+        # (priority, order, key, entry) of every entry, entries removed or
+        # reprioritized since are skipped when they come up.
+        self._heap = []
+        self._order = count()
+
+    def __getitem__(self, key):
+        entry = self._entries[key]
+        entry.priority = self.policy.priority(entry.cost, entry.size, self.inflation)
+        self._push(key, entry)
+        return entry.value
+
+    def peek(self, key, default=None):
+        """Return the value of ``key`` without counting it as a use."""
+        entry = self._entries.get(key)
+        return default if entry is None else entry.value
+
+    def __setitem__(self, key, value):
+        self._insert(key, value, result_bytes(value), 0.0)
+
+    def __delitem__(self, key):
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry.size
+        if key == self._newest:
+            self._newest = None
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    # Iterating must not refresh priorities, ``__getitem__`` does.
+    def values(self):
+        return [entry.value for entry in self._entries.values()]
+
+    def items(self):
+        return [(key, entry.value) for key, entry in self._entries.items()]
+
+    def clear(self):
+        self._entries.clear()
+        self._heap.clear()
+        self.total_bytes = 0
+        self.inflation = 0.0
+        self._newest = None
+
+    def store(self, key, value, cost=0.0):
+        """Store a result if the policy admits it.
+
+        Args:
+            key: Cache key.
+            value: Render result.
+            cost: Seconds it took to render ``value``.
+
+        Returns:
+            ``True`` if the result was stored.
+        """
+        size = result_bytes(value)
+        if not self.policy.admit(cost, size):
+            self.rejections += 1
+            return False
+        self._insert(key, value, size, cost)
+        return True
+
+    def over_budget(self):
+        """Remove and return the entries to evict to get back into budget.
+
+        The most recently stored entry is always kept, even when it is larger
+        than the whole budget.
+
+        Returns:
+            A list of evicted ``(key, value, size)`` tuples in eviction order.
+        """
+        evicted = []
+        if self.max_bytes is None:
+            return evicted
+        newest = None
+        while self.total_bytes > self.max_bytes and self._heap:
+            item = heapq.heappop(self._heap)
+            priority, _order, key, entry = item
+            if self._entries.get(key) is not entry or entry.priority != priority:
+                continue
+            if key == self._newest:
+                newest = item
+                continue
+            del self._entries[key]
+            self.total_bytes -= entry.size
+            self.inflation = max(self.inflation, entry.priority)
+            self.evictions += 1
+            evicted.append((key, entry.value, entry.size))
+        if newest is not None:
+            heapq.heappush(self._heap, newest)
+        return evicted
+
+    def _push(self, key, entry):
+        heapq.heappush(self._heap, (entry.priority, next(self._order), key, entry))
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            # Drop the stale items left behind by hits and removals.
+            self._heap = [
+                (entry.priority, next(self._order), key, entry)
+                for key, entry in self._entries.items()
+            ]
+            heapq.heapify(self._heap)
+
+    def _insert(self, key, value, size, cost):
+        if key in self._entries:
+            self.total_bytes -= self._entries[key].size
+        priority = self.policy.priority(cost, size, self.inflation)
+        entry = self._entries[key] = _Entry(value, size, cost, priority)
+        self.total_bytes += size
+        self._newest = key
+        self._push(key, entry)
+
+
+class DiskCache:
+    """Content-addressed render results stored as ``.npy`` files.
+
+    Entries are keyed by ``Renderer`` with a stable hash of the node
+    structure, the resolved ``param()`` values, the canvas size and format
+    and the source of the plugins and shaders involved, so they can be
+    shared between runs and processes. SDF results are stored as float32
+    arrays, color results as RGBA bytes, together with the time they took
+    to render; files are memory-mapped when they are uploaded again. Once the files exceed ``max_bytes`` the least
+    recently used ones are deleted. The directory is indexed when the
+    cache is created and again on a miss after it changed, so files written
+    by other processes are found.
+
+    Args:
+        path: Cache directory, created if missing.
+        max_bytes: Size cap for all files, ``None`` for no limit.
+        min_cost: Seconds a node must take to render before it is written.
+            Results of top-level renders are always written.
+
+    Example:
+    >>> cache = RenderCache(disk=DiskCache("~/.cache/sdf_ui", max_bytes=2**30))
+    >>> with Canvas((512, 512)) as ctx, ctx.session(cache=cache) as renderer:
+    ...     renderer.render(icon).save("icon.png")
+    """
+
+    def __init__(self, path, max_bytes=None, min_cost=0.001):
+        self.path = Path(path).expanduser()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.min_cost = min_cost
+        self.evictions = 0
+        self.total_bytes = 0
+        # key -> (file name, kind, mode, cost, size), least recently used first.
+        self._index = {}
+        self._scanned = None
+        self._recheck = False
+        self._scan()
+
+    def _scan(self):
+        """Index the files in the directory, oldest first."""
+        self._scanned = self.path.stat().st_mtime_ns
+        # Timestamps are coarse, a file written in the same tick as the scan
+        # leaves the mtime unchanged. Such a scan is repeated on a miss.
+        self._recheck = time.time_ns() - self._scanned < _MTIME_SLACK_NS
+        files = []
+        for entry in os.scandir(self.path):
+            parts = entry.name.split(".")
+            if len(parts) != 5 or parts[4] != "npy" or not parts[3].isdigit():
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            key, kind, mode, micros, _suffix = parts
+            mode = None if mode == "-" else mode
+            cost = int(micros) / 1e6
+            value = (entry.name, kind, mode, cost, stat.st_size)
+            files.append((stat.st_mtime, key, value))
+
+        self._index = {key: value for _time, key, value in sorted(files)}
+        self.total_bytes = sum(value[4] for value in self._index.values())
+
+    def _find(self, key):
+        """Index entry of ``key``.
+
+        The directory is scanned again when it changed since the last scan,
+        which picks up files other processes wrote without touching the
+        file system on every miss.
+        """
+        entry = self._index.get(key)
+        if entry is None:
+            try:
+                mtime = self.path.stat().st_mtime_ns
+                changed = self._recheck or mtime != self._scanned
+            except OSError:
+                changed = False
+            if changed:
+                self._scan()
+                entry = self._index.get(key)
+        return entry
+
+    def _touch(self, key, entry):
+        self._index.pop(key, None)
+        self._index[key] = entry
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def __len__(self):
+        return len(self._index)
+
+    def load(self, key):
+        """Return ``(array, kind, mode, cost)`` stored for ``key``, or ``None``."""
+        entry = self._find(key)
+        if entry is None:
+            return None
+        name, kind, mode, cost, size = entry
+        path = self.path / name
+        try:
+            array = np.load(path, mmap_mode="r")
+            os.utime(path)
+        except (OSError, ValueError):
+            # Deleted by another process or partially written.
+            self._index.pop(key, None)
+            self.total_bytes -= size
+            return None
+        self._touch(key, entry)
+        return array, kind, mode, cost
+
+    def save(self, key, array, kind, mode=None, cost=0.0):
+        """Write ``array`` for ``key`` and trim the cache to ``max_bytes``.
+
+        ``cost`` is the time in seconds it took to render ``array``, it is
+        returned by ``load``.
+        """
+        micros = max(0, round(cost * 1e6))
+        name = f"{key}.{kind}.{mode or '-'}.{micros}.npy"
+        handle, temp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as file:
+                np.save(file, np.ascontiguousarray(array))
+                size = file.tell()
+            os.replace(temp_path, self.path / name)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+        # The change is our own, it needs no rescan.
+        self._scanned = self.path.stat().st_mtime_ns
+        self._recheck = False
+        previous = self._index.get(key)
+        if previous is not None:
+            self.total_bytes -= previous[4]
+            if previous[0] != name:
+                (self.path / previous[0]).unlink(missing_ok=True)
+        self._touch(key, (name, kind, mode, micros / 1e6, size))
+        self.total_bytes += size
+        self._trim(keep=key)
+
+    def clear(self):
+        for key in list(self._index):
+            self._remove(key)
+
+    def _trim(self, keep):
+        if self.max_bytes is None:
+            return
+        for key in list(self._index):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self._remove(key)
+            self.evictions += 1
+
+    def _remove(self, key):
+        name, _kind, _mode, _cost, size = self._index.pop(key)
+        self.total_bytes -= size
+        (self.path / name).unlink(missing_ok=True)
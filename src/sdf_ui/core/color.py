@@ -36,3 +36,195 @@ class ColorTexture(TextureNode):
             return self
 
         return build("to_rgb", self)
+
+
+_CONVERSIONS = {"to_lab": ColorSpaceMode.LAB, "to_rgb": ColorSpaceMode.RGB}
+_CONVERSION_OPS = {mode: op for op, mode in _CONVERSIONS.items()}
+
+
+def eliminate_conversions(node):
+    """Remove redundant color-space conversions from the graph below ``node``.
+
+    The color space of every node is derived from its plugin: plugins with a
+    fixed ``mode`` produce that space, nodes built with a ``mode`` of their
+    own (e.g. the color output of ``masked_union``) produce theirs, other
+    plugins keep the space of their first color input and generators without
+    one produce LAB. Nodes whose space is not known are left unconverted. Plugins with
+    an ``input_mode`` (the layer plugins, ``blur``) convert their inputs
+    while rendering; the pass turns those conversions into ``to_rgb`` /
+    ``to_lab`` nodes, so a whole subgraph of such plugins works in their
+    space and only converts where it starts and ends. Conversions into the
+    space a node already has, back-to-back pairs and pairs around
+    ``mode_agnostic`` plugins (``transparency``) are then dropped.
+
+    Args:
+        node: Root of the graph.
+
+    Returns:
+        The rewritten root and the number of full-canvas conversion passes
+        that were removed.
+    """
+    rewrite = _ConversionPass()
+    root = rewrite.node(node)
+    removed = _conversion_passes(node, rewrite.mode) - _conversion_passes(
+        root, rewrite.mode
+    )
+    return root, removed
+
+
+class _ConversionPass:
+    def __init__(self):
+        # Keyed by id(), the nodes are kept in the values so ids stay unique.
+        self._modes = {}
+        self._nodes = {}
+
+    def mode(self, node):
+        """Color space ``node`` renders to, ``None`` if it is not known."""
+        if getattr(node, "kind", None) != "color":
+            return None
+        if node.tex is not None:
+            return node.mode
+        cached = self._modes.get(id(node))
+        if cached is not None:
+            return cached[1]
+
+        from .plugins.registry import registry
+
+        mode = registry.get(node.op).mode or getattr(node, "mode", None)
+        if mode is None and node.inputs:
+            first = node.inputs[0]
+            kind = getattr(first, "kind", None)
+            if kind == "color":
+                mode = self.mode(first)
+            elif kind == "sdf":
+                mode = ColorSpaceMode.LAB
+        elif mode is None:
+            mode = ColorSpaceMode.LAB
+        self._modes[id(node)] = (node, mode)
+        return mode
+
+    def node(self, node):
+        if not isinstance(node, TextureNode) or node.tex is not None:
+            return node
+        cached = self._nodes.get(id(node))
+        if cached is not None:
+            return cached[1]
+
+        from .plugins.registry import registry
+
+        plugin = registry.get(node.op)
+        inputs = tuple(self.node(child) for child in node.inputs)
+        params = tuple((key, self._value(value)) for key, value in node.params)
+
+        if node.op in _CONVERSIONS:
+            result = self.convert(inputs[0], _CONVERSIONS[node.op], node)
+        elif plugin.input_mode is not None:
+            target = plugin.input_mode
+            source = self.mode(inputs[0]) if inputs else None
+            inputs = tuple(self._to_mode(child, target) for child in inputs)
+            params = tuple((key, self._to_mode(value, target)) for key, value in params)
+            result = _rebuild(node, inputs, params)
+            restores = plugin.mode is None and plugin.result == "color"
+            if restores and source not in (None, target):
+                # The plugin used to convert its result back.
+                result = self.convert(result, source)
+        else:
+            result = _rebuild(node, inputs, params)
+
+        self._nodes[id(node)] = (node, result)
+        return result
+
+    def convert(self, node, mode, original=None):
+        """Return ``node`` in ``mode`` with as few conversions as possible."""
+        absorbed = self._absorb(node, mode) if self.mode(node) is not None else None
+        if absorbed is not None:
+            return absorbed
+        if original is not None and original.inputs[0] is node:
+            return original
+        return build(_CONVERSION_OPS[mode], node)
+
+    def _absorb(self, node, mode):
+        if self.mode(node) == mode:
+            return node
+        if node.tex is not None:
+            return None
+        if node.op in _CONVERSIONS and self.mode(node.inputs[0]) == mode:
+            return node.inputs[0]
+
+        from .plugins.registry import registry
+
+        if registry.get(node.op).mode_agnostic:
+            inner = self._absorb(node.inputs[0], mode)
+            if inner is not None:
+                return _rebuild(node, (inner, *node.inputs[1:]), node.params)
+        return None
+
+    def _to_mode(self, value, mode):
+        # Inputs of unknown space are left to the plugin, it converts them
+        # while rendering.
+        if getattr(value, "kind", None) == "color" and self.mode(value) is not None:
+            return self.convert(value, mode)
+        if isinstance(value, tuple):
+            return tuple(self._to_mode(item, mode) for item in value)
+        return value
+
+    def _value(self, value):
+        if isinstance(value, TextureNode):
+            return self.node(value)
+        if isinstance(value, tuple):
+            return tuple(self._value(item) for item in value)
+        return value
+
+
+def _rebuild(node, inputs, params):
+    if all(new is old for new, old in zip(inputs, node.inputs)) and all(
+        new is old for (_key, new), (_old_key, old) in zip(params, node.params)
+    ):
+        return node
+    kwargs = {"mode": node.mode} if hasattr(node, "mode") else {}
+    return type(node)(
+        op=node.op,
+        inputs=inputs,
+        params=params,
+        label=node.label,
+        should_cache=node.should_cache,
+        **kwargs,
+    )
+
+
+def _conversion_passes(root, mode):
+    """Count the conversion passes rendering ``root`` runs.
+
+    Explicit ``to_rgb`` / ``to_lab`` nodes are counted once per distinct
+    node, conversions done inside plugins with an ``input_mode`` once per
+    distinct input and once more for a result that is converted back.
+    """
+    from .plugins.registry import registry
+    from .texture import _child_nodes, node_digest
+
+    passes = set()
+    seen = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, TextureNode) or node.tex is not None:
+            continue
+        digest = node_digest(node)
+        if digest in seen:
+            continue
+        seen.add(digest)
+
+        plugin = registry.get(node.op)
+        children = _child_nodes(node)
+        if node.op in _CONVERSIONS:
+            passes.add((digest, node.op))
+        elif plugin.input_mode is not None:
+            target = plugin.input_mode
+            for child in children:
+                if mode(child) not in (None, target):
+                    passes.add((node_digest(child), _CONVERSION_OPS[target]))
+            restores = plugin.mode is None and plugin.result == "color"
+            if restores and mode(node.inputs[0]) not in (None, target):
+                passes.add((digest, "restore"))
+        stack.extend(children)
+    return len(passes)
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from .texture import PostNamespace, TextureNode
 
+if TYPE_CHECKING:
+    from .sdf import SDFTexture
+
 class ColorSpaceMode:
     LAB: str
     RGB: str
@@ -17,13 +20,17 @@ class ColorTexture(TextureNode):
     def to_lab(self) -> ColorTexture: ...
     def to_rgb(self) -> ColorTexture: ...
     def alpha_overlay(self, other: Any) -> ColorTexture: ...
-    def blur(self, n: Any = 0, base: Any = 9) -> ColorTexture: ...
+    def blur(self, n: Any = 0, base: Any = 9, sigma: Any = None) -> ColorTexture: ...
     def blur_13(self, n: Any = 0) -> ColorTexture: ...
     def blur_9(self, n: Any = 0) -> ColorTexture: ...
     def dither_1bit(self) -> ColorTexture: ...
     def dithering(self) -> ColorTexture: ...
+    def gaussian_blur(self, sigma: Any) -> ColorTexture: ...
     def invert(self) -> ColorTexture: ...
     def layer_mask(self, top: Any, mask: Any) -> ColorTexture: ...
     def mask(self, top: Any, mask: Any) -> ColorTexture: ...
+    def mask_to_sdf(
+        self, threshold: Any = 0.5, channel: Any = "luminance", invert: Any = False
+    ) -> SDFTexture: ...
     def multiply(self, other: Any) -> ColorTexture: ...
     def transparency(self, alpha: Any) -> ColorTexture: ...
@@ -22,6 +22,8 @@ from .texture_utils import (  # noqa: F401
     tex_registry,
 )
 
+_active_context = None
+
 
 def _triple(value, name):
     items = tuple(value)
@@ -107,13 +109,14 @@ class _SingleChannelFloatTexture:
     def filter(self, value):
         self._texture.filter = value
 
-    def write(self, data):
+    def write(self, data, viewport=None):
         if self._dtype == "f2":
             if isinstance(data, (bytes, bytearray, memoryview)):
                 values = np.frombuffer(data, dtype=np.float32)
-                if values.size == self._texture.size[0] * self._texture.size[1]:
+                width, height = viewport[2:] if viewport else self._texture.size
+                if values.size == width * height:
                     data = values.astype(np.float16).tobytes()
-        return self._texture.write(data)
+        return self._texture.write(data, viewport=viewport)
 
     def read(self):
         payload = self._texture.read()
@@ -141,6 +144,8 @@ class Context:
         self._closed = False
 
         self._mgl_ctx = self._create_mgl_context()
+        global _active_context
+        _active_context = self
         self._sdf_image_dtype = self._detect_sdf_image_dtype()
         self._sdf_image_format = "r32f" if self._sdf_image_dtype == "f4" else "r16f"
         self._shader_library = ShaderLibrary(
@@ -148,6 +153,11 @@ class Context:
         )
         self._active_render_stats = None
         self.last_render_stats = None
+        self._texture_pool = {}
+        self.texture_pool_limit = 32
+        self.shader_fusion = True
+        self.cpu_compositing = False
+        self.color_conversion_elimination = True
 
         self.dispatch_config = DispatchConfig.from_value(dispatch_config)
         self.dispatch_groups = self.dispatch_config.groups_for_size(size)
@@ -236,20 +246,58 @@ class Context:
         if self._closed:
             return
 
+        self.clear_texture_pool()
         self._closed = True
+        global _active_context
+        if _active_context is self:
+            _active_context = None
         release = getattr(getattr(self, "_mgl_ctx", None), "release", None)
         if callable(release):
             release()
 
+    def activate(self):
+        """
+        Makes this context the current OpenGL context.
+
+        Several contexts can be alive at the same time, GL calls always go to
+        whichever one was made current last.
+        """
+        global _active_context
+        if _active_context is self or getattr(self, "_closed", False):
+            return
+
+        enter = getattr(getattr(self, "_mgl_ctx", None), "__enter__", None)
+        if callable(enter):
+            enter()
+        _active_context = self
+
     def render(self, texture, params=None, cache=None):
         from .texture import Renderer
 
         return Renderer(self, params=params, cache=cache).render(texture)
 
     def session(self, params=None, cache=None):
+        """
+        Creates a renderer that keeps its results between renders.
+
+        Rendering the same graph again with ``renderer.render(node, params=...)``
+        only re-evaluates the nodes that depend on a changed ``param()``.
+
+        Args:
+        - params (dict): Default values for ``param()`` expressions.
+        - cache (dict): Cache to use, a new one is created if omitted.
+
+        Returns:
+        A ``Renderer``.
+        """
+        from .texture import Renderer
+
+        return Renderer(self, params=params, cache={} if cache is None else cache)
+
+    def compile(self, texture, params=None, cache=None):
         from .texture import Renderer
 
-        return Renderer(self, params=params, cache=cache)
+        return Renderer(self, params=params, cache=cache).compile(texture)
 
     def texture_from_image(self, path):
         """
@@ -289,6 +337,18 @@ class Context:
         """
         return self._shader_library.get(shader)
 
+    def get_fused_shader(self, shape):
+        """
+        Retrieves the program evaluating a fused SDF subgraph, generating and caching it if necessary.
+
+        Args:
+        - shape (tuple): The subgraph shape, see ``sdf_ui.core.fusion``.
+
+        Returns:
+        A shader program object.
+        """
+        return self._shader_library.get_fused(shape)
+
     def percent(self, alpha):
         """
         Converts a percentage value to an absolute value based on the width of the rendering context.
@@ -353,11 +413,89 @@ class Context:
         """
         return alpha / 100 * self.size[1]
 
+    # Texture pool
+    def recycle_texture(self, tex):
+        """
+        Returns a texture to the pool so a later ``r32f()``/``rgba8()`` call can reuse it.
+
+        The texture must not be referenced by any render node afterwards. Textures
+        beyond ``texture_pool_limit`` per (size, format) are released instead.
+
+        Args:
+        - tex: A texture created by ``r32f()`` or ``rgba8()``.
+        """
+        if getattr(self, "_closed", False):
+            return
+
+        key = _pool_key(tex)
+        free = self._texture_pool.setdefault(key, [])
+        if len(free) >= self.texture_pool_limit:
+            self.release_texture(tex)
+            return
+
+        free.append(tex)
+        stats = getattr(self, "_active_render_stats", None)
+        if stats is not None:
+            stats.record_texture_recycle(key[1])
+
+    def clear_texture_pool(self):
+        """
+        Releases every texture currently held by the pool.
+        """
+        pool = getattr(self, "_texture_pool", None) or {}
+        for free in pool.values():
+            for tex in free:
+                self.release_texture(tex)
+        pool.clear()
+
+    def release_texture(self, tex):
+        """
+        Releases a texture created by this context.
+
+        The context is made current first, otherwise the driver may delete a
+        texture with the same name that belongs to another live context. The
+        previously active context is restored afterwards. Textures of a closed
+        context are skipped, they were freed with it.
+        """
+        if getattr(self, "_closed", False):
+            return
+
+        previous = _active_context
+        self.activate()
+        tex.release()
+        decrease_tex_registry()
+        if previous is not None and previous is not self:
+            previous.activate()
+
+    def _pooled_texture(self, kind, size=None):
+        pool = getattr(self, "_texture_pool", None)
+        if not pool:
+            return None
+
+        size = (int(size[0]), int(size[1])) if size else self._texture_size()
+        free = pool.get((size, kind))
+        if not free:
+            return None
+
+        tex = free.pop()
+        stats = getattr(self, "_active_render_stats", None)
+        if stats is not None:
+            stats.record_texture_reuse(kind)
+        return tex
+
+    def _texture_size(self):
+        return int(self.size[0]), int(self.size[1])
+
     # Generate textures
-    def r32f(self):
+    def r32f(self, size=None):
         """
         Creates a floating-point texture (r32f) with the specified size.
 
+        Args:
+        - size (tuple, optional): Texture size, the context size by default.
+          Smaller textures hold partial fields, e.g. the region around a text
+          run.
+
         Returns:
         A floating-point texture.
 
@@ -365,8 +503,12 @@ class Context:
         >>> context = Context((800, 600))
         >>> r32f_texture = context.r32f()
         """
+        tex = self._pooled_texture("r32f", size)
+        if tex is not None:
+            return tex
+
         logger().debug("Created r32f texture...")
-        size = (int(self.size[0]), int(self.size[1]))
+        size = (int(size[0]), int(size[1])) if size else self._texture_size()
         sdf_dtype = getattr(self, "_sdf_image_dtype", "f4")
         allocation_order = [sdf_dtype]
         if sdf_dtype != "f4":
@@ -411,10 +553,15 @@ class Context:
 
         return tex
 
-    def rgba8(self):
+    def rgba8(self, size=None):
         """
         Creates an RGBA8 texture with the specified size.
 
+        Args:
+        - size (tuple, optional): Texture size, the context size by default.
+          Smaller textures are used for intermediate results, e.g. the levels
+          of a blur pyramid.
+
         Returns:
         An RGBA8 texture.
 
@@ -422,8 +569,12 @@ class Context:
         >>> context = Context((800, 600))
         >>> rgba8_texture = context.rgba8()
         """
+        tex = self._pooled_texture("rgba8", size)
+        if tex is not None:
+            return tex
+
         logger().debug("Created rgba8 texture...")
-        size = (int(self.size[0]), int(self.size[1]))
+        size = (int(size[0]), int(size[1])) if size else self._texture_size()
         tex = self._mgl_ctx.texture(size, 4)
         tex.filter = mgl.LINEAR, mgl.LINEAR
         stats = getattr(self, "_active_render_stats", None)
@@ -435,6 +586,62 @@ class Context:
 
         return tex
 
+    def rgba32f(self, size=None):
+        """
+        Creates an RGBA32F texture with the specified size.
+
+        Used for intermediate results that do not fit 8 bits per channel,
+        e.g. the nearest seed coordinates of the jump flood in ``mask_to_sdf``.
+
+        Args:
+        - size (tuple, optional): Texture size, the context size by default.
+
+        Returns:
+        An RGBA32F texture.
+
+        Example:
+        >>> context = Context((800, 600))
+        >>> rgba32f_texture = context.rgba32f()
+        """
+        tex = self._pooled_texture("rgba32f", size)
+        if tex is not None:
+            return tex
+
+        logger().debug("Created rgba32f texture...")
+        size = (int(size[0]), int(size[1])) if size else self._texture_size()
+        tex = self._mgl_ctx.texture(size, 4, dtype="f4")
+        stats = getattr(self, "_active_render_stats", None)
+        if stats is not None:
+            stats.record_texture_allocation("rgba32f")
+
+        global tex_registry
+        tex_registry += 1
+
+        return tex
+
+    def storage_buffer(self, data):
+        """
+        Creates a shader storage buffer initialised with the given data.
+
+        Args:
+        - data: Bytes or an object supporting the buffer protocol (e.g. a NumPy array).
+
+        Returns:
+        A buffer object, released by the caller once the dispatch is recorded.
+
+        Example:
+        >>> context = Context((800, 600))
+        >>> buffer = context.storage_buffer(np.zeros((4, 8), dtype=np.float32))
+        """
+        return self._mgl_ctx.buffer(data)
+
+
+def _pool_key(tex):
+    size = tuple(int(value) for value in tex.size)
+    if tex.components == 1:
+        return size, "r32f"
+    return size, "rgba32f" if tex.dtype == "f4" else "rgba8"
+
 
 def init_sdf_ui(size):
     """
@@ -67,6 +67,19 @@ def cos(value):
     return Expr("cos", (value,))
 
 
+def param_names(expr):
+    """Return the set of ``param()`` names referenced by an expression tree."""
+    if not isinstance(expr, Expr):
+        return frozenset()
+    if expr.op == "param":
+        return frozenset((expr.args[0],))
+
+    names = set()
+    for arg in expr.args:
+        names.update(param_names(arg))
+    return frozenset(names)
+
+
 def evaluate_expr(expr, ctx, params):
     if isinstance(expr, str):
         parsed = _parse_context_percent(expr)
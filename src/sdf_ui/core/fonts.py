@@ -0,0 +1,514 @@
+"""Parsed font faces and glyph SDF atlases shared between renders and processes."""
+
+__docformat__ = "google"
+
+import hashlib
+import os
+import re
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from ttfquery import describe
+
+
+@lru_cache(maxsize=64)
+def _file_digest(path, mtime_ns, size):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def font_digest(path):
+    """Hex digest of the content of a font file, cached per modification time."""
+    stat = os.stat(path)
+    return _file_digest(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+_CORNER_SINE = 0.14
+"""Sine of the smallest tangent turn that makes a corner, about 8 degrees."""
+
+
+def flatten_contours(points, on_curve, contour_ends, tolerance):
+    """Flatten closed TrueType contours into line segments.
+
+    Every on-curve point starts a line or a quadratic Bezier, runs of two
+    off-curve points get the implied on-curve point between them. Each
+    quadratic is split into the fewest equal parameter steps that keep the
+    chords within ``tolerance`` of the curve. A chord over a step ``h`` lies
+    at most ``|p0 - 2 c + p2| h^2 / 4`` from the curve, so flat and short
+    curves get few segments and tight ones many. All curves are flattened
+    at once.
+
+    Args:
+        points: Array-like of shape (P, 2), the points of all contours.
+        on_curve: Array-like of P booleans.
+        contour_ends: End offset of every contour in ``points``.
+        tolerance: Largest distance between the segments and the curves, in
+            the units of ``points``.
+
+    Returns:
+        A contiguous float32 array of shape (N, 2, 2) of segment start and
+        end points, the end offset of every contour's segments, and an array
+        of N booleans, True where a segment starts at a corner, an on-curve
+        point where the outline's tangent turns by more than about 8 degrees.
+    """
+    if not tolerance > 0:
+        raise ValueError(f"Flattening tolerance must be positive, got {tolerance}")
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    on_curve = np.asarray(on_curve, dtype=bool)
+    contour_ends = np.asarray(contour_ends, dtype=np.intp)
+    following = _following(contour_ends)
+
+    # Insert the implied on-curve point between two off-curve points.
+    implied = ~on_curve & ~on_curve[following]
+    counts = 1 + implied.astype(np.intp)
+    offsets = np.cumsum(counts) - counts
+    expanded = np.empty((counts.sum(), 2), dtype=np.float64)
+    expanded_on = np.ones(len(expanded), dtype=bool)
+    expanded[offsets] = points
+    expanded_on[offsets] = on_curve
+    expanded[offsets[implied] + 1] = (points[implied] + points[following[implied]]) / 2
+    expanded_ends = np.cumsum(counts)[contour_ends - 1]
+    following = _following(expanded_ends)
+
+    # Every on-curve point starts a piece, lines get their midpoint as control.
+    starts = np.flatnonzero(expanded_on)
+    after = following[starts]
+    curved = ~expanded_on[after]
+    p0 = expanded[starts]
+    p2 = expanded[np.where(curved, following[after], after)]
+    control = np.where(curved[:, None], expanded[after], (p0 + p2) / 2)
+
+    second_difference = np.hypot(*(p0 - 2.0 * control + p2).T)
+    steps = np.maximum(1, np.ceil(np.sqrt(second_difference / (4.0 * tolerance))))
+    steps = steps.astype(np.intp)
+
+    piece = np.repeat(np.arange(len(starts)), steps)
+    step = np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)
+    segments = np.stack(
+        (
+            _quadratic(p0, control, p2, piece, step / steps[piece]),
+            _quadratic(p0, control, p2, piece, (step + 1) / steps[piece]),
+        ),
+        axis=1,
+    )
+
+    contour = np.searchsorted(expanded_ends, starts, side="right")
+    per_contour = np.bincount(contour, weights=steps, minlength=len(contour_ends))
+    segment_ends = np.cumsum(per_contour).astype(np.intp)
+
+    # A piece starts at a corner where it leaves in another direction than
+    # the previous piece of its contour arrives.
+    piece_ends = np.searchsorted(starts, expanded_ends)
+    first_piece = np.concatenate(([0], piece_ends[:-1]))[contour]
+    previous = np.arange(len(starts)) - 1
+    wrap = previous < first_piece
+    previous[wrap] = piece_ends[contour[wrap]] - 1
+    arriving = _tangent(p2 - control, p2 - p0)[previous]
+    leaving = _tangent(control - p0, p2 - p0)
+    dot = np.einsum("ij,ij->i", arriving, leaving)
+    cross = arriving[:, 0] * leaving[:, 1] - arriving[:, 1] * leaving[:, 0]
+    turns = (dot <= 0.0) | (
+        np.abs(cross) > _CORNER_SINE * np.hypot(*arriving.T) * np.hypot(*leaving.T)
+    )
+    corners = np.zeros(len(segments), dtype=bool)
+    corners[np.cumsum(steps) - steps] = turns
+    return np.ascontiguousarray(segments, dtype=np.float32), segment_ends, corners
+
+
+def _following(ends):
+    """Index of the next point of every point of closed contours."""
+    ends = np.asarray(ends, dtype=np.intp)
+    count = ends[-1] if len(ends) else 0
+    starts = np.concatenate(([0], ends[:-1]))
+    contour = np.repeat(np.arange(len(ends)), ends - starts)
+    following = np.arange(count) + 1
+    wrap = following == ends[contour]
+    following[wrap] = starts[contour[wrap]]
+    return following
+
+
+def _quadratic(p0, control, p2, piece, t):
+    t = t[:, None]
+    u = 1.0 - t
+    return u * u * p0[piece] + 2.0 * u * t * control[piece] + t * t * p2[piece]
+
+
+def _tangent(direction, fallback):
+    """``direction``, or ``fallback`` where it is zero."""
+    zero = ~np.any(direction, axis=1)
+    return np.where(zero[:, None], fallback, direction)
+
+
+class FontFace:
+    """A font file parsed once into arrays.
+
+    Holds what layout and glyph outlines need, so no font table is read again
+    after loading. A face only holds NumPy arrays, tuples and dicts, so it
+    pickles for worker processes. Use ``font_face`` for a face shared per
+    path.
+
+    Characters without a glyph map to glyph 0, the font's ``.notdef`` glyph.
+    Kerning is read from the ``kern`` table.
+
+    Args:
+        path: Path to a TrueType font file.
+
+    Attributes:
+        units_per_em: Font units per em.
+        ascent: Ascent of the font in font units.
+        descent: Descent of the font in font units, usually negative.
+        codepoints: Sorted code points of the mapped characters.
+        glyph_indices: Glyph index of every code point in ``codepoints``.
+        advances: Advance width of every glyph in font units.
+        bboxes: (x_min, y_min, x_max, y_max) of every glyph, zeros for glyphs
+            without an outline.
+        kerning: (left glyph, right glyph) -> kerning in font units.
+        points: Outline points of all glyphs, shape (P, 2).
+        on_curve: Whether each point of ``points`` lies on the outline.
+        contour_ends: End offset in ``points`` of every contour.
+        glyph_contours: Offsets of every glyph's contours in ``contour_ends``,
+            glyph ``g`` owns contours ``glyph_contours[g]:glyph_contours[g + 1]``.
+    """
+
+    def __init__(self, path):
+        font = describe.openFont(str(path))
+        self.path = str(path)
+        self.units_per_em = float(font["head"].unitsPerEm)
+        self.ascent = float(font["hhea"].ascent)
+        self.descent = float(font["hhea"].descent)
+
+        order = font.getGlyphOrder()
+        glyph_ids = {name: index for index, name in enumerate(order)}
+        cmap = font["cmap"].getcmap(*describe.guessEncoding(font)).cmap
+        self.codepoints = np.array(sorted(cmap), dtype=np.int64)
+        self.glyph_indices = np.array(
+            [glyph_ids.get(cmap[code], 0) for code in self.codepoints.tolist()],
+            dtype=np.intp,
+        )
+
+        metrics = font["hmtx"].metrics
+        self.advances = np.array(
+            [float(metrics.get(name, (0, 0))[0]) for name in order], dtype=np.float64
+        )
+
+        self.kerning = {}
+        if "kern" in font:
+            for table in getattr(font["kern"], "kernTables", ()):
+                for (left, right), value in getattr(table, "kernTable", {}).items():
+                    if left in glyph_ids and right in glyph_ids:
+                        key = (glyph_ids[left], glyph_ids[right])
+                        self.kerning.setdefault(key, float(value))
+
+        glyf = font["glyf"]
+        bboxes = np.zeros((len(order), 4), dtype=np.float64)
+        points, on_curve, contour_ends, glyph_contours = [], [], [], [0]
+        offset = 0
+        for index, name in enumerate(order):
+            glyph = glyf[name]
+            if glyph.numberOfContours:
+                bboxes[index] = (glyph.xMin, glyph.yMin, glyph.xMax, glyph.yMax)
+                coordinates, ends, flags = glyph.getCoordinates(glyf)
+                points.append(np.asarray(coordinates, dtype=np.float64).reshape(-1, 2))
+                on_curve.append((np.asarray(flags, dtype=np.uint8) & 1).astype(bool))
+                contour_ends.extend(offset + end + 1 for end in ends)
+                offset += len(coordinates)
+            glyph_contours.append(len(contour_ends))
+
+        self.bboxes = bboxes
+        self.points = (
+            np.concatenate(points) if points else np.zeros((0, 2), dtype=np.float64)
+        )
+        self.on_curve = (
+            np.concatenate(on_curve) if on_curve else np.zeros(0, dtype=bool)
+        )
+        self.contour_ends = np.array(contour_ends, dtype=np.intp)
+        self.glyph_contours = np.array(glyph_contours, dtype=np.intp)
+        self._index_kerning()
+
+    def __len__(self):
+        return len(self.advances)
+
+    def _index_kerning(self):
+        """Sort the kerning pairs into arrays for vectorized lookups."""
+        keys = sorted(self.kerning)
+        self._kerning_keys = np.array(
+            [left * len(self) + right for left, right in keys], dtype=np.int64
+        )
+        self._kerning_values = np.array(
+            [self.kerning[key] for key in keys], dtype=np.float64
+        )
+
+    def glyph_index(self, codepoints):
+        """Glyph indices of an array of code points, 0 where the font has none."""
+        codepoints = np.asarray(codepoints, dtype=np.int64)
+        if not len(self.codepoints):
+            return np.zeros(codepoints.shape, dtype=np.intp)
+        slots = np.searchsorted(self.codepoints, codepoints)
+        slots = np.minimum(slots, len(self.codepoints) - 1)
+        found = self.codepoints[slots] == codepoints
+        return np.where(found, self.glyph_indices[slots], 0)
+
+    def kerning_of(self, left, right):
+        """Kerning between arrays of left and right glyph indices."""
+        keys = np.asarray(left, dtype=np.int64) * len(self) + np.asarray(right)
+        if not len(self._kerning_keys):
+            return np.zeros(keys.shape, dtype=np.float64)
+        slots = np.searchsorted(self._kerning_keys, keys)
+        slots = np.minimum(slots, len(self._kerning_keys) - 1)
+        found = self._kerning_keys[slots] == keys
+        return np.where(found, self._kerning_values[slots], 0.0)
+
+    def layout(self, text, line_height=1.2):
+        """Glyph indices and pen positions of a text run, in font units.
+
+        Pens advance by the glyph advances plus kerning. ``"\\n"`` starts a
+        new line ``line_height`` ems below the previous one.
+
+        Returns:
+            The glyph index of every character other than line breaks and
+            an array of shape (N, 2) of their pen positions.
+        """
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(
+            np.int64
+        )
+        breaks = codes == ord("\n")
+        glyphs = self.glyph_index(codes)
+        advances = np.where(breaks, 0.0, self.advances[glyphs])
+
+        kerning = np.zeros(len(codes), dtype=np.float64)
+        if len(codes) > 1 and self.kerning:
+            pairs = ~breaks[1:] & ~breaks[:-1]
+            kerning[1:][pairs] = self.kerning_of(glyphs[:-1][pairs], glyphs[1:][pairs])
+
+        steps = np.cumsum(kerning + advances)
+        last_break = np.maximum.accumulate(np.where(breaks, np.arange(len(codes)), -1))
+        line_start = np.where(last_break >= 0, steps[np.maximum(last_break, 0)], 0.0)
+        pens = np.column_stack(
+            (
+                steps - advances - line_start,
+                -np.cumsum(breaks) * self.units_per_em * line_height,
+            )
+        )
+        return glyphs[~breaks], pens[~breaks]
+
+    def segments(self, glyph, tolerance):
+        """Outline of a glyph flattened into line segments.
+
+        Args:
+            glyph: Glyph index.
+            tolerance: Largest distance between the segments and the curves,
+                in font units.
+
+        Returns:
+            See ``flatten_contours``.
+        """
+        first, last = self.glyph_contours[glyph], self.glyph_contours[glyph + 1]
+        start = self.contour_ends[first - 1] if first else 0
+        ends = self.contour_ends[first:last]
+        end = ends[-1] if len(ends) else start
+        return flatten_contours(
+            self.points[start:end], self.on_curve[start:end], ends - start, tolerance
+        )
+
+
+@lru_cache(maxsize=16)
+def font_face(path):
+    """The ``FontFace`` of a font file, parsed once per path."""
+    return FontFace(path)
+
+
+ATLAS_FORMAT = 1
+"""Version of the atlas files, part of their names."""
+
+_ATLAS_NAME = re.compile(r"(v\d+-)?[0-9a-f]{24}-.*\.npz")
+
+
+def _atlas_directory():
+    """``$SDF_UI_FONT_CACHE``, or the user cache when it is not set.
+
+    An empty value keeps atlases in memory only.
+    """
+    value = os.environ.get("SDF_UI_FONT_CACHE")
+    if value is None:
+        return Path("~/.cache/sdf_ui/fonts").expanduser()
+    return Path(value).expanduser() if value else None
+
+
+class FontAtlas:
+    """Glyph SDF patches of one font packed into a single float32 field.
+
+    Patches are keyed by glyph index, see ``FontFace``. They are added on
+    demand and packed on shelves, rows of glyphs as high as the tallest glyph
+    on them. Every patch shares the same resolution, ``units_per_pixel`` font
+    units per atlas pixel. Atlases are stored in ``FontAtlas.directory`` per
+    font content, cache size and curve tolerance, so later processes skip
+    rasterizing the glyphs again. The directory defaults to
+    ``$SDF_UI_FONT_CACHE`` or ``~/.cache/sdf_ui/fonts``, set it to ``None``
+    to keep atlases in memory only. Saving deletes atlases of older file
+    formats, and the least recently used ones once the directory holds more
+    than ``max_bytes``.
+
+    Args:
+        key: Name of the atlas on disk.
+        units_per_pixel: Font units per atlas pixel.
+        width: Initial width of the atlas, it grows for wider glyphs.
+        channels: 1 for plain SDF patches, 3 for multi-channel ones, see
+            ``sdf_ui.core.msdf``.
+    """
+
+    directory = _atlas_directory()
+    max_bytes = 256 << 20
+
+    def __init__(self, key, units_per_pixel, width=1024, channels=1):
+        self.key = key
+        self.units_per_pixel = float(units_per_pixel)
+        self.channels = int(channels)
+        self.field = np.zeros(self._shape(0, int(width)), dtype=np.float32)
+        self.version = 0
+        # glyph -> (x, y, width, height, origin x, origin y), origins in font units.
+        self._glyphs = {}
+        self._shelf = [0, 0, 0]  # x, y and height of the open shelf
+
+    @classmethod
+    def open(cls, path, cache_size, tolerance, units_per_pixel, channels=1):
+        """Load the atlas of a font file from disk, or start an empty one."""
+        key = f"v{ATLAS_FORMAT}-{font_digest(path)[:24]}-{int(cache_size)}"
+        key = f"{key}-{float(tolerance):g}"
+        if channels != 1:
+            key = f"{key}-{int(channels)}ch"
+        width = int(np.clip(16 * int(cache_size), 256, 4096))
+        atlas = cls(key, units_per_pixel, width, channels)
+        atlas._load()
+        return atlas
+
+    def _shape(self, height, width):
+        return (height, width) if self.channels == 1 else (height, width, self.channels)
+
+    def __contains__(self, glyph):
+        return glyph in self._glyphs
+
+    def __len__(self):
+        return len(self._glyphs)
+
+    def glyph(self, glyph):
+        """``(x, y, width, height, origin_x, origin_y)`` of a packed glyph."""
+        return self._glyphs[glyph]
+
+    def patch(self, glyph):
+        """View of the SDF patch of a packed glyph."""
+        x, y, width, height, _ox, _oy = self._glyphs[glyph]
+        return self.field[y : y + height, x : x + width]
+
+    def add(self, glyph, field, origin):
+        """Pack the SDF patch of a glyph, ``origin`` is its corner in font units."""
+        height, width = field.shape[:2]
+        if not field.size:
+            self._glyphs[glyph] = (0, 0, 0, 0, float(origin[0]), float(origin[1]))
+            return
+
+        if width > self.field.shape[1]:
+            self._grow(0, width - self.field.shape[1])
+        x, y, shelf_height = self._shelf
+        if x + width > self.field.shape[1]:
+            x, y, shelf_height = 0, y + shelf_height, 0
+        shelf_height = max(shelf_height, height)
+        if y + shelf_height > self.field.shape[0]:
+            self._grow(y + shelf_height - self.field.shape[0], 0)
+
+        self.field[y : y + height, x : x + width] = field
+        self._glyphs[glyph] = (x, y, width, height, float(origin[0]), float(origin[1]))
+        self._shelf = [x + width, y, shelf_height]
+        self.version += 1
+
+    def _grow(self, rows, columns):
+        padding = ((0, rows), (0, columns)) + ((0, 0),) * (self.field.ndim - 2)
+        self.field = np.pad(self.field, padding)
+
+    def save(self):
+        """Write the atlas to ``FontAtlas.directory``, if set."""
+        if self.directory is None:
+            return
+        directory = Path(self.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        glyphs = list(self._glyphs)
+        table = np.array([self._glyphs[glyph] for glyph in glyphs], dtype=np.float64)
+        handle, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as file:
+                np.savez(
+                    file,
+                    field=self.field,
+                    glyphs=np.array(glyphs, dtype=np.int64),
+                    table=table.reshape(-1, 6),
+                    shelf=np.array(self._shelf, dtype=np.int64),
+                    units_per_pixel=self.units_per_pixel,
+                )
+            os.replace(temp_path, directory / f"{self.key}.npz")
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+        self._prune(directory)
+
+    def _prune(self, directory):
+        """Delete stale atlas files, then the oldest ones above ``max_bytes``."""
+        files = []
+        for entry in os.scandir(directory):
+            if not _ATLAS_NAME.fullmatch(entry.name):
+                continue
+            try:
+                if not entry.name.startswith(f"v{ATLAS_FORMAT}-"):
+                    os.unlink(entry.path)
+                    continue
+                stat = entry.stat()
+            except OSError:
+                # Removed by another process.
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry))
+        if self.max_bytes is None:
+            return
+
+        total = sum(size for _time, size, _entry in files)
+        for _time, size, entry in sorted(files, key=lambda file: file[0]):
+            if total <= self.max_bytes:
+                break
+            if entry.name == f"{self.key}.npz":
+                continue
+            Path(entry.path).unlink(missing_ok=True)
+            total -= size
+
+    def _load(self):
+        if self.directory is None:
+            return
+        path = Path(self.directory) / f"{self.key}.npz"
+        try:
+            with np.load(path) as data:
+                field = data["field"]
+                if (
+                    float(data["units_per_pixel"]) != self.units_per_pixel
+                    or field.shape[2:] != self.field.shape[2:]
+                ):
+                    return
+                glyphs, table, shelf = data["glyphs"], data["table"], data["shelf"]
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            # Missing, or partially written by another process.
+            return
+
+        self.field = np.array(field, dtype=np.float32)
+        for glyph, row in zip(glyphs, table):
+            x, y, width, height, origin_x, origin_y = row
+            self._glyphs[int(glyph)] = (
+                int(x),
+                int(y),
+                int(width),
+                int(height),
+                float(origin_x),
+                float(origin_y),
+            )
+        self._shelf = [int(value) for value in shelf]
+        self.version += 1
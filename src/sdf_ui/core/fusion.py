@@ -0,0 +1,198 @@
+"""Fuse chains of per-texel SDF shaders into a single compute program.
+
+Primitive and boolean plugin shaders all follow the same layout: uniforms and
+helper functions, then a ``main`` that computes ``distance`` for
+``texelPos`` (optionally from ``imageLoad(input, texelPos).r``) and stores it.
+This module turns such a shader into a function and stitches a subgraph of
+them into one program, so the graph is evaluated per texel without writing
+intermediate textures.
+
+A subgraph is described by its *shape*, a tuple of
+``(shader_name, input_uniforms, args)`` entries in evaluation order. Each arg
+is ``("node", index)`` for the value of an earlier entry or ``("input", index)``
+for an image bound at ``binding = index + 1``. Uniforms of entry ``i`` are
+renamed to ``n{i}_{name}``.
+"""
+
+__docformat__ = "google"
+
+import re
+from dataclasses import dataclass
+
+MAX_FUSED_NODES = 64
+MAX_FUSED_INPUTS = 7
+
+_MAIN = re.compile(r"\bvoid\s+main\s*\(\s*\)\s*\{")
+_BOUNDS_CHECK = re.compile(
+    r"if\s*\(\s*texelPos\.x\s*>=\s*destSize\.x\s*\|\|\s*texelPos\.y\s*>=\s*destSize\.y\s*\)"
+    r"\s*\{\s*return;\s*\}"
+)
+_STORE = re.compile(
+    r"imageStore\s*\(\s*destTex\s*,\s*texelPos\s*,\s*vec4\s*\(\s*(\w+)\s*,[^;]*\)\s*\)\s*;"
+    r"\s*\}\s*$"
+)
+_INPUT_LOAD = re.compile(r"imageLoad\s*\(\s*(\w+)\s*,\s*texelPos\s*\)\s*\.r\b")
+_DIRECTIVE = re.compile(r"^\s*(#version\b.*|layout\s*\(.*)$", re.MULTILINE)
+_UNIFORM = re.compile(r"^\s*uniform\s+\w+\s+(\w+)\s*;", re.MULTILINE)
+_CONST = re.compile(r"^\s*const\s+\w+\s+(\w+)\s*=", re.MULTILINE)
+_FUNCTION = re.compile(r"^\w+\s+(\w+)\s*\(", re.MULTILINE)
+_DEFINE = re.compile(r"^\s*#define\s+(\w+)", re.MULTILINE)
+_UNFUSABLE = re.compile(r"\b(imageLoad|imageStore|destTex|destSize|gl_\w+)\b")
+_BLANK_LINES = re.compile(r"\n(?:[ \t]*\n)+")
+
+
+@dataclass(frozen=True)
+class ShaderFragment:
+    """A per-texel SDF shader split into its declarations and ``main`` body."""
+
+    name: str
+    declarations: str
+    body: str
+    result: str
+    inputs: tuple
+    identifiers: frozenset
+
+    def instantiate(self, prefix):
+        """Return GLSL defining ``{prefix}eval`` with all globals prefixed."""
+        rename = _renamer(self.identifiers, prefix)
+        arguments = ", ".join(
+            ["ivec2 texelPos"] + [f"float {prefix}{name}" for name in self.inputs]
+        )
+        declarations = _tidy(rename(self.declarations))
+        return (
+            f"// {self.name}\n"
+            + (f"{declarations}\n\n" if declarations else "")
+            + f"float {prefix}eval({arguments}) {{\n"
+            f"{_tidy(rename(self.body), indent=True)}\n"
+            f"    return {rename(self.result)};\n"
+            "}\n"
+        )
+
+
+def shader_fragment(name, source, input_uniforms=()):
+    """Split a per-texel SDF shader into a reusable fragment.
+
+    Args:
+        name: Shader name, used in error messages.
+        source: GLSL source of the shader.
+        input_uniforms: Names of the ``image2D`` inputs read at ``texelPos``.
+
+    Returns:
+        A ``ShaderFragment``.
+
+    Raises:
+        ValueError: If the shader does not follow the per-texel layout.
+    """
+    main = _MAIN.search(source)
+    bounds = _BOUNDS_CHECK.search(source, main.end()) if main else None
+    store = _STORE.search(source, bounds.end()) if bounds else None
+    if store is None:
+        raise ValueError(f"Shader '{name}' does not have a fusable main()")
+
+    inputs = tuple(input_uniforms)
+
+    def load(match):
+        if match.group(1) not in inputs:
+            raise ValueError(f"Shader '{name}' reads unknown image '{match.group(1)}'")
+        return match.group(1)
+
+    declarations = _DIRECTIVE.sub("", source[: main.start()])
+    body = _INPUT_LOAD.sub(load, source[bounds.end() : store.start()])
+    if _UNFUSABLE.search(declarations) or _UNFUSABLE.search(body):
+        raise ValueError(f"Shader '{name}' accesses images outside of texelPos")
+
+    identifiers = set(inputs)
+    for pattern in (_UNIFORM, _CONST, _FUNCTION, _DEFINE):
+        identifiers.update(pattern.findall(declarations))
+
+    return ShaderFragment(
+        name=name,
+        declarations=declarations,
+        body=body,
+        result=store.group(1),
+        inputs=inputs,
+        identifiers=frozenset(identifiers),
+    )
+
+
+def fused_shader_source(shape, read_source):
+    """Generate the compute shader for a fused subgraph.
+
+    Args:
+        shape: Subgraph shape, see the module docstring.
+        read_source: Callable returning the GLSL source for a shader name.
+
+    Returns:
+        GLSL source of a single compute shader.
+    """
+    fragments = {}
+    input_count = 0
+    for _shader, _inputs, args in shape:
+        for kind, index in args:
+            if kind == "input":
+                input_count = max(input_count, index + 1)
+
+    lines = [
+        "#version 430",
+        "",
+        "layout (local_size_x = 16, local_size_y = 16) in;",
+        "",
+        "layout (r32f, binding = 0) writeonly uniform image2D destTex;",
+    ]
+    for index in range(input_count):
+        lines.append(
+            f"layout (r32f, binding = {index + 1}) "
+            f"readonly uniform image2D input{index};"
+        )
+    lines.append("")
+
+    for index, (shader_name, input_uniforms, _args) in enumerate(shape):
+        key = (shader_name, tuple(input_uniforms))
+        if key not in fragments:
+            fragments[key] = shader_fragment(
+                shader_name, read_source(shader_name), input_uniforms
+            )
+        lines.append(fragments[key].instantiate(f"n{index}_"))
+
+    lines.extend(
+        [
+            "void main() {",
+            "    ivec2 texelPos = ivec2(gl_GlobalInvocationID.xy);",
+            "    ivec2 destSize = imageSize(destTex);",
+            "    if (texelPos.x >= destSize.x || texelPos.y >= destSize.y) {",
+            "        return;",
+            "    }",
+            "",
+        ]
+    )
+    for index in range(input_count):
+        lines.append(f"    float i{index} = imageLoad(input{index}, texelPos).r;")
+    for index, (_shader, _inputs, args) in enumerate(shape):
+        arguments = ", ".join(
+            ["texelPos"]
+            + [f"{'v' if kind == 'node' else 'i'}{value}" for kind, value in args]
+        )
+        lines.append(f"    float v{index} = n{index}_eval({arguments});")
+    lines.extend(
+        [
+            "",
+            f"    imageStore(destTex, texelPos, vec4(v{len(shape) - 1}, 0.0, 0.0, 0.0));",
+            "}",
+            "",
+        ]
+    )
+    return "\n".join(lines)
+
+
+def _renamer(identifiers, prefix):
+    if not identifiers:
+        return lambda code: code
+    pattern = re.compile(
+        r"(?<![.\w])(" + "|".join(sorted(map(re.escape, identifiers))) + r")\b"
+    )
+    return lambda code: pattern.sub(lambda match: prefix + match.group(1), code)
+
+
+def _tidy(code, indent=False):
+    code = _BLANK_LINES.sub("\n\n", code).strip("\n")
+    return code if indent else code.strip()
@@ -0,0 +1,144 @@
+"""Multi-channel signed distance fields of flattened outlines.
+
+A single-channel SDF rounds corners off once it is magnified, bilinear
+interpolation of distances cannot represent the sharp edge where two
+outline edges meet. Multi-channel fields color the edges meeting at a
+corner with different pairs of red, green and blue. Each channel stores
+the distance to its own edges, the median of the interpolated channels
+then reconstructs the corner. Sample with ``median``.
+"""
+
+__docformat__ = "google"
+
+import numpy as np
+
+from .segments import SegmentIndex
+
+RED, GREEN, BLUE = 1, 2, 4
+CYAN = GREEN | BLUE
+MAGENTA = RED | BLUE
+YELLOW = RED | GREEN
+WHITE = RED | GREEN | BLUE
+
+
+def median(channels):
+    """Median of the last axis of three channels, as the shaders compute it."""
+    r, g, b = channels[..., 0], channels[..., 1], channels[..., 2]
+    return np.maximum(np.minimum(r, g), np.minimum(np.maximum(r, g), b))
+
+
+def edge_colors(segment_count, corners):
+    """Channel mask of every segment of a closed contour.
+
+    Edges run from one corner to the next. Neighbouring edges share exactly
+    one channel, so the two channels they do not share meet at the corner.
+    Contours without corners are white. The single edge of a contour with
+    one corner is split in three, so its ends still differ at the corner.
+
+    Args:
+        segment_count: Number of segments of the contour.
+        corners: Sorted indices of the points at corners, point ``k`` starts
+            segment ``k``.
+
+    Returns:
+        An int array of channel masks, one per segment.
+    """
+    colors = np.full(segment_count, WHITE, dtype=np.intp)
+    if not len(corners):
+        return colors
+
+    if len(corners) == 1:
+        order = (corners[0] + np.arange(segment_count)) % segment_count
+        thirds = np.minimum(3 * np.arange(segment_count) // segment_count, 2)
+        colors[order] = np.array((MAGENTA, WHITE, YELLOW))[thirds]
+        return colors
+
+    cycle = (CYAN, MAGENTA, YELLOW)
+    edges = [cycle[index % 3] for index in range(len(corners))]
+    if len(corners) % 3 == 1:
+        # The last edge would get the color of the first one.
+        edges[-1] = MAGENTA
+    for index, corner in enumerate(corners):
+        end = corners[(index + 1) % len(corners)]
+        span = (end - corner) % segment_count or segment_count
+        colors[(corner + np.arange(span)) % segment_count] = edges[index]
+    return colors
+
+
+def multi_channel_signed_distance(segments, segment_ends, corners, origin, shape):
+    """Multi-channel signed distance over a pixel grid, negative inside.
+
+    Every channel holds the distance to the segments of its color. Near the
+    ends of an edge, at corners, the distance to the edge's extended line is
+    used instead, signed by the side of the line, which keeps the corner
+    sharp. Pixels where the median would land on the wrong side of the
+    outline get the true signed distance in every channel.
+
+    Args:
+        segments: Array-like of shape (N, 2, 2) of closed contours filled by
+            the nonzero winding rule, as ``sdf_ui.core.fonts.flatten_contours``
+            returns them.
+        segment_ends: End offset of every contour's segments.
+        corners: N booleans, True where a segment starts at a corner.
+        origin: (x, y) coordinate of the first pixel.
+        shape: (height, width) of the grid.
+
+    Returns:
+        A float32 array of ``shape`` + (3,).
+    """
+    height, width = (int(value) for value in shape)
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 2, 2)
+    starts = np.asarray(corners, dtype=bool)
+    colors = np.empty(len(segments), dtype=np.intp)
+    ends = np.zeros(len(segments), dtype=bool)
+    first = 0
+    for last in segment_ends:
+        colors[first:last] = edge_colors(
+            last - first, np.flatnonzero(starts[first:last])
+        )
+        ends[first:last] = np.roll(starts[first:last], -1)
+        first = last
+
+    true_distance = np.zeros((height, width), dtype=np.float32)
+    if len(segments):
+        true_distance = SegmentIndex(segments).signed_distance(origin, shape)
+    inside = true_distance < 0.0
+    field = np.repeat(true_distance[..., None], 3, axis=-1)
+    if not len(segments):
+        return field
+
+    # Nonzero fills lie left of counter-clockwise contours, right of clockwise.
+    (x0, y0), (x1, y1) = segments[:, 0].T, segments[:, 1].T
+    inside_sign = -1.0 if np.sum(x0 * y1 - x1 * y0) > 0.0 else 1.0
+    yy, xx = np.mgrid[0:height, 0:width]
+    points = np.stack((xx, yy), axis=-1) + np.asarray(origin, dtype=np.float64)
+    for channel, bit in enumerate((RED, GREEN, BLUE)):
+        which = np.flatnonzero(colors & bit)
+        if not len(which):
+            continue
+        index = SegmentIndex(segments[which])
+        distance_sq, nearest = index.nearest(origin, shape)
+        distance = np.sqrt(distance_sq)
+        distance[inside] *= -1.0
+
+        delta = index.delta[nearest]
+        length = np.sqrt(index.length_sq[nearest])
+        relative = points - index.start[nearest]
+        t = np.divide(
+            np.einsum("...k,...k->...", relative, delta),
+            length * length,
+            out=np.full_like(length, 0.5),
+            where=length > 0.0,
+        )
+        extended = ((t < 0.0) & starts[which][nearest]) | (
+            (t > 1.0) & ends[which][nearest]
+        )
+        cross = delta[..., 0] * relative[..., 1] - delta[..., 1] * relative[..., 0]
+        line_distance = np.divide(
+            inside_sign * cross, length, out=np.zeros_like(length), where=extended
+        )
+        field[..., channel] = np.where(extended, line_distance, distance)
+
+    wrong = (median(field) < 0.0) != inside
+    field[wrong] = true_distance[wrong, None]
+    return field
@@ -6,13 +6,26 @@ from ..log import logger
 from .context import Context
 
 
-def run_shader(ctx: Context, shader_name: str, *, uniforms=None, image_bindings=None):
+def run_shader(
+    ctx: Context,
+    shader_name: str,
+    *,
+    uniforms=None,
+    image_bindings=None,
+    buffer_bindings=None,
+    program=None,
+    size=None,
+):
     """Bind uniforms/images and execute a compute shader for the context size.
 
     image_bindings maps texture objects to ModernGL image binding options. Each
-    value is a tuple of (texture, location, read, write).
+    value is a tuple of (texture, location, read, write). buffer_bindings is a
+    sequence of (buffer, binding) storage buffers. An already compiled
+    program (e.g. a fused shader) can be passed in, shader_name is then only
+    used for stats and logging. size is the (width, height) to dispatch for
+    when the destination is smaller than the context.
     """
-    shader = ctx.get_shader(shader_name)
+    shader = ctx.get_shader(shader_name) if program is None else program
 
     for name, value in (uniforms or {}).items():
         shader[name] = value
@@ -20,8 +33,13 @@ def run_shader(ctx: Context, shader_name: str, *, uniforms=None, image_bindings=
     for texture, location, read, write in image_bindings or ():
         texture.bind_to_image(location, read=read, write=write)
 
+    for buffer, binding in buffer_bindings or ():
+        buffer.bind_to_storage_buffer(binding)
+
     dispatch_groups = getattr(ctx, "dispatch_groups", None)
-    if dispatch_groups is None:
+    if size is not None:
+        dispatch_groups = ctx.dispatch_config.groups_for_size(size)
+    elif dispatch_groups is None:
         dispatch_groups = ctx.local_size
     stats = getattr(ctx, "_active_render_stats", None)
     if stats is not None:
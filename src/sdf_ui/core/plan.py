@@ -0,0 +1,317 @@
+"""Compiled render plans that replay a graph with new ``param()`` values.
+
+``Renderer.compile(node)`` splits a graph into the part that is fixed and the
+part that depends on ``param()`` expressions. Fixed subgraphs are rendered
+once while compiling. Every remaining node becomes a step:
+
+- shader-backed and fused nodes keep their program, uniforms that do not
+  change, the ``make_uniforms`` of params that do, their input slots and an
+  output texture that is reused by every run;
+- nodes rendered by Python (``render_func`` plugins) call their plugin again
+  with the textures of their input slots. Render nodes passed as params,
+  like the layers of ``stack``, get slots too.
+
+``plan.run(params)`` only executes steps whose ``param()`` dependencies
+changed since the previous run and returns the root texture. Outputs of
+shader steps are overwritten in place, read or copy a result before running
+the plan again.
+
+Example:
+>>> with Canvas((640, 360)) as ctx:
+...     scene = sdf.circle((param("x"), 180), 40).fill("#62bb47", "#ffffff")
+...     plan = ctx.compile(scene)
+...     for frame in range(60):
+...         image = plan.run({"x": 100 + frame * 5})
+"""
+
+__docformat__ = "google"
+
+from time import perf_counter
+
+from .texture import _MISSING, Renderer, TextureNode, _static_value, node_digest
+
+
+class RenderPlan:
+    """A render graph flattened into a list of replayable steps."""
+
+    def __init__(self, renderer, steps, output, param_names):
+        self.renderer = renderer
+        self.steps = tuple(steps)
+        self.param_names = param_names
+        self._output = output
+        self._base_params = dict(renderer.params)
+        self._last_values = None
+
+    def __len__(self):
+        return len(self.steps)
+
+    def run(self, params=None):
+        """Execute the plan with ``params`` layered over the compile-time params.
+
+        Args:
+            params: Values for ``param()`` expressions.
+
+        Returns:
+            The rendered root texture (or tuple of textures).
+        """
+        renderer = self.renderer
+        ctx = renderer.ctx
+        values = {**self._base_params, **(params or {})}
+        current = {
+            name: _static_value(values.get(name, _MISSING), set())
+            for name in self.param_names
+        }
+        changed = None
+        if self._last_values is not None:
+            changed = {
+                name
+                for name, value in current.items()
+                if self._last_values.get(name, _MISSING) != value
+            }
+
+        start = perf_counter()
+        activate = getattr(ctx, "activate", None)
+        if callable(activate):
+            activate()
+        previous_stats = getattr(ctx, "_active_render_stats", None)
+        ctx._active_render_stats = renderer.stats
+        renderer.stats.render_calls += 1
+        previous_params, renderer.params = renderer.params, values
+        try:
+            for step in self.steps:
+                if changed is None or not step.param_names.isdisjoint(changed):
+                    step.run(renderer)
+        finally:
+            renderer.params = previous_params
+            renderer.stats.elapsed_seconds += perf_counter() - start
+            ctx._active_render_stats = previous_stats
+            ctx.last_render_stats = renderer.stats
+
+        self._last_values = current
+        return self._output.value
+
+
+class _Slot:
+    __slots__ = ("value",)
+
+    def __init__(self, value=None):
+        self.value = value
+
+
+class _ShaderStep:
+    """One dispatch with a fixed program, output texture and input slots."""
+
+    def __init__(
+        self, shader_name, result, mode, inputs, static_uniforms, dynamic, names
+    ):
+        self.shader_name = shader_name
+        self.result = result
+        self.mode = mode
+        self.inputs = tuple(inputs)
+        self.static_uniforms = static_uniforms
+        self.dynamic = tuple(dynamic)
+        self.param_names = names
+        self.output = _Slot()
+        self.program = None
+        self.fused_shape = None
+
+    def run(self, renderer):
+        from sdf_ui.core.operations import run_shader
+
+        ctx = renderer.ctx
+        if self.output.value is None:
+            self._allocate(ctx)
+
+        uniforms = dict(self.static_uniforms)
+        for prefix, params, make_uniforms in self.dynamic:
+            values = {key: renderer._resolve(value) for key, value in params}
+            for name, value in make_uniforms(values).items():
+                uniforms[prefix + name] = value
+
+        image_bindings = [(self.output.value.tex, 0, False, True)]
+        for location, slot in enumerate(self.inputs, start=1):
+            image_bindings.append((slot.value.tex, location, True, False))
+
+        run_shader(
+            ctx,
+            self.shader_name,
+            uniforms=uniforms,
+            image_bindings=image_bindings,
+            program=self.program,
+        )
+        if self.fused_shape is not None:
+            renderer.stats.fused_nodes += len(self.fused_shape)
+
+    def _allocate(self, ctx):
+        from sdf_ui.core.color import ColorSpaceMode, ColorTexture
+        from sdf_ui.core.plugins.base import TextureKind
+        from sdf_ui.core.sdf import SDFTexture
+
+        if self.result == TextureKind.SDF:
+            self.output.value = SDFTexture(tex=ctx.r32f(), context=ctx)
+        else:
+            mode = self.mode
+            if mode is None and self.inputs:
+                mode = getattr(self.inputs[0].value, "mode", None)
+            self.output.value = ColorTexture(
+                tex=ctx.rgba8(), context=ctx, mode=mode or ColorSpaceMode.LAB
+            )
+        # Allocating the first SDF texture may switch the context to r16f
+        # shaders, so programs are looked up afterwards.
+        if self.fused_shape is not None:
+            self.program = ctx.get_fused_shader(self.fused_shape)
+        else:
+            self.program = ctx.get_shader(self.shader_name)
+
+
+class _NodeStep:
+    """A node rendered by its plugin's Python code on every run."""
+
+    def __init__(self, plugin, params, inputs, names):
+        self.plugin = plugin
+        self.params = params
+        self.inputs = tuple(inputs)
+        self.param_names = names
+        self.output = _Slot()
+
+    def run(self, renderer):
+        # A one-shot renderer keeps helper graphs of this run out of the
+        # plan's cache; stats are shared so the run is reported as a whole.
+        session = Renderer(renderer.ctx, params=renderer.params)
+        session.stats = renderer.stats
+        inputs = tuple(slot.value for slot in self.inputs)
+        params = {
+            key: session._resolve(_slot_values(value)) for key, value in self.params
+        }
+        self.output.value = self.plugin.render(session, inputs, params)
+
+
+def _slot_values(value):
+    if isinstance(value, _Slot):
+        return value.value
+    if isinstance(value, (list, tuple)):
+        return type(value)(_slot_values(item) for item in value)
+    return value
+
+
+class _PlanBuilder:
+    def __init__(self, renderer):
+        self.renderer = renderer
+        self.steps = []
+        self.constants = []
+        self._slots = {}
+
+    def slot(self, node):
+        renderer = self.renderer
+        if getattr(node, "tex", None) is not None:
+            return _Slot(node)
+
+        key = renderer._node_key(node)
+        if key in self._slots:
+            return self._slots[key]
+
+        names = node_digest(node).param_names
+        if not names:
+            slot = _Slot()
+            self.constants.append((slot, node))
+        else:
+            step = self._step(node, names)
+            self.steps.append(step)
+            slot = step.output
+
+        self._slots[key] = slot
+        return slot
+
+    def _step(self, node, names):
+        from sdf_ui.core.plugins.registry import registry
+
+        renderer = self.renderer
+        plugin = registry.get(node.op)
+
+        region = renderer._fusion_region(node, plugin)
+        if region is not None:
+            members, shape, externals = region
+            inputs = [self.slot(child) for child in externals]
+            static_uniforms = {"destTex": 0}
+            static_uniforms.update(
+                {f"input{index}": index + 1 for index in range(len(externals))}
+            )
+            dynamic = []
+            for index, (member, member_plugin) in enumerate(members):
+                self._uniforms(
+                    member, member_plugin, f"n{index}_", static_uniforms, dynamic
+                )
+            step = _ShaderStep(
+                "fused_sdf",
+                plugin.result,
+                None,
+                inputs,
+                static_uniforms,
+                dynamic,
+                names,
+            )
+            step.fused_shape = shape
+            return step
+
+        inputs = [self.slot(child) for child in node.inputs]
+        if plugin.render_func is None and plugin.shader is not None:
+            static_uniforms = {"destTex": 0}
+            static_uniforms.update(
+                {
+                    uniform: location
+                    for location, uniform in enumerate(plugin.input_uniforms, start=1)
+                }
+            )
+            dynamic = []
+            self._uniforms(node, plugin, "", static_uniforms, dynamic)
+            return _ShaderStep(
+                plugin.shader.name,
+                plugin.result,
+                plugin.mode,
+                inputs,
+                static_uniforms,
+                dynamic,
+                names,
+            )
+
+        params = tuple((key, self._slot_params(value)) for key, value in node.params)
+        return _NodeStep(plugin, params, inputs, names)
+
+    def _slot_params(self, value):
+        # Texture params are rendered by their own steps, or once while
+        # compiling, instead of again by the plugin on every run.
+        if isinstance(value, TextureNode):
+            return self.slot(value)
+        if isinstance(value, (list, tuple)):
+            return type(value)(self._slot_params(item) for item in value)
+        return value
+
+    def _uniforms(self, node, plugin, prefix, static_uniforms, dynamic):
+        if plugin.make_uniforms is None:
+            return
+
+        names = set()
+        for _key, value in node.params:
+            _static_value(value, names)
+        if names:
+            dynamic.append((prefix, node.params, plugin.make_uniforms))
+            return
+
+        renderer = self.renderer
+        params = {key: renderer._resolve(value) for key, value in node.params}
+        for name, value in plugin.make_uniforms(params).items():
+            static_uniforms[prefix + name] = value
+
+
+def compile_plan(renderer, node):
+    """Build a ``RenderPlan`` for ``node``, see ``Renderer.compile``."""
+    renderer._plan_liveness(node)
+    try:
+        builder = _PlanBuilder(renderer)
+        output = builder.slot(node)
+    finally:
+        renderer._reset_liveness()
+
+    for slot, constant in builder.constants:
+        slot.value = renderer.render(constant)
+    return RenderPlan(renderer, builder.steps, output, node_digest(node).param_names)
@@ -1,8 +1,13 @@
 __docformat__ = "google"
 
+import sys
+import warnings
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Callable, Optional
 
+_PACKAGE_DIR = str(Path(__file__).resolve().parents[2])
+
 
 class TextureKind:
     SDF = "sdf"
@@ -39,6 +44,11 @@ class Plugin:
     public: bool = False
     method_of: tuple = ()
     render_func: Optional[Callable] = None
+    fusable: bool = False
+    input_mode: Optional[str] = None
+    mode_agnostic: bool = False
+    # Removed parameters that are still accepted, with what replaced them.
+    deprecated_params: Optional[dict] = None
 
     def bind(self, args, kwargs):
         if len(args) < len(self.input_kinds):
@@ -52,7 +62,17 @@ class Plugin:
             raise TypeError(f"{self.name} got too many positional arguments")
 
         params = dict(zip(self.params, param_args))
+        deprecated = self.deprecated_params or {}
         for key, value in kwargs.items():
+            if key in deprecated:
+                if value is not None:
+                    warnings.warn(
+                        f"{self.name} parameter '{key}' is deprecated and ignored, "
+                        f"{deprecated[key]}",
+                        DeprecationWarning,
+                        stacklevel=_caller_stacklevel(),
+                    )
+                continue
             if key not in self.params:
                 raise TypeError(f"{self.name} got an unexpected parameter '{key}'")
             if key in params:
@@ -109,3 +129,13 @@ class Plugin:
         if mode is None and inputs and hasattr(inputs[0], "mode"):
             mode = inputs[0].mode
         return ColorTexture(tex=tex, context=ctx, mode=mode or ColorSpaceMode.LAB)
+
+
+def _caller_stacklevel():
+    """``stacklevel`` of the first caller outside of this package."""
+    frame = sys._getframe(1)
+    level = 1
+    while frame is not None and frame.f_code.co_filename.startswith(_PACKAGE_DIR):
+        frame = frame.f_back
+        level += 1
+    return level
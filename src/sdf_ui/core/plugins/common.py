@@ -31,6 +31,16 @@ def colors(*names):
     return lambda values: {name: color(values[name]) for name in names}
 
 
+def cpu_compositing(renderer):
+    """Whether plugins with a NumPy path should use it instead of a shader.
+
+    Layer plugins blend on the CPU and ``mask_to_sdf`` runs an exact distance
+    transform. The NumPy paths are kept as a reference and a fallback for
+    drivers with broken image load/store, see ``Context.cpu_compositing``.
+    """
+    return getattr(renderer.ctx, "cpu_compositing", False)
+
+
 def ensure_rgb(renderer, texture):
     from sdf_ui.core.color import ColorSpaceMode
 
@@ -86,15 +96,16 @@ def rgb_texture_from_array(ctx, pixels):
     return ColorTexture(tex=tex, context=ctx, mode=ColorSpaceMode.RGB)
 
 
-def blur_pass(ctx, shader_name, dest, src):
+def blur_pass(ctx, shader_name, dest, src, *, uniforms=None, size=None):
     from sdf_ui.core.operations import run_shader
 
     run_shader(
         ctx,
         shader_name,
-        uniforms={"destTex": 0, "origTex": 1},
+        uniforms={"destTex": 0, "origTex": 1, **(uniforms or {})},
         image_bindings=(
             (dest, 0, False, True),
             (src.tex if hasattr(src, "tex") else src, 1, True, False),
         ),
+        size=size,
     )
@@ -2,7 +2,9 @@ __docformat__ = "google"
 
 from sdf_ui.core.plugins.base import Plugin, PluginFamily, TextureKind
 from sdf_ui.core.plugins.common import (
+    cpu_compositing,
     ensure_rgb,
+    render_rgb_shader,
     rgb_texture_from_array,
     rgba_array,
     shader,
@@ -10,6 +12,15 @@ from sdf_ui.core.plugins.common import (
 
 
 def render_alpha_overlay(renderer, inputs, params):
+    if cpu_compositing(renderer):
+        return render_alpha_overlay_cpu(renderer, inputs, params)
+    base, top = inputs
+    return render_rgb_shader(
+        renderer, "overlay", (top, base), image_uniforms=("tex0", "tex1")
+    )
+
+
+def render_alpha_overlay_cpu(renderer, inputs, params):
     import numpy as np
 
     base = rgba_array(ensure_rgb(renderer, inputs[0])).astype(np.float32) / 255.0
@@ -37,6 +48,7 @@ def register_plugins(registry):
             shader=shader("overlay", "plugins/layer/alpha_overlay/shader.glsl"),
             input_uniforms=("tex1", "tex0"),
             mode="RGB",
+            input_mode="RGB",
             render_func=render_alpha_overlay,
             method_of=(TextureKind.COLOR,),
         )
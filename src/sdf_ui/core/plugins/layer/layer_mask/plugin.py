@@ -2,7 +2,9 @@ __docformat__ = "google"
 
 from sdf_ui.core.plugins.base import Plugin, PluginFamily, TextureKind
 from sdf_ui.core.plugins.common import (
+    cpu_compositing,
     ensure_rgb,
+    render_rgb_shader,
     rgb_texture_from_array,
     rgba_array,
     shader,
@@ -10,6 +12,14 @@ from sdf_ui.core.plugins.common import (
 
 
 def render_layer_mask(renderer, inputs, params):
+    if cpu_compositing(renderer):
+        return render_layer_mask_cpu(renderer, inputs, params)
+    return render_rgb_shader(
+        renderer, "layer_mask", inputs, image_uniforms=("tex0", "tex1", "mask")
+    )
+
+
+def render_layer_mask_cpu(renderer, inputs, params):
     import numpy as np
 
     first = rgba_array(ensure_rgb(renderer, inputs[0])).astype(np.float32)
@@ -30,6 +40,7 @@ def register_plugins(registry):
             shader=descriptor,
             input_uniforms=("tex0", "tex1", "mask"),
             mode="RGB",
+            input_mode="RGB",
             render_func=render_layer_mask,
             method_of=(TextureKind.COLOR,),
         )
@@ -43,6 +54,7 @@ def register_plugins(registry):
             shader=descriptor,
             input_uniforms=("tex0", "tex1", "mask"),
             mode="RGB",
+            input_mode="RGB",
             render_func=render_layer_mask,
             method_of=(TextureKind.COLOR,),
         )
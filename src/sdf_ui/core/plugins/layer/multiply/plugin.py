@@ -2,7 +2,9 @@ __docformat__ = "google"
 
 from sdf_ui.core.plugins.base import Plugin, PluginFamily, TextureKind
 from sdf_ui.core.plugins.common import (
+    cpu_compositing,
     ensure_rgb,
+    render_rgb_shader,
     rgb_texture_from_array,
     rgba_array,
     shader,
@@ -10,6 +12,14 @@ from sdf_ui.core.plugins.common import (
 
 
 def render_multiply(renderer, inputs, params):
+    if cpu_compositing(renderer):
+        return render_multiply_cpu(renderer, inputs, params)
+    return render_rgb_shader(
+        renderer, "multiply", inputs, image_uniforms=("mask1", "mask2")
+    )
+
+
+def render_multiply_cpu(renderer, inputs, params):
     import numpy as np
 
     first = rgba_array(ensure_rgb(renderer, inputs[0])).astype(np.float32) / 255.0
@@ -27,6 +37,7 @@ def register_plugins(registry):
             shader=shader("multiply", "plugins/layer/multiply/shader.glsl"),
             input_uniforms=("mask1", "mask2"),
             mode="RGB",
+            input_mode="RGB",
             render_func=render_multiply,
             method_of=(TextureKind.COLOR,),
         )
@@ -0,0 +1,154 @@
+__docformat__ = "google"
+
+from numbers import Real
+
+from sdf_ui.core.plugins.base import Plugin, PluginFamily, TextureKind
+from sdf_ui.core.plugins.common import cpu_compositing, ensure_rgb, shader
+
+MAX_STACK_LAYERS = 7
+"""Layers composited by one dispatch, longer stacks take several."""
+
+BLEND_MODES = {
+    "normal": 0,
+    "multiply": 1,
+    "screen": 2,
+    "add": 3,
+    "darken": 4,
+    "lighten": 5,
+    "overlay": 6,
+}
+
+
+def _per_layer(name, value, count):
+    # numbers.Real also covers NumPy scalars such as np.float32.
+    if isinstance(value, (str, Real)):
+        return (value,) * count
+    values = tuple(value)
+    if len(values) != count:
+        raise ValueError(f"stack got {len(values)} {name} for {count} layers")
+    return values
+
+
+def _layer_settings(params):
+    layers = tuple(params["layers"])
+    if not layers:
+        raise ValueError("stack requires at least one layer")
+    for index, layer in enumerate(layers):
+        if getattr(layer, "kind", None) != TextureKind.COLOR:
+            raise TypeError(f"stack layer {index} should be color, got {type(layer)}")
+
+    modes = _per_layer("blend modes", params["blend_modes"], len(layers))
+    for mode in modes:
+        if mode not in BLEND_MODES:
+            known = ", ".join(BLEND_MODES)
+            raise ValueError(f"Unknown blend mode '{mode}'. Known modes: {known}")
+    opacities = _per_layer("opacities", params["opacities"], len(layers))
+    return layers, tuple(BLEND_MODES[mode] for mode in modes), opacities
+
+
+def render_stack(renderer, inputs, params):
+    if cpu_compositing(renderer):
+        return render_stack_cpu(renderer, inputs, params)
+
+    from sdf_ui.core.color import ColorSpaceMode, ColorTexture
+    from sdf_ui.core.operations import run_shader
+
+    ctx = renderer.ctx
+    layers, modes, opacities = _layer_settings(params)
+    textures = [ensure_rgb(renderer, layer).tex for layer in layers]
+    modes, opacities = list(modes), [float(opacity) for opacity in opacities]
+
+    # Each dispatch after the first composites onto the previous result.
+    previous = None
+    while textures:
+        count = MAX_STACK_LAYERS - (previous is not None)
+        chunk = textures[:count]
+        chunk_modes = modes[:count]
+        chunk_opacities = opacities[:count]
+        del textures[:count], modes[:count], opacities[:count]
+        if previous is not None:
+            chunk.insert(0, previous)
+            chunk_modes.insert(0, BLEND_MODES["normal"])
+            chunk_opacities.insert(0, 1.0)
+
+        padding = MAX_STACK_LAYERS - len(chunk)
+        tex = ctx.rgba8()
+        image_bindings = [(tex, 0, False, True)]
+        for location, layer_tex in enumerate(chunk + chunk[:1] * padding, start=1):
+            image_bindings.append((layer_tex, location, True, False))
+        run_shader(
+            ctx,
+            "stack",
+            uniforms={
+                "layer_count": len(chunk),
+                "blend_modes": chunk_modes + [0] * padding,
+                "opacities": chunk_opacities + [0.0] * padding,
+            },
+            image_bindings=image_bindings,
+        )
+        if previous is not None:
+            ctx.recycle_texture(previous)
+        previous = tex
+
+    return ColorTexture(tex=previous, context=ctx, mode=ColorSpaceMode.RGB)
+
+
+def render_stack_cpu(renderer, inputs, params):
+    import numpy as np
+
+    from sdf_ui.core.plugins.common import rgb_texture_from_array, rgba_array
+
+    layers, modes, opacities = _layer_settings(params)
+    result = None
+    for layer, mode, opacity in zip(layers, modes, opacities):
+        top = rgba_array(ensure_rgb(renderer, layer)).astype(np.float32) / 255.0
+        if result is None:
+            result = np.zeros_like(top)
+        base, base_alpha = result[..., :3], result[..., 3:4]
+        rgb, alpha = top[..., :3], top[..., 3:4] * opacity
+
+        if mode == BLEND_MODES["multiply"]:
+            blended = base * rgb
+        elif mode == BLEND_MODES["screen"]:
+            blended = base + rgb - base * rgb
+        elif mode == BLEND_MODES["add"]:
+            blended = np.minimum(base + rgb, 1.0)
+        elif mode == BLEND_MODES["darken"]:
+            blended = np.minimum(base, rgb)
+        elif mode == BLEND_MODES["lighten"]:
+            blended = np.maximum(base, rgb)
+        elif mode == BLEND_MODES["overlay"]:
+            blended = np.where(
+                base < 0.5, 2.0 * base * rgb, 1.0 - 2.0 * (1.0 - base) * (1.0 - rgb)
+            )
+        else:
+            blended = rgb
+        rgb = (1.0 - base_alpha) * rgb + base_alpha * blended
+
+        composite_alpha = alpha + (1.0 - alpha) * base_alpha
+        composite = np.zeros_like(rgb)
+        np.divide(
+            rgb * alpha + base * (1.0 - alpha) * base_alpha,
+            composite_alpha,
+            out=composite,
+            where=composite_alpha > 0.0,
+        )
+        result = np.dstack((composite, composite_alpha[..., 0]))
+    return rgb_texture_from_array(renderer.ctx, result * 255.0)
+
+
+def register_plugins(registry):
+    registry.register(
+        Plugin(
+            "stack",
+            PluginFamily.LAYER,
+            TextureKind.COLOR,
+            params=("layers", "blend_modes", "opacities"),
+            defaults={"blend_modes": "normal", "opacities": 1.0},
+            shader=shader("stack", "plugins/layer/stack/shader.glsl"),
+            mode="RGB",
+            input_mode="RGB",
+            render_func=render_stack,
+            public=True,
+        )
+    )
@@ -0,0 +1,68 @@
+#version 430
+
+#define MAX_LAYERS 7
+
+layout (local_size_x = 16, local_size_y = 16) in;
+
+layout (rgba8, binding = 0) writeonly uniform image2D destTex;
+layout (rgba8, binding = 1) readonly uniform image2D layers[MAX_LAYERS];
+
+uniform int layer_count;
+uniform int blend_modes[MAX_LAYERS];
+uniform float opacities[MAX_LAYERS];
+
+// Separable blend modes of the W3C compositing spec, cb is the backdrop.
+vec3 blend(int mode, vec3 cb, vec3 cs) {
+    if (mode == 1) {
+        return cb * cs;
+    }
+    if (mode == 2) {
+        return cb + cs - cb * cs;
+    }
+    if (mode == 3) {
+        return min(cb + cs, vec3(1.0));
+    }
+    if (mode == 4) {
+        return min(cb, cs);
+    }
+    if (mode == 5) {
+        return max(cb, cs);
+    }
+    if (mode == 6) {
+        vec3 low = 2.0 * cb * cs;
+        vec3 high = 1.0 - 2.0 * (1.0 - cb) * (1.0 - cs);
+        return mix(low, high, step(0.5, cb));
+    }
+    return cs;
+}
+
+void main() {
+    ivec2 texelPos = ivec2(gl_GlobalInvocationID.xy);
+    ivec2 destSize = imageSize(destTex);
+    if (texelPos.x >= destSize.x || texelPos.y >= destSize.y) {
+        return;
+    }
+
+    vec4 result = vec4(0.0);
+
+    for (int i = 0; i < MAX_LAYERS; i++) {
+        if (i >= layer_count) {
+            break;
+        }
+
+        vec4 layer = imageLoad(layers[i], texelPos);
+        float alpha = layer.a * opacities[i];
+        vec3 col = mix(layer.rgb, blend(blend_modes[i], result.rgb, layer.rgb), result.a);
+
+        float ac = alpha + (1.0 - alpha) * result.a;
+        vec3 rgb = vec3(0.0);
+
+        if (ac > 0.0) {
+            rgb = (col * alpha + result.rgb * (1.0 - alpha) * result.a) / ac;
+        }
+
+        result = vec4(rgb, ac);
+    }
+
+    imageStore(destTex, texelPos, result);
+}
@@ -15,6 +15,7 @@ def register_plugins(registry):
             shader=shader("transparency", "plugins/layer/transparency/shader.glsl"),
             input_uniforms=("tex0",),
             make_uniforms=params("alpha"),
+            mode_agnostic=True,
             method_of=(TextureKind.COLOR,),
         )
     )
@@ -0,0 +1,25 @@
+#version 430
+
+layout (local_size_x = 16, local_size_y = 16) in;
+
+layout (rgba8, binding = 0) writeonly uniform image2D destTex;
+layout (rgba8, binding = 1) readonly uniform image2D origTex;
+
+// Halves the resolution, every texel is the mean of a 2x2 block.
+void main() {
+    ivec2 texelPos = ivec2(gl_GlobalInvocationID.xy);
+    ivec2 destSize = imageSize(destTex);
+    if (texelPos.x >= destSize.x || texelPos.y >= destSize.y) {
+        return;
+    }
+
+    ivec2 last = imageSize(origTex) - 1;
+    ivec2 src = texelPos * 2;
+
+    vec4 col = imageLoad(origTex, min(src, last));
+    col += imageLoad(origTex, min(src + ivec2(1, 0), last));
+    col += imageLoad(origTex, min(src + ivec2(0, 1), last));
+    col += imageLoad(origTex, min(src + ivec2(1, 1), last));
+
+    imageStore(destTex, texelPos, col * 0.25);
+}
@@ -0,0 +1,34 @@
+#version 430
+
+layout (local_size_x = 16, local_size_y = 16) in;
+
+layout (rgba8, binding = 0) writeonly uniform image2D destTex;
+layout (rgba8, binding = 1) readonly uniform image2D origTex;
+
+// One separable pass, direction is (1, 0) or (0, 1).
+uniform ivec2 direction;
+uniform float sigma;
+uniform int radius;
+
+void main() {
+    ivec2 texelPos = ivec2(gl_GlobalInvocationID.xy);
+    ivec2 destSize = imageSize(destTex);
+    if (texelPos.x >= destSize.x || texelPos.y >= destSize.y) {
+        return;
+    }
+
+    ivec2 last = imageSize(origTex) - 1;
+    float k = -0.5 / (sigma * sigma);
+
+    vec4 col = imageLoad(origTex, texelPos);
+    float total = 1.0;
+
+    for (int i = 1; i <= radius; i++) {
+        float weight = exp(k * float(i * i));
+        col += imageLoad(origTex, clamp(texelPos + direction * i, ivec2(0), last)) * weight;
+        col += imageLoad(origTex, clamp(texelPos - direction * i, ivec2(0), last)) * weight;
+        total += 2.0 * weight;
+    }
+
+    imageStore(destTex, texelPos, col / total);
+}
@@ -0,0 +1,31 @@
+#version 430
+
+layout (local_size_x = 16, local_size_y = 16) in;
+
+layout (rgba8, binding = 0) writeonly uniform image2D destTex;
+layout (rgba8, binding = 1) readonly uniform image2D origTex;
+
+// Source texels per destination texel.
+uniform float scale;
+
+// Bilinear upsampling of origTex to the size of destTex.
+void main() {
+    ivec2 texelPos = ivec2(gl_GlobalInvocationID.xy);
+    ivec2 destSize = imageSize(destTex);
+    if (texelPos.x >= destSize.x || texelPos.y >= destSize.y) {
+        return;
+    }
+
+    ivec2 last = imageSize(origTex) - 1;
+    vec2 pos = (vec2(texelPos) + 0.5) * scale - 0.5;
+    vec2 base = floor(pos);
+    vec2 f = pos - base;
+
+    ivec2 p0 = clamp(ivec2(base), ivec2(0), last);
+    ivec2 p1 = clamp(ivec2(base) + 1, ivec2(0), last);
+
+    vec4 top = mix(imageLoad(origTex, p0), imageLoad(origTex, ivec2(p1.x, p0.y)), f.x);
+    vec4 bottom = mix(imageLoad(origTex, ivec2(p0.x, p1.y)), imageLoad(origTex, p1), f.x);
+
+    imageStore(destTex, texelPos, mix(top, bottom, f.y));
+}
@@ -1,12 +1,55 @@
 __docformat__ = "google"
 
+import math
+
 from sdf_ui.core.plugins.base import Plugin, PluginFamily, TextureKind
 from sdf_ui.core.plugins.common import blur_pass, shader
 
+# Variance in pixels² of one pass of the 9 and 13 tap kernels.
+KERNEL_VARIANCE = {9: 2.854054, 13: 3.5}
+
+LEVEL_SIGMA = 2.0
+"""Smallest sigma in texels the Gaussian pass of a pyramid level blurs with."""
+
+MIN_LEVEL_SIZE = 8
+
+
+def blur_sigma(n, base=9):
+    """Return the sigma in pixels of ``blur(n, base)``.
+
+    Example:
+    >>> texture.blur(sigma=blur_sigma(40))  # looks like texture.blur(40)
+    """
+    return math.sqrt(KERNEL_VARIANCE[13 if base == 13 else 9] * (n + 1))
+
+
+def pyramid_levels(sigma, size):
+    """Plan a Gaussian blur of ``sigma`` pixels on a texture of ``size``.
+
+    Every level halves the resolution with a 2x2 box filter until the blur
+    left to do is a few texels wide. After the Gaussian passes on the
+    smallest level, each level is upsampled bilinearly. The box and
+    bilinear filters blur as well, their variance is subtracted from the
+    Gaussian's.
+
+    Returns:
+        The number of levels and the sigma of the Gaussian in texels of
+        the smallest level.
+    """
+    width, height = size
+    levels = 0
+    while (
+        sigma >= LEVEL_SIGMA * 2 ** (levels + 1)
+        and min(width, height) >> (levels + 1) >= MIN_LEVEL_SIZE
+    ):
+        levels += 1
+    scale = 4**levels
+    variance = sigma * sigma - (scale - 1) / 12 - (scale - 1) / 9
+    return levels, math.sqrt(max(variance, 0.0) / scale)
+
 
 def render_blur_9(renderer, inputs, params):
     from sdf_ui.core.color import ColorTexture
-    from sdf_ui.core.context import decrease_tex_registry
 
     ctx = renderer.ctx
     tex0 = ctx.rgba8()
@@ -19,14 +62,12 @@ def render_blur_9(renderer, inputs, params):
         blur_pass(ctx, "blur_ver_9", tex0, tex1)
         blur_pass(ctx, "blur_hor_9", tex1, tex0)
 
-    tex0.release()
-    decrease_tex_registry()
+    ctx.recycle_texture(tex0)
     return ColorTexture(tex=tex1, context=ctx, mode=inputs[0].mode)
 
 
 def render_blur_13(renderer, inputs, params):
     from sdf_ui.core.color import ColorTexture
-    from sdf_ui.core.context import decrease_tex_registry
 
     ctx = renderer.ctx
     tex0 = ctx.rgba8()
@@ -39,11 +80,58 @@ def render_blur_13(renderer, inputs, params):
         blur_pass(ctx, "blur_ver_13", tex0, tex1)
         blur_pass(ctx, "blur_hor_13", tex1, tex0)
 
-    tex0.release()
-    decrease_tex_registry()
+    ctx.recycle_texture(tex0)
     return ColorTexture(tex=tex1, context=ctx, mode=inputs[0].mode)
 
 
+def render_gaussian_blur(renderer, inputs, params):
+    from sdf_ui.core.color import ColorTexture
+
+    ctx = renderer.ctx
+    texture = inputs[0]
+    sizes = [tuple(texture.tex.size)]
+    levels, level_sigma = pyramid_levels(float(params["sigma"]), sizes[0])
+    for _ in range(levels):
+        width, height = sizes[-1]
+        sizes.append(((width + 1) // 2, (height + 1) // 2))
+
+    def level_pass(shader_name, src, size, uniforms=None):
+        dest = ctx.rgba8(size)
+        blur_pass(
+            ctx,
+            shader_name,
+            dest,
+            src,
+            uniforms=uniforms,
+            size=size if size != sizes[0] else None,
+        )
+        if src is not texture.tex:
+            ctx.recycle_texture(src)
+        return dest
+
+    current = texture.tex
+    for size in sizes[1:]:
+        current = level_pass("blur_down", current, size)
+
+    radius = min(math.ceil(3.0 * level_sigma), max(sizes[-1]))
+    for direction in ((1, 0), (0, 1)):
+        current = level_pass(
+            "blur_gaussian",
+            current,
+            sizes[-1],
+            {
+                "direction": direction,
+                "sigma": max(level_sigma, 1e-3),
+                "radius": radius,
+            },
+        )
+
+    for size in reversed(sizes[:-1]):
+        current = level_pass("blur_up", current, size, {"scale": 0.5})
+
+    return ColorTexture(tex=current, context=ctx, mode=texture.mode)
+
+
 def render_blur(renderer, inputs, params):
     from sdf_ui.core.plugins.registry import registry
 
@@ -53,8 +141,13 @@ def render_blur(renderer, inputs, params):
         if texture.mode == "RGB"
         else renderer.render(registry.build("to_rgb", texture))
     )
-    base = 13 if params["base"] == 13 else 9
-    blurred = renderer.render(registry.build(f"blur_{base}", rgb, n=params["n"]))
+    if params["sigma"] is not None:
+        blurred = renderer.render(
+            registry.build("gaussian_blur", rgb, sigma=params["sigma"])
+        )
+    else:
+        base = 13 if params["base"] == 13 else 9
+        blurred = renderer.render(registry.build(f"blur_{base}", rgb, n=params["n"]))
     if texture.mode == "RGB":
         return blurred
     return renderer.render(registry.build("to_lab", blurred))
@@ -93,14 +186,33 @@ def register_plugins(registry):
             method_of=(TextureKind.COLOR,),
         )
     )
+    registry.register(
+        Plugin(
+            "gaussian_blur",
+            PluginFamily.POSTPROCESSING,
+            TextureKind.COLOR,
+            (TextureKind.COLOR,),
+            params=("sigma",),
+            extra_shaders=(
+                shader("blur_down", "plugins/postprocessing/blur/blur_down.glsl"),
+                shader("blur_up", "plugins/postprocessing/blur/blur_up.glsl"),
+                shader(
+                    "blur_gaussian", "plugins/postprocessing/blur/blur_gaussian.glsl"
+                ),
+            ),
+            render_func=render_gaussian_blur,
+            method_of=(TextureKind.COLOR,),
+        )
+    )
     registry.register(
         Plugin(
             "blur",
             PluginFamily.POSTPROCESSING,
             TextureKind.COLOR,
             (TextureKind.COLOR,),
-            params=("n", "base"),
-            defaults={"n": 0, "base": 9},
+            params=("n", "base", "sigma"),
+            defaults={"n": 0, "base": 9, "sigma": None},
+            input_mode="RGB",
             render_func=render_blur,
             method_of=(TextureKind.COLOR,),
         )
@@ -14,5 +14,6 @@ def register_plugins(registry):
             shader=shader("abs", "plugins/primitives/abs/shader.glsl"),
             input_uniforms=("sdf0",),
             method_of=(TextureKind.SDF,),
+            fusable=True,
         )
     )
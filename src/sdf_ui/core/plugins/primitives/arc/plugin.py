@@ -15,6 +15,7 @@ def register_plugins(registry):
             make_uniforms=params("center", "radius", "start_angle", "end_angle"),
             public=True,
             method_of=(TextureKind.SDF,),
+            fusable=True,
         )
     )
 
@@ -16,6 +16,7 @@ def register_plugins(registry):
                 shader=descriptor,
                 make_uniforms=params("a", "b", "radius"),
                 public=True,
+                fusable=True,
             )
         )
 
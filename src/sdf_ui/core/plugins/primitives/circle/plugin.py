@@ -19,6 +19,7 @@ def register_plugins(registry):
             shader=descriptor,
             make_uniforms=_uniforms,
             public=True,
+            fusable=True,
         )
     )
     registry.register(
@@ -30,5 +31,6 @@ def register_plugins(registry):
             shader=descriptor,
             make_uniforms=_uniforms,
             public=True,
+            fusable=True,
         )
     )
@@ -0,0 +1,24 @@
+#version 430
+
+layout (local_size_x = 16, local_size_y = 16) in;
+
+layout (r32f, binding = 0) writeonly uniform image2D destTex;
+layout (r32f, binding = 1) readonly uniform image2D region;
+
+uniform ivec2 origin;
+uniform float far;
+
+void main() {
+    ivec2 texelPos = ivec2(gl_GlobalInvocationID.xy);
+    ivec2 destSize = imageSize(destTex);
+    if (texelPos.x >= destSize.x || texelPos.y >= destSize.y) {
+        return;
+    }
+
+    ivec2 local = texelPos - origin;
+    float dist = far;
+    if (all(greaterThanEqual(local, ivec2(0))) && all(lessThan(local, imageSize(region)))) {
+        dist = imageLoad(region, local).r;
+    }
+    imageStore(destTex, texelPos, vec4(dist));
+}
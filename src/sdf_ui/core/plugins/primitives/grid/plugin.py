@@ -19,5 +19,6 @@ def register_plugins(registry):
                 "angle": p["angle"],
             },
             public=True,
+            fusable=True,
         )
     )
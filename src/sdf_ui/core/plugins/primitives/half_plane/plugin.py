@@ -15,5 +15,6 @@ def register_plugins(registry):
             make_uniforms=params("point", "normal"),
             method_of=(TextureKind.SDF,),
             public=True,
+            fusable=True,
         )
     )
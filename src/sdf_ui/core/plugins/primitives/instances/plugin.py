@@ -0,0 +1,122 @@
+__docformat__ = "google"
+
+import numpy as np
+
+from sdf_ui.core.plugins.base import Plugin, PluginFamily, TextureKind
+from sdf_ui.core.plugins.common import shader
+
+# Columns of one row of ``params`` per instance kind, the shader code of the
+# kind and the (vec4, vec4) slots the columns are packed into.
+INSTANCE_KINDS = {
+    "circle": (("x", "y", "radius"), 0, (0, 1, 2)),
+    "rect": (("x", "y", "size_x", "size_y", "corner_radius"), 1, (0, 1, 2, 3, 4)),
+    "capsule": (("ax", "ay", "bx", "by", "radius"), 2, (0, 1, 2, 3, 4)),
+}
+
+
+def instance_array(kind, params):
+    """Pack per-instance parameters into the float32 layout read by the shader.
+
+    Args:
+        kind: One of ``INSTANCE_KINDS``.
+        params: Array-like of shape (N, columns). Rect rows may omit the
+            corner radius.
+
+    Returns:
+        A contiguous (N, 8) float32 array.
+    """
+    if kind not in INSTANCE_KINDS:
+        known = ", ".join(sorted(INSTANCE_KINDS))
+        raise ValueError(f"Unknown instance kind '{kind}'. Known kinds: {known}")
+
+    columns, _shape_kind, slots = INSTANCE_KINDS[kind]
+    values = np.asarray(params, dtype=np.float32)
+    if values.ndim != 2 or values.shape[0] == 0:
+        raise ValueError("instances requires a non-empty (N, columns) parameter array")
+    if kind == "rect" and values.shape[1] == len(columns) - 1:
+        values = np.column_stack((values, np.zeros(len(values), dtype=np.float32)))
+    if values.shape[1] != len(columns):
+        names = ", ".join(columns)
+        raise ValueError(f"{kind} instances need {len(columns)} columns ({names})")
+
+    packed = np.zeros((len(values), 8), dtype=np.float32)
+    packed[:, slots] = values
+    return packed
+
+
+def render_instance_array(renderer, kind, packed, smoothness, max_distance=None):
+    """Render packed instances, see ``instance_array``.
+
+    Each 16x16 workgroup first bins the instances that can reach its tile and
+    then only evaluates those. With ``max_distance`` the field is clamped to
+    that band, which lets the binning drop everything further away.
+    """
+    from sdf_ui.core.operations import run_shader
+    from sdf_ui.core.sdf import SDFTexture
+
+    ctx = renderer.ctx
+    tex = ctx.r32f()
+    buffer = ctx.storage_buffer(np.ascontiguousarray(packed, dtype=np.float32))
+    try:
+        run_shader(
+            ctx,
+            "instances",
+            uniforms={
+                "destTex": 0,
+                "instance_count": len(packed),
+                "shape_kind": INSTANCE_KINDS[kind][1],
+                "smoothness": max(float(smoothness), 0.0),
+                "max_distance": 1e20 if max_distance is None else float(max_distance),
+            },
+            image_bindings=((tex, 0, False, True),),
+            buffer_bindings=((buffer, 1),),
+        )
+    finally:
+        buffer.release()
+    return SDFTexture(tex=tex, context=ctx)
+
+
+def render_instances(renderer, inputs, params):
+    packed = instance_array(params["kind"], params["params"])
+    return render_instance_array(
+        renderer, params["kind"], packed, params["k"], params["max_distance"]
+    )
+
+
+def render_circles(renderer, inputs, params):
+    centers = np.asarray(params["centers"], dtype=np.float32).reshape(-1, 2)
+    radii = np.broadcast_to(
+        np.asarray(params["radii"], dtype=np.float32), (len(centers),)
+    )
+    packed = instance_array("circle", np.column_stack((centers, radii)))
+    return render_instance_array(
+        renderer, "circle", packed, params["k"], params["max_distance"]
+    )
+
+
+def register_plugins(registry):
+    descriptor = shader("instances", "plugins/primitives/instances/shader.glsl")
+    registry.register(
+        Plugin(
+            "instances",
+            PluginFamily.PRIMITIVE,
+            TextureKind.SDF,
+            params=("kind", "params", "k", "max_distance"),
+            defaults={"k": 0.0, "max_distance": None},
+            shader=descriptor,
+            render_func=render_instances,
+            public=True,
+        )
+    )
+    registry.register(
+        Plugin(
+            "circles",
+            PluginFamily.PRIMITIVE,
+            TextureKind.SDF,
+            params=("centers", "radii", "k", "max_distance"),
+            defaults={"k": 0.0, "max_distance": None},
+            shader=descriptor,
+            render_func=render_circles,
+            public=True,
+        )
+    )
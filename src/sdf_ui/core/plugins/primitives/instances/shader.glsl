@@ -0,0 +1,163 @@
+#version 430
+
+#define TILE_SIZE 16
+#define TILE_THREADS (TILE_SIZE * TILE_SIZE)
+#define TILE_CAPACITY 1024
+
+layout (local_size_x = TILE_SIZE, local_size_y = TILE_SIZE) in;
+
+layout (r32f, binding = 0) writeonly uniform image2D destTex;
+
+// Circle:  a = (center, radius, -)
+// Rect:    a = (center, half size), b.x = corner radius
+// Capsule: a = (start, end),        b.x = radius
+struct Instance {
+    vec4 a;
+    vec4 b;
+};
+
+layout (std430, binding = 1) readonly buffer Instances {
+    Instance instances[];
+};
+
+uniform int instance_count;
+uniform int shape_kind;
+uniform float smoothness;
+uniform float max_distance;
+
+// Every workgroup covers one 16x16 tile. It first bins the instances that can
+// affect the tile into shared memory, then each texel only visits those.
+shared uint tile_instances[TILE_CAPACITY];
+shared uint tile_count;
+shared float tile_bound[TILE_THREADS];
+
+float sdf_circle(vec2 p, Instance instance) {
+    return length(p - instance.a.xy) - instance.a.z;
+}
+
+float sdf_rect(vec2 p, Instance instance) {
+    float r = instance.b.x;
+    vec2 q = abs(p - instance.a.xy) - instance.a.zw + r;
+    return min(max(q.x, q.y), 0.0) + length(max(q, 0.0)) - r;
+}
+
+float sdf_capsule(vec2 p, Instance instance) {
+    vec2 pa = p - instance.a.xy;
+    vec2 ba = instance.a.zw - instance.a.xy;
+    float h = clamp(dot(pa, ba) / max(dot(ba, ba), 0.000001), 0.0, 1.0);
+    return length(pa - ba * h) - instance.b.x;
+}
+
+float sdf_instance(vec2 p, Instance instance) {
+    if (shape_kind == 1) {
+        return sdf_rect(p, instance);
+    }
+    if (shape_kind == 2) {
+        return sdf_capsule(p, instance);
+    }
+    return sdf_circle(p, instance);
+}
+
+// Point inside the shape and the radius of a disc around it that is inside too.
+vec3 instance_anchor(Instance instance) {
+    if (shape_kind == 1) {
+        return vec3(instance.a.xy, min(instance.a.z, instance.a.w));
+    }
+    if (shape_kind == 2) {
+        return vec3(instance.a.xy, instance.b.x);
+    }
+    return instance.a.xyz;
+}
+
+vec4 instance_bounds(Instance instance) {
+    if (shape_kind == 1) {
+        return vec4(instance.a.xy - instance.a.zw, instance.a.xy + instance.a.zw);
+    }
+    if (shape_kind == 2) {
+        vec2 lo = min(instance.a.xy, instance.a.zw) - instance.b.x;
+        vec2 hi = max(instance.a.xy, instance.a.zw) + instance.b.x;
+        return vec4(lo, hi);
+    }
+    return vec4(instance.a.xy - instance.a.z, instance.a.xy + instance.a.z);
+}
+
+// Upper bound of the instance distance anywhere in the tile.
+float tile_upper(vec2 tile_min, vec2 tile_max, Instance instance) {
+    vec3 anchor = instance_anchor(instance);
+    vec2 far = max(abs(tile_min - anchor.xy), abs(tile_max - anchor.xy));
+    return length(far) - anchor.z;
+}
+
+// Lower bound of the instance distance anywhere in the tile.
+float tile_lower(vec2 tile_min, vec2 tile_max, Instance instance) {
+    vec4 bounds = instance_bounds(instance);
+    vec2 gap = max(max(bounds.xy - tile_max, tile_min - bounds.zw), 0.0);
+    return gap == vec2(0.0) ? -1e20 : length(gap);
+}
+
+float smin(float a, float b, float k) {
+    float h = clamp(0.5 + 0.5 * (b - a) / k, 0.0, 1.0);
+    return mix(b, a, h) - k * h * (1.0 - h);
+}
+
+float blend(float distance, float d) {
+    return smoothness > 0.0 ? smin(distance, d, smoothness) : min(distance, d);
+}
+
+void main() {
+    ivec2 texelPos = ivec2(gl_GlobalInvocationID.xy);
+    ivec2 destSize = imageSize(destTex);
+    uint thread = gl_LocalInvocationIndex;
+    vec2 tile_min = vec2(gl_WorkGroupID.xy * uint(TILE_SIZE));
+    vec2 tile_max = tile_min + float(TILE_SIZE - 1);
+
+    // Closest upper bound over all instances, every texel of the tile is at
+    // most this far from some shape.
+    float bound = 1e20;
+    for (int index = int(thread); index < instance_count; index += TILE_THREADS) {
+        bound = min(bound, tile_upper(tile_min, tile_max, instances[index]));
+    }
+    tile_bound[thread] = bound;
+    if (thread == 0u) {
+        tile_count = 0u;
+    }
+    barrier();
+    for (uint stride = uint(TILE_THREADS) / 2u; stride > 0u; stride /= 2u) {
+        if (thread < stride) {
+            tile_bound[thread] = min(tile_bound[thread], tile_bound[thread + stride]);
+        }
+        barrier();
+    }
+
+    // Instances further away than that (plus the blend width) can't change
+    // the result anywhere in the tile.
+    float threshold = min(tile_bound[0], max_distance) + max(smoothness, 0.0);
+    for (int index = int(thread); index < instance_count; index += TILE_THREADS) {
+        if (tile_lower(tile_min, tile_max, instances[index]) <= threshold) {
+            uint slot = atomicAdd(tile_count, 1u);
+            if (slot < uint(TILE_CAPACITY)) {
+                tile_instances[slot] = uint(index);
+            }
+        }
+    }
+    barrier();
+
+    if (texelPos.x >= destSize.x || texelPos.y >= destSize.y) {
+        return;
+    }
+
+    vec2 p = vec2(texelPos);
+    float distance = 1e20;
+    if (tile_count <= uint(TILE_CAPACITY)) {
+        for (uint slot = 0u; slot < tile_count; slot++) {
+            distance = blend(distance, sdf_instance(p, instances[tile_instances[slot]]));
+        }
+    } else {
+        for (int index = 0; index < instance_count; index++) {
+            distance = blend(distance, sdf_instance(p, instances[index]));
+        }
+    }
+    distance = min(distance, max_distance);
+
+    imageStore(destTex, texelPos, vec4(distance, 0.0, 0.0, 0.0));
+}
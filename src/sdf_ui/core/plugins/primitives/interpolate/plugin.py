@@ -19,5 +19,6 @@ def register_plugins(registry):
             input_uniforms=("sdf0", "sdf1"),
             make_uniforms=params("t"),
             method_of=(TextureKind.SDF,),
+            fusable=True,
         )
     )
@@ -16,5 +16,6 @@ def register_plugins(registry):
             ),
             input_uniforms=("sdf0", "sdf1"),
             method_of=(TextureKind.SDF,),
+            fusable=True,
         )
     )
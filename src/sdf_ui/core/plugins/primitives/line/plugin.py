@@ -14,5 +14,6 @@ def register_plugins(registry):
             shader=shader("line", "plugins/primitives/line/shader.glsl"),
             make_uniforms=params("a", "b"),
             public=True,
+            fusable=True,
         )
     )
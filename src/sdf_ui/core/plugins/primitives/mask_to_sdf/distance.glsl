@@ -0,0 +1,35 @@
+#version 430
+
+layout (local_size_x = 16, local_size_y = 16) in;
+
+layout (r32f, binding = 0) writeonly uniform image2D destTex;
+layout (rgba32f, binding = 1) readonly uniform image2D seeds;
+layout (rgba8, binding = 2) readonly uniform image2D mask;
+
+uniform float threshold;
+uniform int channel;
+uniform bool invert;
+uniform float far;
+
+bool inside(ivec2 pos) {
+    vec4 value = imageLoad(mask, pos);
+    float coverage = channel == 1 ? value.a : (value.r + value.g + value.b) / 3.0;
+    return (coverage > threshold) != invert;
+}
+
+// The edge lies halfway between a pixel and its nearest pixel on the other
+// side of the mask.
+void main() {
+    ivec2 texelPos = ivec2(gl_GlobalInvocationID.xy);
+    ivec2 destSize = imageSize(destTex);
+    if (texelPos.x >= destSize.x || texelPos.y >= destSize.y) {
+        return;
+    }
+
+    bool center = inside(texelPos);
+    vec4 nearest = imageLoad(seeds, texelPos);
+    vec2 other = center ? nearest.zw : nearest.xy;
+
+    float dist = other.x < 0.0 ? far : distance(other, vec2(texelPos)) - 0.5;
+    imageStore(destTex, texelPos, vec4(center ? -dist : dist));
+}
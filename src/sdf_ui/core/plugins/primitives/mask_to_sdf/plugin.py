@@ -0,0 +1,205 @@
+__docformat__ = "google"
+
+from sdf_ui.core.plugins.base import Plugin, PluginFamily, TextureKind
+from sdf_ui.core.plugins.common import cpu_compositing, ensure_rgb, shader
+
+CHANNELS = {"luminance": 0, "alpha": 1}
+
+
+def jump_flood_steps(size):
+    """Step sizes of the flood for a mask of ``size``.
+
+    Halving steps from the largest power of two below the longest side, plus
+    one more step of 1 that fixes most of the pixels the plain flood gets
+    wrong.
+    """
+    step = 1
+    while step * 2 < max(size):
+        step *= 2
+
+    steps = []
+    while step >= 1:
+        steps.append(step)
+        step //= 2
+    return steps + [1]
+
+
+def _mask_uniforms(params):
+    channel = params["channel"]
+    if channel not in CHANNELS:
+        known = ", ".join(CHANNELS)
+        raise ValueError(f"Unknown mask channel '{channel}'. Known channels: {known}")
+    return {
+        "threshold": float(params["threshold"]),
+        "channel": CHANNELS[channel],
+        "invert": bool(params["invert"]),
+    }
+
+
+FAR = 1e20
+"""Squared distance of pixels without a seed, finite so the envelope stays NaN-free."""
+
+
+def _lower_envelope(f):
+    """Exact 1D squared distance transform of every row of ``f``.
+
+    Felzenszwalb and Huttenlocher's lower envelope of parabolas, run for all
+    rows at once so the Python loops only go along a row.
+    """
+    import numpy as np
+
+    lines, n = f.shape
+    rows = np.arange(lines)
+    v = np.zeros((lines, n), dtype=np.intp)
+    z = np.full((lines, n + 1), np.inf)
+    z[:, 0] = -np.inf
+    k = np.zeros(lines, dtype=np.intp)
+
+    def intersection(q, which):
+        p = v[which, k[which]]
+        return (f[which, q] + q * q - f[which, p] - p * p) / (2.0 * (q - p))
+
+    for q in range(1, n):
+        s = intersection(q, rows)
+        hidden = s <= z[rows, k]
+        while hidden.any():
+            popped = rows[hidden]
+            k[popped] -= 1
+            s[popped] = intersection(q, popped)
+            hidden[popped] = s[popped] <= z[popped, k[popped]]
+        k += 1
+        v[rows, k] = q
+        z[rows, k] = s
+        z[rows, k + 1] = np.inf
+
+    distances = np.empty_like(f)
+    k[:] = 0
+    for q in range(n):
+        behind = z[rows, k + 1] < q
+        while behind.any():
+            k[behind] += 1
+            behind = z[rows, k + 1] < q
+        p = v[rows, k]
+        distances[:, q] = (q - p) ** 2 + f[rows, p]
+    return distances
+
+
+def squared_distance_transform(seeds):
+    """Exact squared Euclidean distance of every pixel to the nearest seed.
+
+    Separable, one 1D transform along the columns and one along the rows,
+    so it runs in time linear in the pixel count.
+
+    Args:
+        seeds: Boolean array, True where a pixel is a seed.
+
+    Returns:
+        A float64 array of the same shape, ``FAR`` where there are no seeds.
+    """
+    import numpy as np
+
+    f = np.where(seeds, 0.0, FAR)
+    f = _lower_envelope(f.T).T
+    return np.minimum(_lower_envelope(f), FAR)
+
+
+def signed_distance(inside):
+    """Signed distance field of a boolean mask, negative inside.
+
+    The edge lies halfway between a pixel and its nearest pixel on the other
+    side of the mask, like in the jump flood.
+    """
+    import numpy as np
+
+    far = float(sum(inside.shape))
+    outside_distance = np.sqrt(squared_distance_transform(inside)) - 0.5
+    inside_distance = np.sqrt(squared_distance_transform(~inside)) - 0.5
+    field = np.where(inside, -inside_distance, outside_distance)
+    return np.clip(field, -far, far).astype(np.float32)
+
+
+def render_mask_to_sdf_cpu(renderer, inputs, params):
+    import numpy as np
+
+    from sdf_ui.core.plugins.common import rgba_array
+    from sdf_ui.core.sdf import SDFTexture
+
+    ctx = renderer.ctx
+    uniforms = _mask_uniforms(params)
+    pixels = rgba_array(ensure_rgb(renderer, inputs[0])).astype(np.float32) / 255.0
+    if uniforms["channel"] == CHANNELS["alpha"]:
+        coverage = pixels[..., 3]
+    else:
+        coverage = pixels[..., :3].mean(axis=-1)
+    inside = (coverage > uniforms["threshold"]) != uniforms["invert"]
+
+    tex = ctx.r32f()
+    tex.write(signed_distance(inside).tobytes())
+    return SDFTexture(tex=tex, context=ctx)
+
+
+def render_mask_to_sdf(renderer, inputs, params):
+    if cpu_compositing(renderer):
+        return render_mask_to_sdf_cpu(renderer, inputs, params)
+
+    from sdf_ui.core.operations import run_shader
+    from sdf_ui.core.sdf import SDFTexture
+
+    ctx = renderer.ctx
+    uniforms = _mask_uniforms(params)
+    mask = ensure_rgb(renderer, inputs[0]).tex
+    size = tuple(mask.size)
+
+    seeds = ctx.rgba32f(size)
+    run_shader(
+        ctx,
+        "jfa_seed",
+        uniforms=uniforms,
+        image_bindings=((seeds, 0, False, True), (mask, 1, True, False)),
+    )
+
+    for step in jump_flood_steps(size):
+        flooded = ctx.rgba32f(size)
+        run_shader(
+            ctx,
+            "jfa_step",
+            uniforms={"step_size": step},
+            image_bindings=((flooded, 0, False, True), (seeds, 1, True, False)),
+        )
+        ctx.recycle_texture(seeds)
+        seeds = flooded
+
+    tex = ctx.r32f()
+    run_shader(
+        ctx,
+        "jfa_distance",
+        uniforms={**uniforms, "far": float(size[0] + size[1])},
+        image_bindings=(
+            (tex, 0, False, True),
+            (seeds, 1, True, False),
+            (mask, 2, True, False),
+        ),
+    )
+    ctx.recycle_texture(seeds)
+    return SDFTexture(tex=tex, context=ctx)
+
+
+def register_plugins(registry):
+    registry.register(
+        Plugin(
+            "mask_to_sdf",
+            PluginFamily.PRIMITIVE,
+            TextureKind.SDF,
+            (TextureKind.COLOR,),
+            params=("threshold", "channel", "invert"),
+            defaults={"threshold": 0.5, "channel": "luminance", "invert": False},
+            extra_shaders=(
+                shader("jfa_seed", "plugins/primitives/mask_to_sdf/seed.glsl"),
+                shader("jfa_step", "plugins/primitives/mask_to_sdf/step.glsl"),
+                shader("jfa_distance", "plugins/primitives/mask_to_sdf/distance.glsl"),
+            ),
+            input_mode="RGB",
+            render_func=render_mask_to_sdf,
+            method_of=(TextureKind.COLOR,),
+        )
+    )
@@ -0,0 +1,35 @@
+#version 430
+
+layout (local_size_x = 16, local_size_y = 16) in;
+
+layout (rgba32f, binding = 0) writeonly uniform image2D destTex;
+layout (rgba8, binding = 1) readonly uniform image2D mask;
+
+uniform float threshold;
+uniform int channel;
+uniform bool invert;
+
+bool inside(ivec2 pos) {
+    vec4 value = imageLoad(mask, clamp(pos, ivec2(0), imageSize(mask) - 1));
+    float coverage = channel == 1 ? value.a : (value.r + value.g + value.b) / 3.0;
+    return (coverage > threshold) != invert;
+}
+
+// Pixels next to the other side of the mask seed the flood, inside seeds
+// go to xy and outside seeds to zw, -1 marks a missing seed.
+void main() {
+    ivec2 texelPos = ivec2(gl_GlobalInvocationID.xy);
+    ivec2 destSize = imageSize(destTex);
+    if (texelPos.x >= destSize.x || texelPos.y >= destSize.y) {
+        return;
+    }
+
+    bool center = inside(texelPos);
+    bool edge = inside(texelPos + ivec2(1, 0)) != center
+        || inside(texelPos - ivec2(1, 0)) != center
+        || inside(texelPos + ivec2(0, 1)) != center
+        || inside(texelPos - ivec2(0, 1)) != center;
+
+    vec2 seed = edge ? vec2(texelPos) : vec2(-1.0);
+    imageStore(destTex, texelPos, center ? vec4(seed, -1.0, -1.0) : vec4(-1.0, -1.0, seed));
+}
@@ -0,0 +1,44 @@
+#version 430
+
+layout (local_size_x = 16, local_size_y = 16) in;
+
+layout (rgba32f, binding = 0) writeonly uniform image2D destTex;
+layout (rgba32f, binding = 1) readonly uniform image2D seeds;
+
+uniform int step_size;
+
+vec2 closer(vec2 current, vec2 candidate, vec2 pos) {
+    if (candidate.x < 0.0) {
+        return current;
+    }
+    if (current.x < 0.0 || distance(candidate, pos) < distance(current, pos)) {
+        return candidate;
+    }
+    return current;
+}
+
+void main() {
+    ivec2 texelPos = ivec2(gl_GlobalInvocationID.xy);
+    ivec2 destSize = imageSize(destTex);
+    if (texelPos.x >= destSize.x || texelPos.y >= destSize.y) {
+        return;
+    }
+
+    vec2 pos = vec2(texelPos);
+    vec4 best = imageLoad(seeds, texelPos);
+
+    for (int dy = -1; dy <= 1; dy++) {
+        for (int dx = -1; dx <= 1; dx++) {
+            ivec2 neighbour = texelPos + ivec2(dx, dy) * step_size;
+            if (any(lessThan(neighbour, ivec2(0))) || any(greaterThanEqual(neighbour, destSize))) {
+                continue;
+            }
+
+            vec4 candidate = imageLoad(seeds, neighbour);
+            best.xy = closer(best.xy, candidate.xy, pos);
+            best.zw = closer(best.zw, candidate.zw, pos);
+        }
+    }
+
+    imageStore(destTex, texelPos, best);
+}
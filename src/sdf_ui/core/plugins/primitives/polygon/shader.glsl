@@ -0,0 +1,62 @@
+#version 430
+
+#define TILE_SIZE 16
+#define TILE_THREADS (TILE_SIZE * TILE_SIZE)
+
+layout (local_size_x = TILE_SIZE, local_size_y = TILE_SIZE) in;
+
+layout (r32f, binding = 0) writeonly uniform image2D destTex;
+
+layout (std430, binding = 1) readonly buffer Vertices {
+    vec2 vertices[];
+};
+
+uniform int vertex_count;
+
+// The edges are read in chunks into shared memory, every texel of the tile
+// visits all of them.
+shared vec4 edges[TILE_THREADS];
+
+void main() {
+    ivec2 texelPos = ivec2(gl_GlobalInvocationID.xy);
+    ivec2 destSize = imageSize(destTex);
+    bool in_bounds = texelPos.x < destSize.x && texelPos.y < destSize.y;
+
+    vec2 p = vec2(texelPos);
+    float distance_sq = 1e20;
+    bool inside = false;
+
+    for (int start = 0; start < vertex_count; start += TILE_THREADS) {
+        int index = start + int(gl_LocalInvocationIndex);
+        if (index < vertex_count) {
+            edges[gl_LocalInvocationIndex] = vec4(vertices[index], vertices[(index + 1) % vertex_count]);
+        }
+        barrier();
+
+        int count = min(TILE_THREADS, vertex_count - start);
+        for (int i = 0; in_bounds && i < count; i++) {
+            vec2 a = edges[i].xy;
+            vec2 b = edges[i].zw;
+            vec2 ba = b - a;
+            vec2 pa = p - a;
+
+            float denom = dot(ba, ba);
+            vec2 delta = pa;
+            if (denom > 1e-12) {
+                delta -= ba * clamp(dot(pa, ba) / denom, 0.0, 1.0);
+            }
+            distance_sq = min(distance_sq, dot(delta, delta));
+
+            // Even-odd rule, the same crossing test as the NumPy reference.
+            if ((a.y > p.y) != (b.y > p.y) && p.x < ba.x * (p.y - a.y) / (ba.y + 1e-12) + a.x) {
+                inside = !inside;
+            }
+        }
+        barrier();
+    }
+
+    if (in_bounds) {
+        float dist = sqrt(distance_sq);
+        imageStore(destTex, texelPos, vec4(inside ? -dist : dist));
+    }
+}
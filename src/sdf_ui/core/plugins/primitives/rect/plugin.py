@@ -25,6 +25,7 @@ def register_plugins(registry):
             shader=descriptor,
             make_uniforms=_uniforms,
             public=True,
+            fusable=True,
         )
     )
     registry.register(
@@ -37,5 +38,6 @@ def register_plugins(registry):
             shader=descriptor,
             make_uniforms=_uniforms,
             public=True,
+            fusable=True,
         )
     )
@@ -18,6 +18,7 @@ def register_plugins(registry):
                 make_uniforms=params("center", "radius", "thickness"),
                 public=True,
                 method_of=(TextureKind.SDF,),
+                fusable=True,
             )
         )
 
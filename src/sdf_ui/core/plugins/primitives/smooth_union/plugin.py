@@ -17,5 +17,6 @@ def register_plugins(registry):
             input_uniforms=("sdf0", "sdf1"),
             make_uniforms=lambda p: {"smoothness": p["k"]},
             method_of=(TextureKind.SDF,),
+            fusable=True,
         )
     )
@@ -14,5 +14,6 @@ def register_plugins(registry):
             shader=shader("subtract", "plugins/primitives/subtract/shader.glsl"),
             input_uniforms=("sdf0", "sdf1"),
             method_of=(TextureKind.SDF,),
+            fusable=True,
         )
     )
@@ -1,81 +1,70 @@
 __docformat__ = "google"
 
+import weakref
 from functools import lru_cache
-from math import ceil, floor
+from math import ceil
 
 import numpy as np
-import ttfquery
-from ttfquery import describe
 
+from sdf_ui.core.fonts import FontAtlas, font_face
+from sdf_ui.core.msdf import median, multi_channel_signed_distance
 from sdf_ui.core.plugins.base import Plugin, PluginFamily, TextureKind
+from sdf_ui.core.plugins.common import cpu_compositing, shader
 from sdf_ui.core.plugins.primitives.glyph.plugin import (
-    _contour_distance_sq,
-    _contour_winding,
-    _flatten_contour,
-    _raw_glyph_contours,
+    padded_bounds,
+    render_sdf_region,
 )
+from sdf_ui.core.segments import SegmentIndex
 
 
 def render_text(renderer, _inputs, params):
     ctx = renderer.ctx
-    width, height = ctx.size
     font_size = float(params["size"])
     ox = float(params["ox"])
     oy = float(params["oy"])
     path = params["path"]
-    samples = int(params["samples"])
+    tolerance = float(params["tolerance"])
     cache_size = int(params["cache_size"])
     line_height = float(params["line_height"])
     oversample = float(params["oversample"])
     min_render_size = float(params["min_render_size"])
+    band = float(params["band"])
+    msdf = bool(params["msdf"])
 
-    metrics = _font_metrics(path)
-    scale = font_size / metrics["units_per_em"]
+    face = font_face(path)
+    scale = font_size / face.units_per_em
     effective_font_size = max(font_size, min_render_size)
-    distance_scale = effective_font_size / metrics["units_per_em"]
-    field = np.full((height, width), max(width, height), dtype=np.float32)
-    glyph_cache_size = _glyph_cache_size(
-        font_size, oversample, cache_size, min_render_size
+    distance_scale = effective_font_size / face.units_per_em
+    if msdf:
+        # Multi-channel patches keep their corners when magnified.
+        glyph_cache_size = max(1, cache_size)
+    else:
+        glyph_cache_size = _glyph_cache_size(
+            font_size, oversample, cache_size, min_render_size
+        )
+    atlas = _font_atlas(path, tolerance, glyph_cache_size, msdf)
+
+    glyphs, pens = face.layout(params["value"], line_height)
+    pens = pens * scale + (ox, oy)
+
+    missing = [glyph for glyph in np.unique(glyphs).tolist() if glyph not in atlas]
+    for glyph in missing:
+        atlas.add(glyph, *_glyph_sdf(face, glyph, tolerance, glyph_cache_size, msdf))
+    if missing:
+        atlas.save()
+
+    quads, cells = _glyph_run(atlas, glyphs, pens, scale)
+    source_to_dest = scale * atlas.units_per_pixel
+    distance_to_dest = distance_scale * atlas.units_per_pixel
+    if cpu_compositing(renderer):
+        field, origin = _composite_glyphs(
+            atlas.field, quads, cells, ctx.size, source_to_dest, distance_to_dest, band
+        )
+        return render_sdf_region(renderer, field, origin, band)
+    return _render_glyph_run(
+        renderer, atlas, quads, cells, source_to_dest, distance_to_dest, band
     )
 
-    previous = None
-    pen_x = 0.0
-    pen_y = 0.0
-    line_advance = metrics["units_per_em"] * line_height
-
-    for char in params["value"]:
-        if char == "\n":
-            previous = None
-            pen_x = 0.0
-            pen_y -= line_advance
-            continue
-
-        glyph_metrics = _glyph_metrics(path, char)
-        if previous is not None:
-            pen_x += _kerning(path, previous, char)
-
-        if glyph_metrics["name"] is not None:
-            patch = _cached_glyph_sdf(path, char, samples, glyph_cache_size)
-            if patch["field"].size:
-                _composite_glyph(
-                    field,
-                    patch,
-                    ox + pen_x * scale,
-                    oy + pen_y * scale,
-                    scale,
-                    distance_scale,
-                )
-
-        pen_x += glyph_metrics["advance"]
-        previous = char
-
-    tex = ctx.r32f()
-    tex.write(field.tobytes())
-
-    from sdf_ui.core.sdf import SDFTexture
-
-    return SDFTexture(tex=tex, context=ctx)
-
 
 def _glyph_cache_size(font_size, oversample, cache_size, min_render_size=0.0):
     effective_font_size = max(font_size, min_render_size)
@@ -85,159 +74,251 @@ def _glyph_cache_size(font_size, oversample, cache_size, min_render_size=0.0):
     return target_size
 
 
-def _composite_glyph(field, patch, x, y, scale, distance_scale):
-    glyph_field = patch["field"]
-    source_units_per_pixel = patch["units_per_pixel"]
-    source_to_dest = scale * source_units_per_pixel
-    distance_to_dest = distance_scale * source_units_per_pixel
-    if source_to_dest <= 0:
-        return
+@lru_cache(maxsize=64)
+def _font_atlas(path, tolerance, glyph_cache_size, msdf=False):
+    units_per_pixel = font_face(path).units_per_em / glyph_cache_size
+    channels = 3 if msdf else 1
+    return FontAtlas.open(path, glyph_cache_size, tolerance, units_per_pixel, channels)
+
+
+def _glyph_run(atlas, glyphs, pens, scale):
+    """Destination quads and atlas cells of the non-empty glyphs of a run.
+
+    Quads are (left, top, right, bottom) on the canvas, cells
+    (x, y, width, height) in the atlas.
+    """
+    unique, inverse = np.unique(glyphs, return_inverse=True)
+    entries = [atlas.glyph(glyph) for glyph in unique.tolist()]
+    table = np.array(entries, dtype=np.float64).reshape(-1, 6)[inverse.ravel()]
+    drawn = (table[:, 2] > 0) & (table[:, 3] > 0)
+    if not drawn.any():
+        return np.zeros((0, 4)), np.zeros((0, 4), dtype=np.intp)
+
+    table = table[drawn]
+    pens = np.asarray(pens, dtype=np.float64).reshape(-1, 2)[drawn]
+    source_to_dest = scale * atlas.units_per_pixel
+    left = pens[:, 0] + table[:, 4] * scale
+    top = pens[:, 1] + table[:, 5] * scale
+    quads = np.column_stack(
+        (
+            left,
+            top,
+            left + table[:, 2] * source_to_dest,
+            top + table[:, 3] * source_to_dest,
+        )
+    )
+    return quads, table[:, :4].astype(np.intp)
+
+
+def _render_glyph_run(
+    renderer, atlas, quads, cells, source_to_dest, distance_to_dest, band
+):
+    """Composite a glyph run from the atlas texture in one dispatch."""
+    from sdf_ui.core.operations import run_shader
+    from sdf_ui.core.sdf import SDFTexture
+
+    ctx = renderer.ctx
+    tex = ctx.r32f()
+    if not len(quads) or source_to_dest <= 0:
+        # Nothing to draw, one dummy glyph keeps the buffer non-empty.
+        quads, cells = np.zeros((1, 4)), np.zeros((1, 4))
+        count = 0
+    else:
+        count = len(quads)
+
+    glyphs = np.column_stack((quads, cells)).astype(np.float32)
+    buffer = ctx.storage_buffer(np.ascontiguousarray(glyphs))
+    try:
+        run_shader(
+            ctx,
+            "text",
+            uniforms={
+                "glyph_count": count,
+                "source_to_dest": float(source_to_dest),
+                "distance_scale": float(distance_to_dest),
+                "band": band,
+                "radius": _downsample_radius(source_to_dest),
+                "multi_channel": atlas.channels == 3,
+            },
+            image_bindings=(
+                (tex, 0, False, True),
+                # Multi-channel atlases are bound to the rgba32f image unit.
+                (
+                    _atlas_texture(ctx, atlas),
+                    1 if atlas.channels == 1 else 2,
+                    True,
+                    False,
+                ),
+            ),
+            buffer_bindings=((buffer, 1),),
+        )
+    finally:
+        buffer.release()
+    return SDFTexture(tex=tex, context=ctx)
 
-    left = x + patch["origin"][0] * scale
-    top = y + patch["origin"][1] * scale
-    right = left + glyph_field.shape[1] * source_to_dest
-    bottom = top + glyph_field.shape[0] * source_to_dest
 
-    height, width = field.shape
-    x0 = max(0, int(floor(left)))
-    y0 = max(0, int(floor(top)))
-    x1 = min(width, int(ceil(right)))
-    y1 = min(height, int(ceil(bottom)))
-    if x0 >= x1 or y0 >= y1:
-        return
+_atlas_textures = weakref.WeakKeyDictionary()
 
-    yy, xx = np.mgrid[y0:y1, x0:x1]
-    source_x = (xx - left) / source_to_dest
-    source_y = (yy - top) / source_to_dest
-    distances = _sample_sdf(glyph_field, source_x, source_y, source_to_dest)
-    distances = distances * distance_to_dest
-    field[y0:y1, x0:x1] = np.minimum(field[y0:y1, x0:x1], distances)
 
+def _atlas_texture(ctx, atlas):
+    """The atlas uploaded to ``ctx``, uploaded again once glyphs were added."""
+    textures = _atlas_textures.setdefault(ctx, {})
+    version = (id(atlas), atlas.version)
+    entry = textures.get(atlas.key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    if entry is not None:
+        ctx.release_texture(entry[1])
 
-def _sample_sdf(values, x, y, source_to_dest):
+    field = atlas.field
+    if not field.size:
+        field = np.zeros(atlas._shape(1, 1), dtype=np.float32)
+    if atlas.channels == 1:
+        tex = ctx.r32f(field.shape[1::-1])
+    else:
+        tex = ctx.rgba32f(field.shape[1::-1])
+        field = np.concatenate((field, np.zeros_like(field[..., :1])), axis=-1)
+    tex.write(np.ascontiguousarray(field, dtype=np.float32).tobytes())
+    textures[atlas.key] = (version, tex)
+    return tex
+
+
+def _composite_glyphs(
+    atlas_field, quads, cells, size, source_to_dest, distance_to_dest, band
+):
+    """Composite a glyph run from the atlas field on the CPU.
+
+    Returns the field of the run's bounding box grown by ``band``, clamped to
+    ``band``, and its origin on the canvas. All glyphs are sampled in one
+    vectorized pass.
+    """
+    if not len(quads) or source_to_dest <= 0:
+        return None, (0, 0)
+
+    left, top, right, bottom = quads.T
+    rx0, ry0, rx1, ry1 = padded_bounds(
+        (left.min(), top.min()), (right.max(), bottom.max()), band, size
+    )
+    if rx0 >= rx1 or ry0 >= ry1:
+        return None, (0, 0)
+    field = np.full((ry1 - ry0, rx1 - rx0), band, dtype=np.float32)
+
+    x0 = np.clip(np.floor(left).astype(np.intp), rx0, rx1)
+    y0 = np.clip(np.floor(top).astype(np.intp), ry0, ry1)
+    x1 = np.clip(np.ceil(right).astype(np.intp), rx0, rx1)
+    y1 = np.clip(np.ceil(bottom).astype(np.intp), ry0, ry1)
+    widths = np.maximum(x1 - x0, 0)
+    counts = widths * np.maximum(y1 - y0, 0)
+    if not counts.sum():
+        return field, (rx0, ry0)
+
+    glyph = np.repeat(np.arange(len(quads)), counts)
+    within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    xs = x0[glyph] + within % widths[glyph]
+    ys = y0[glyph] + within // widths[glyph]
+
+    cell_x, cell_y, cell_width, cell_height = cells[glyph].T
+    distances = _sample_patches(
+        atlas_field.reshape(-1, *atlas_field.shape[2:]),
+        (xs - left[glyph]) / source_to_dest,
+        (ys - top[glyph]) / source_to_dest,
+        source_to_dest,
+        cell_y * atlas_field.shape[1] + cell_x,
+        cell_width,
+        cell_height,
+        atlas_field.shape[1],
+    )
+    distances *= distance_to_dest
+    np.minimum.at(field, (ys - ry0, xs - rx0), distances.astype(np.float32))
+    return field, (rx0, ry0)
+
+
+def _downsample_radius(source_to_dest):
+    """Neighbourhood of patch pixels one destination pixel covers."""
     if source_to_dest >= 1.0:
-        return _sample_bilinear(values, x, y)
+        return 0
+    return max(1, int(ceil(0.5 / source_to_dest)))
+
+
+def _sample_sdf(values, x, y, source_to_dest):
+    height, width = values.shape
+    return _sample_patches(values.ravel(), x, y, source_to_dest, 0, width, height)
+
+
+def _sample_patches(values, x, y, source_to_dest, start, width, height, stride=None):
+    """Sample patches stored row by row in the flat ``values``.
+
+    ``start``, ``width`` and ``height`` give the patch of every sample, rows
+    are ``stride`` apart, the patch width by default. Multi-channel values,
+    of shape (N, 3), are interpolated per channel and reduced to their median.
+    Downsampled patches take the minimum of the neighbourhood a destination
+    pixel covers, so thin negative features survive.
+    """
+    stride = width if stride is None else stride
+    radius = _downsample_radius(source_to_dest)
 
-    source_pixels_per_dest = 1.0 / source_to_dest
-    radius = max(1, int(ceil(source_pixels_per_dest * 0.5)))
-    sampled = _sample_bilinear(values, x, y)
+    def sample(offset_x, offset_y):
+        sampled = _sample_bilinear(
+            values, x + offset_x, y + offset_y, start, width, height, stride
+        )
+        return sampled if values.ndim == 1 else median(sampled)
+
+    sampled = sample(0, 0)
     for offset_y in range(-radius, radius + 1):
         for offset_x in range(-radius, radius + 1):
             if offset_x == 0 and offset_y == 0:
                 continue
-            sampled = np.minimum(
-                sampled, _sample_bilinear(values, x + offset_x, y + offset_y)
-            )
+            sampled = np.minimum(sampled, sample(offset_x, offset_y))
     return sampled
 
 
-def _sample_bilinear(values, x, y):
-    height, width = values.shape
+def _sample_bilinear(values, x, y, start, width, height, stride):
     x = np.clip(x, 0.0, width - 1.0)
     y = np.clip(y, 0.0, height - 1.0)
 
-    x0 = np.floor(x).astype(np.int32)
-    y0 = np.floor(y).astype(np.int32)
+    x0 = np.floor(x).astype(np.intp)
+    y0 = np.floor(y).astype(np.intp)
     x1 = np.minimum(x0 + 1, width - 1)
     y1 = np.minimum(y0 + 1, height - 1)
     tx = x - x0
     ty = y - y0
-
-    top = values[y0, x0] * (1.0 - tx) + values[y0, x1] * tx
-    bottom = values[y1, x0] * (1.0 - tx) + values[y1, x1] * tx
+    if values.ndim > 1:
+        tx = tx[:, None]
+        ty = ty[:, None]
+
+    row0 = start + y0 * stride
+    row1 = start + y1 * stride
+    top = values[row0 + x0] * (1.0 - tx) + values[row0 + x1] * tx
+    bottom = values[row1 + x0] * (1.0 - tx) + values[row1 + x1] * tx
     return top * (1.0 - ty) + bottom * ty
 
 
-@lru_cache(maxsize=512)
-def _cached_glyph_sdf(path, char, samples, glyph_cache_size):
-    raw_contours = _raw_glyph_contours(path, char)
-    glyph_metrics = _glyph_metrics(path, char)
-    if not raw_contours or glyph_metrics["name"] is None:
-        return {
-            "field": np.empty((0, 0), dtype=np.float32),
-            "origin": (0.0, 0.0),
-            "units_per_pixel": 1.0,
-        }
+def _glyph_sdf(face, glyph, tolerance, glyph_cache_size, msdf=False):
+    """SDF patch of a glyph of a ``FontFace`` and its lower left corner in font units.
+
+    The outline is flattened within ``tolerance`` atlas pixels. Multi-channel
+    patches have a trailing axis of three channels.
+    """
+    units_per_pixel = face.units_per_em / glyph_cache_size
+    segments, segment_ends, corners = face.segments(glyph, tolerance * units_per_pixel)
+    if not len(segments):
+        return np.empty((0, 0, 3) if msdf else (0, 0), dtype=np.float32), (0.0, 0.0)
 
-    font_metrics = _font_metrics(path)
-    units_per_pixel = font_metrics["units_per_em"] / glyph_cache_size
     pad = max(2, int(glyph_cache_size * 0.08))
     pad_units = pad * units_per_pixel
-    x_min, y_min, x_max, y_max = glyph_metrics["bbox"]
+    x_min, y_min, x_max, y_max = face.bboxes[glyph].tolist()
     origin = (x_min - pad_units, y_min - pad_units)
     width = max(1, int(ceil((x_max - x_min) / units_per_pixel)) + pad * 2)
     height = max(1, int(ceil((y_max - y_min) / units_per_pixel)) + pad * 2)
+    segments = (segments - np.asarray(origin)) / units_per_pixel
 
-    contours = tuple(
-        tuple(
-            (
-                (point[0] - origin[0]) / units_per_pixel,
-                (point[1] - origin[1]) / units_per_pixel,
-            )
-            for point in _flatten_contour(contour, samples)
+    if msdf:
+        field = multi_channel_signed_distance(
+            segments, segment_ends, corners, (0, 0), (height, width)
         )
-        for contour in raw_contours
-    )
-
-    yy, xx = np.mgrid[0:height, 0:width]
-    points = np.stack((xx.astype(np.float32), yy.astype(np.float32)), axis=-1)
-    distance_sq = np.full((height, width), np.inf, dtype=np.float32)
-    winding = np.zeros((height, width), dtype=np.int16)
-
-    for contour in contours:
-        distance_sq = np.minimum(distance_sq, _contour_distance_sq(points, contour))
-        winding += _contour_winding(points, contour)
-
-    field = np.sqrt(distance_sq).astype(np.float32)
-    field[winding != 0] *= -1.0
-    return {"field": field, "origin": origin, "units_per_pixel": units_per_pixel}
-
-
-@lru_cache(maxsize=64)
-def _font_metrics(path):
-    font = describe.openFont(path)
-    return {
-        "units_per_em": float(font["head"].unitsPerEm),
-        "ascent": float(font["hhea"].ascent),
-        "descent": float(font["hhea"].descent),
-    }
-
-
-@lru_cache(maxsize=512)
-def _glyph_metrics(path, char):
-    font = describe.openFont(path)
-    glyph_name = ttfquery.glyphquery.glyphName(font, char)
-    if glyph_name is None:
-        return {"name": None, "advance": 0.0, "bbox": (0.0, 0.0, 0.0, 0.0)}
-
-    advance, _left_side_bearing = font["hmtx"].metrics.get(glyph_name, (0, 0))
-    glyph = font["glyf"][glyph_name]
-    if glyph.numberOfContours == 0:
-        bbox = (0.0, 0.0, 0.0, 0.0)
     else:
-        bbox = (
-            float(glyph.xMin),
-            float(glyph.yMin),
-            float(glyph.xMax),
-            float(glyph.yMax),
-        )
-    return {"name": glyph_name, "advance": float(advance), "bbox": bbox}
-
-
-@lru_cache(maxsize=2048)
-def _kerning(path, left, right):
-    font = describe.openFont(path)
-    left_name = ttfquery.glyphquery.glyphName(font, left)
-    right_name = ttfquery.glyphquery.glyphName(font, right)
-    if left_name is None or right_name is None or "kern" not in font:
-        return 0.0
-
-    kern_table = font["kern"]
-    for table in getattr(kern_table, "kernTables", ()):
-        value = getattr(table, "kernTable", {}).get((left_name, right_name))
-        if value is not None:
-            return float(value)
-    return 0.0
+        field = SegmentIndex(segments).signed_distance((0, 0), (height, width))
+    return field, origin
 
 
 def register_plugins(registry):
@@ -252,23 +333,29 @@ def register_plugins(registry):
                 "ox",
                 "oy",
                 "path",
-                "samples",
+                "tolerance",
                 "cache_size",
                 "line_height",
                 "oversample",
                 "min_render_size",
+                "band",
+                "msdf",
             ),
             defaults={
                 "size": 64,
                 "ox": 0,
                 "oy": 0,
                 "path": "fonts/georgia_regular.ttf",
-                "samples": 16,
+                "tolerance": 0.1,
                 "cache_size": 128,
                 "line_height": 1.2,
                 "oversample": 2.0,
                 "min_render_size": 64,
+                "band": 64.0,
+                "msdf": False,
             },
+            deprecated_params={"samples": "outlines are flattened to 'tolerance'"},
+            shader=shader("text", "plugins/primitives/text/shader.glsl"),
             public=True,
             render_func=render_text,
         )
@@ -0,0 +1,118 @@
+#version 430
+
+#define TILE_SIZE 16
+#define TILE_THREADS (TILE_SIZE * TILE_SIZE)
+#define TILE_CAPACITY 256
+
+layout (local_size_x = TILE_SIZE, local_size_y = TILE_SIZE) in;
+
+layout (r32f, binding = 0) writeonly uniform image2D destTex;
+layout (r32f, binding = 1) readonly uniform image2D atlas;
+// Multi-channel atlases, only read when multi_channel is set.
+layout (rgba32f, binding = 2) readonly uniform image2D msdf_atlas;
+
+// quad = (left, top, right, bottom) on the canvas,
+// cell = (x, y, width, height) of the glyph's patch in the atlas.
+struct Glyph {
+    vec4 quad;
+    vec4 cell;
+};
+
+layout (std430, binding = 1) readonly buffer Glyphs {
+    Glyph glyphs[];
+};
+
+uniform int glyph_count;
+uniform float source_to_dest;
+uniform float distance_scale;
+uniform float band;
+uniform int radius;
+uniform bool multi_channel;
+
+shared uint tile_glyphs[TILE_CAPACITY];
+shared uint tile_count;
+
+// Pixels [x0, x1) x [y0, y1) the glyph is composited into.
+ivec4 glyph_pixels(Glyph glyph) {
+    return ivec4(floor(glyph.quad.xy), ceil(glyph.quad.zw));
+}
+
+vec3 load_texel(ivec2 p) {
+    return multi_channel ? imageLoad(msdf_atlas, p).rgb : imageLoad(atlas, p).rrr;
+}
+
+float median(vec3 d) {
+    return max(min(d.r, d.g), min(max(d.r, d.g), d.b));
+}
+
+// Channels are interpolated first, the median of them keeps corners sharp.
+float sample_cell(vec4 cell, vec2 pos) {
+    vec2 last = cell.zw - 1.0;
+    pos = clamp(pos, vec2(0.0), last);
+    vec2 base = floor(pos);
+    vec2 f = pos - base;
+
+    ivec2 p0 = ivec2(cell.xy + base);
+    ivec2 p1 = ivec2(cell.xy + min(base + 1.0, last));
+
+    vec3 top = mix(load_texel(p0), load_texel(ivec2(p1.x, p0.y)), f.x);
+    vec3 bottom = mix(load_texel(ivec2(p0.x, p1.y)), load_texel(p1), f.x);
+    return median(mix(top, bottom, f.y));
+}
+
+// Downsampled patches take the minimum of the neighbourhood a pixel covers,
+// so thin negative features survive.
+float sample_glyph(Glyph glyph, vec2 p) {
+    vec2 pos = (p - glyph.quad.xy) / source_to_dest;
+    float dist = sample_cell(glyph.cell, pos);
+    for (int dy = -radius; dy <= radius; dy++) {
+        for (int dx = -radius; dx <= radius; dx++) {
+            dist = min(dist, sample_cell(glyph.cell, pos + vec2(dx, dy)));
+        }
+    }
+    return dist * distance_scale;
+}
+
+bool covers(ivec4 pixels, ivec2 lo, ivec2 hi) {
+    return pixels.x <= hi.x && pixels.z > lo.x && pixels.y <= hi.y && pixels.w > lo.y;
+}
+
+void main() {
+    ivec2 texelPos = ivec2(gl_GlobalInvocationID.xy);
+    ivec2 destSize = imageSize(destTex);
+    uint thread = gl_LocalInvocationIndex;
+    ivec2 tile_min = ivec2(gl_WorkGroupID.xy) * TILE_SIZE;
+    ivec2 tile_max = tile_min + TILE_SIZE - 1;
+
+    // Bin the glyphs whose quads overlap the tile.
+    if (thread == 0u) {
+        tile_count = 0u;
+    }
+    barrier();
+    for (int index = int(thread); index < glyph_count; index += TILE_THREADS) {
+        if (covers(glyph_pixels(glyphs[index]), tile_min, tile_max)) {
+            uint slot = atomicAdd(tile_count, 1u);
+            if (slot < uint(TILE_CAPACITY)) {
+                tile_glyphs[slot] = uint(index);
+            }
+        }
+    }
+    barrier();
+
+    if (texelPos.x >= destSize.x || texelPos.y >= destSize.y) {
+        return;
+    }
+
+    vec2 p = vec2(texelPos);
+    float dist = band;
+    bool binned = tile_count <= uint(TILE_CAPACITY);
+    int count = binned ? int(tile_count) : glyph_count;
+    for (int slot = 0; slot < count; slot++) {
+        Glyph glyph = glyphs[binned ? int(tile_glyphs[slot]) : slot];
+        if (covers(glyph_pixels(glyph), texelPos, texelPos)) {
+            dist = min(dist, sample_glyph(glyph, p));
+        }
+    }
+
+    imageStore(destTex, texelPos, vec4(dist));
+}
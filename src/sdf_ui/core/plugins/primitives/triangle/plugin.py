@@ -18,5 +18,6 @@ def register_plugins(registry):
                 "point2": p["point_3"],
             },
             public=True,
+            fusable=True,
         )
     )
@@ -14,5 +14,6 @@ def register_plugins(registry):
             shader=shader("union", "plugins/primitives/union/shader.glsl"),
             input_uniforms=("sdf0", "sdf1"),
             method_of=(TextureKind.SDF,),
+            fusable=True,
         )
     )
@@ -46,6 +46,7 @@ def register_plugins(registry):
             ),
             input_uniforms=("sdf", "origTex"),
             mode="RGB",
+            input_mode="RGB",
             render_func=render_fill_from_texture,
             method_of=(TextureKind.SDF,),
         )
@@ -26,6 +26,7 @@ def register_plugins(registry):
                 "color0": (0.0, 0.0, 0.0, 1.0),
                 "color1": (1.0, 1.0, 1.0, 1.0),
             },
+            mode="RGB",
             render_func=render_generate_mask,
             method_of=(TextureKind.SDF,),
         )
@@ -0,0 +1,41 @@
+__docformat__ = "google"
+
+from sdf_ui.core.plugins.base import Plugin, PluginFamily, TextureKind
+
+
+def render_image(renderer, inputs, params):
+    import numpy as np
+
+    from sdf_ui.core.plugins.common import rgb_texture_from_array
+
+    pixels = np.asarray(params["pixels"])
+    if pixels.ndim == 2:
+        pixels = np.repeat(pixels[..., None], 3, axis=-1)
+    if pixels.ndim != 3 or pixels.shape[2] not in (3, 4):
+        raise ValueError(
+            f"image pixels should have shape (height, width, 3 or 4), got {pixels.shape}"
+        )
+    if pixels.shape[2] == 3:
+        alpha = np.full(pixels.shape[:2] + (1,), 255, dtype=pixels.dtype)
+        pixels = np.concatenate((pixels, alpha), axis=-1)
+
+    # Image rows run top to bottom, texture rows bottom to top.
+    width, height = renderer.ctx.size
+    canvas = np.zeros((int(height), int(width), 4), dtype=np.float32)
+    rows, cols = np.minimum(pixels.shape[:2], canvas.shape[:2])
+    canvas[:rows, :cols] = np.flip(pixels, 0)[:rows, :cols]
+    return rgb_texture_from_array(renderer.ctx, canvas)
+
+
+def register_plugins(registry):
+    registry.register(
+        Plugin(
+            "image",
+            PluginFamily.SHADING,
+            TextureKind.COLOR,
+            params=("pixels",),
+            mode="RGB",
+            render_func=render_image,
+            public=True,
+        )
+    )
@@ -4,8 +4,22 @@ from sdf_ui.core.plugins.base import Plugin, PluginFamily, TextureKind
 
 
 def render_shadow(renderer, inputs, params):
+    from sdf_ui.core.plugins.postprocessing.blur.plugin import blur_sigma
     from sdf_ui.core.plugins.registry import registry
 
+    sigma = blur_sigma(params["distance"])
+    if params["analytic"]:
+        # The mask of generate_mask is half covered 0.75px inside the shape.
+        return renderer.render(
+            registry.build(
+                "soft_shadow",
+                inputs[0],
+                blur=sigma,
+                spread=params["inflate"] - 0.75,
+                color=(0.0, 0.0, 0.0, params["transparency"]),
+            )
+        )
+
     mask = registry.build(
         "generate_mask",
         inputs[0],
@@ -13,7 +27,7 @@ def render_shadow(renderer, inputs, params):
         color0=(0.0, 0.0, 0.0, 0.0),
         color1=(0.0, 0.0, 0.0, 1.0),
     )
-    blur = registry.build("blur", mask, n=params["distance"], base=9)
+    blur = registry.build("blur", mask, sigma=sigma)
     return renderer.render(registry.build("transparency", blur, params["transparency"]))
 
 
@@ -24,8 +38,14 @@ def register_plugins(registry):
             PluginFamily.SHADING,
             TextureKind.COLOR,
             (TextureKind.SDF,),
-            params=("distance", "inflate", "transparency"),
-            defaults={"distance": 10, "inflate": 0, "transparency": 0.75},
+            params=("distance", "inflate", "transparency", "analytic"),
+            defaults={
+                "distance": 10,
+                "inflate": 0,
+                "transparency": 0.75,
+                "analytic": False,
+            },
+            mode="RGB",
             render_func=render_shadow,
             method_of=(TextureKind.SDF,),
         )
@@ -0,0 +1,51 @@
+__docformat__ = "google"
+
+from sdf_ui.core.plugins.base import Plugin, PluginFamily, TextureKind
+from sdf_ui.core.plugins.common import color, shader
+
+
+def _uniforms(params):
+    return {
+        "offset": tuple(params.get("offset", (0.0, 0.0))),
+        "sigma": max(float(params["blur"]), 1e-3),
+        "spread": params["spread"],
+        "color": color(params["color"]),
+    }
+
+
+def register_plugins(registry):
+    registry.register(
+        Plugin(
+            "soft_shadow",
+            PluginFamily.SHADING,
+            TextureKind.COLOR,
+            (TextureKind.SDF,),
+            params=("offset", "blur", "spread", "color"),
+            defaults={
+                "offset": (0.0, 0.0),
+                "blur": 8.0,
+                "spread": 0.0,
+                "color": (0.0, 0.0, 0.0, 0.75),
+            },
+            shader=shader("soft_shadow", "plugins/shading/soft_shadow/shader.glsl"),
+            input_uniforms=("sdf",),
+            make_uniforms=_uniforms,
+            mode="RGB",
+            method_of=(TextureKind.SDF,),
+        )
+    )
+    registry.register(
+        Plugin(
+            "glow",
+            PluginFamily.SHADING,
+            TextureKind.COLOR,
+            (TextureKind.SDF,),
+            params=("blur", "spread", "color"),
+            defaults={"blur": 8.0, "spread": 0.0, "color": (1.0, 1.0, 1.0, 1.0)},
+            shader=shader("soft_shadow", "plugins/shading/soft_shadow/shader.glsl"),
+            input_uniforms=("sdf",),
+            make_uniforms=_uniforms,
+            mode="RGB",
+            method_of=(TextureKind.SDF,),
+        )
+    )
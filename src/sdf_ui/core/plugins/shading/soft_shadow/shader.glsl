@@ -0,0 +1,47 @@
+#version 430
+
+layout (local_size_x = 16, local_size_y = 16) in;
+
+layout (rgba8, binding = 0) writeonly uniform image2D destTex;
+layout (r32f, binding = 1) readonly uniform image2D sdf;
+
+uniform vec2 offset;
+uniform float sigma;
+uniform float spread;
+uniform vec4 color;
+
+float sample_distance(vec2 pos) {
+    ivec2 last = imageSize(sdf) - 1;
+    vec2 base = floor(pos);
+    vec2 f = pos - base;
+
+    ivec2 p0 = clamp(ivec2(base), ivec2(0), last);
+    ivec2 p1 = clamp(ivec2(base) + 1, ivec2(0), last);
+
+    float top = mix(imageLoad(sdf, p0).r, imageLoad(sdf, ivec2(p1.x, p0.y)).r, f.x);
+    float bottom = mix(imageLoad(sdf, ivec2(p0.x, p1.y)).r, imageLoad(sdf, p1).r, f.x);
+    return mix(top, bottom, f.y);
+}
+
+// Abramowitz and Stegun 7.1.26, absolute error below 1.5e-7.
+float erf_approx(float x) {
+    float t = 1.0 / (1.0 + 0.3275911 * abs(x));
+    float poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741
+        + t * (-1.453152027 + t * 1.061405429))));
+    return sign(x) * (1.0 - poly * exp(-x * x));
+}
+
+// A Gaussian blurred silhouette, evaluated from the distance to its edge:
+// for a straight edge the blurred step is the normal CDF of the distance.
+void main() {
+    ivec2 texelPos = ivec2(gl_GlobalInvocationID.xy);
+    ivec2 destSize = imageSize(destTex);
+    if (texelPos.x >= destSize.x || texelPos.y >= destSize.y) {
+        return;
+    }
+
+    float distance = sample_distance(vec2(texelPos) - offset) - spread;
+    float coverage = 0.5 - 0.5 * erf_approx(distance / (sigma * 1.41421356));
+
+    imageStore(destTex, texelPos, vec4(color.rgb, color.a * coverage));
+}
@@ -11,34 +11,113 @@ class SDFTexture(TextureNode):
     def __and__(self, other: Any) -> SDFTexture: ...
     def __sub__(self, other: Any) -> SDFTexture: ...
     def intersect(self, other: Any) -> SDFTexture: ...
-    def mask(self, inflate: Any = 0.0, color0: Any = (0.0, 0.0, 0.0, 1.0), color1: Any = (1.0, 1.0, 1.0, 1.0)) -> ColorTexture: ...
+    def mask(
+        self,
+        inflate: Any = 0.0,
+        color0: Any = (0.0, 0.0, 0.0, 1.0),
+        color1: Any = (1.0, 1.0, 1.0, 1.0),
+    ) -> ColorTexture: ...
     def abs(self) -> SDFTexture: ...
     def annulus(self, center: Any, radius: Any, thickness: Any = 8.0) -> SDFTexture: ...
-    def arc(self, center: Any, radius: Any, start_angle: Any, end_angle: Any) -> SDFTexture: ...
+    def arc(
+        self, center: Any, radius: Any, start_angle: Any, end_angle: Any
+    ) -> SDFTexture: ...
     def convex_polygon(self, points: Any) -> SDFTexture: ...
     def diamond(self, center: Any, radii: Any) -> SDFTexture: ...
     def ellipse(self, center: Any, radii: Any) -> SDFTexture: ...
-    def fill(self, fg_color: Any, bg_color: Any = (0.0, 0.0, 0.0, 1.0), inflate: Any = 0.0, inner: Any = -1.5, outer: Any = 0.0) -> ColorTexture: ...
-    def fill_from_texture(self, layer: Any, background: Any = (0.0, 0.0, 0.0, 0.0), inflate: Any = 0) -> ColorTexture: ...
-    def generate_mask(self, inflate: Any = 0.0, color0: Any = (0.0, 0.0, 0.0, 1.0), color1: Any = (1.0, 1.0, 1.0, 1.0)) -> ColorTexture: ...
+    def fill(
+        self,
+        fg_color: Any,
+        bg_color: Any = (0.0, 0.0, 0.0, 1.0),
+        inflate: Any = 0.0,
+        inner: Any = -1.5,
+        outer: Any = 0.0,
+    ) -> ColorTexture: ...
+    def fill_from_texture(
+        self, layer: Any, background: Any = (0.0, 0.0, 0.0, 0.0), inflate: Any = 0
+    ) -> ColorTexture: ...
+    def generate_mask(
+        self,
+        inflate: Any = 0.0,
+        color0: Any = (0.0, 0.0, 0.0, 1.0),
+        color1: Any = (1.0, 1.0, 1.0, 1.0),
+    ) -> ColorTexture: ...
+    def glow(
+        self, blur: Any = 8.0, spread: Any = 0.0, color: Any = (1.0, 1.0, 1.0, 1.0)
+    ) -> ColorTexture: ...
     def half_plane(self, point: Any, normal: Any) -> SDFTexture: ...
     def interpolate(self, other: Any, t: Any = 0.5) -> SDFTexture: ...
     def intersection(self, other: Any) -> SDFTexture: ...
-    def isolines(self, fg_color: Any, bg_color: Any = (0.0, 0.0, 0.0, 0.0), inflate: Any = 0.0, spacing: Any = 0.75, line_width: Any = 0.2, feather: Any = 0.15, phase: Any = 0.0) -> ColorTexture: ...
-    def light(self, fg_color: Any, bg_color: Any = (0.0, 0.0, 0.0, 0.0), light_dir: Any = (-0.45, -0.65, 0.7), ambient: Any = 0.35, diffuse: Any = 0.75, specular: Any = 0.2, shininess: Any = 24.0, normal_strength: Any = 4.0, bevel: Any = 8.0, shade_background: Any = False, background_bevel: Any = 0.0, height_profile: Any = 0.0, height_gamma: Any = 1.0, height: Any = 1.0, inflate: Any = 0.0, inner: Any = -1.5, outer: Any = 1.5) -> ColorTexture: ...
+    def isolines(
+        self,
+        fg_color: Any,
+        bg_color: Any = (0.0, 0.0, 0.0, 0.0),
+        inflate: Any = 0.0,
+        spacing: Any = 0.75,
+        line_width: Any = 0.2,
+        feather: Any = 0.15,
+        phase: Any = 0.0,
+    ) -> ColorTexture: ...
+    def light(
+        self,
+        fg_color: Any,
+        bg_color: Any = (0.0, 0.0, 0.0, 0.0),
+        light_dir: Any = (-0.45, -0.65, 0.7),
+        ambient: Any = 0.35,
+        diffuse: Any = 0.75,
+        specular: Any = 0.2,
+        shininess: Any = 24.0,
+        normal_strength: Any = 4.0,
+        bevel: Any = 8.0,
+        shade_background: Any = False,
+        background_bevel: Any = 0.0,
+        height_profile: Any = 0.0,
+        height_gamma: Any = 1.0,
+        height: Any = 1.0,
+        inflate: Any = 0.0,
+        inner: Any = -1.5,
+        outer: Any = 1.5,
+    ) -> ColorTexture: ...
     def masked_union(self, other: Any) -> MultiOutputResult: ...
-    def ngon(self, center: Any, radius: Any, sides: Any = 6, rotation: Any = 0.0) -> SDFTexture: ...
-    def outline(self, fg_color: Any, bg_color: Any = (0.0, 0.0, 0.0, 0.0), inflate: Any = 0.0) -> ColorTexture: ...
+    def ngon(
+        self, center: Any, radius: Any, sides: Any = 6, rotation: Any = 0.0
+    ) -> SDFTexture: ...
+    def outline(
+        self, fg_color: Any, bg_color: Any = (0.0, 0.0, 0.0, 0.0), inflate: Any = 0.0
+    ) -> ColorTexture: ...
     def parallelogram(self, center: Any, size: Any, skew: Any = 0.0) -> SDFTexture: ...
     def partial_derivative(self) -> ColorTexture: ...
-    def pie(self, center: Any, radius: Any, start_angle: Any, end_angle: Any) -> SDFTexture: ...
+    def pie(
+        self, center: Any, radius: Any, start_angle: Any, end_angle: Any
+    ) -> SDFTexture: ...
     def polygon(self, points: Any) -> SDFTexture: ...
     def repeat(self, s: Any = 15.0) -> SDFTexture: ...
     def rhombus(self, center: Any, radii: Any) -> SDFTexture: ...
     def ring(self, center: Any, radius: Any, thickness: Any = 8.0) -> SDFTexture: ...
-    def sector(self, center: Any, radius: Any, start_angle: Any, end_angle: Any) -> SDFTexture: ...
-    def shadow(self, distance: Any = 10, inflate: Any = 0, transparency: Any = 0.75) -> ColorTexture: ...
+    def rotate(self, angle: Any, center: Any = (0.0, 0.0)) -> SDFTexture: ...
+    def scale(self, factor: Any, center: Any = (0.0, 0.0)) -> SDFTexture: ...
+    def sector(
+        self, center: Any, radius: Any, start_angle: Any, end_angle: Any
+    ) -> SDFTexture: ...
+    def shadow(
+        self,
+        distance: Any = 10,
+        inflate: Any = 0,
+        transparency: Any = 0.75,
+        analytic: Any = False,
+    ) -> ColorTexture: ...
+    def skew(self, skew: Any, center: Any = (0.0, 0.0)) -> SDFTexture: ...
     def smooth_union(self, other: Any, k: Any = 0.025) -> SDFTexture: ...
+    def soft_shadow(
+        self,
+        offset: Any = (0.0, 0.0),
+        blur: Any = 8.0,
+        spread: Any = 0.0,
+        color: Any = (0.0, 0.0, 0.0, 0.75),
+    ) -> ColorTexture: ...
     def subtract(self, other: Any) -> SDFTexture: ...
+    def translate(self, offset: Any) -> SDFTexture: ...
     def union(self, other: Any) -> SDFTexture: ...
-    def wedge(self, center: Any, radius: Any, start_angle: Any, end_angle: Any) -> SDFTexture: ...
+    def wedge(
+        self, center: Any, radius: Any, start_angle: Any, end_angle: Any
+    ) -> SDFTexture: ...
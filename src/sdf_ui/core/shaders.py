@@ -18,6 +18,27 @@ class ShaderLibrary:
         self._cache = {}
 
     def get(self, shader_name: str):
+        if shader_name not in self._cache:
+            self._cache[shader_name] = self._compile(self.source(shader_name))
+            logger().debug(f"Compiled and cached {shader_name} shader...")
+
+        return self._cache[shader_name]
+
+    def get_fused(self, shape):
+        """Return the program for a fused SDF subgraph, compiling it once per shape."""
+        from .fusion import fused_shader_source
+
+        key = ("fused", shape)
+        if key not in self._cache:
+            code = fused_shader_source(shape, self.source)
+            self._cache[key] = self._compile(code)
+            logger().debug(
+                f"Compiled and cached fused shader for {len(shape)} nodes..."
+            )
+
+        return self._cache[key]
+
+    def source(self, shader_name: str):
         shader_files = {
             descriptor.name: descriptor for descriptor in registry.shader_files()
         }
@@ -25,19 +46,17 @@ class ShaderLibrary:
             known = ", ".join(sorted(shader_files))
             raise KeyError(f"Unknown shader '{shader_name}'. Known shaders: {known}")
 
-        if shader_name not in self._cache:
-            descriptor = shader_files[shader_name]
-            path = self._base_path / descriptor.path
-
-            if not path.exists():
-                raise FileNotFoundError(
-                    f"Shader '{shader_name}' is registered at '{path}', but no file exists there."
-                )
-
-            code = path.read_text(encoding="utf-8")
-            if self._sdf_image_format != "r32f":
-                code = code.replace("layout (r32f", f"layout ({self._sdf_image_format}")
-            self._cache[shader_name] = self._mgl_ctx.compute_shader(code)
-            logger().debug(f"Compiled and cached {shader_name} shader...")
+        descriptor = shader_files[shader_name]
+        path = self._base_path / descriptor.path
 
-        return self._cache[shader_name]
+        if not path.exists():
+            raise FileNotFoundError(
+                f"Shader '{shader_name}' is registered at '{path}', but no file exists there."
+            )
+
+        return path.read_text(encoding="utf-8")
+
+    def _compile(self, code):
+        if self._sdf_image_format != "r32f":
+            code = code.replace("layout (r32f", f"layout ({self._sdf_image_format}")
+        return self._mgl_ctx.compute_shader(code)
@@ -2,18 +2,27 @@
 
 __docformat__ = "google"
 
+import hashlib
 from abc import ABC
+from contextlib import contextmanager
 from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
 from time import perf_counter
 from typing import Dict, Optional
 
+import numpy as np
 from PIL import Image
 
 from ..util import hex_col
-from .context import Context, decrease_tex_registry
+from .context import Context
+from .plugins.base import TextureKind
 from .plugins.common import build
 from .texture_utils import show_texture
 
+_MISSING = object()
+_PACKAGE_ROOT = Path(__file__).parent.parent
+
 
 def freeze(value):
     if isinstance(value, TextureNode) or isinstance(value, MultiOutputResult):
@@ -29,6 +38,198 @@ def texture_params(**kwargs):
     return tuple(sorted((key, freeze(value)) for key, value in kwargs.items()))
 
 
+class NodeDigest:
+    """Structural identity of a render node, computed once per node.
+
+    ``parts`` holds the static description of the node (kind, op, mode, the
+    digests of its inputs and its unresolved params). ``param_names`` lists
+    the ``param()`` names the whole subtree depends on, so a render-time key
+    only needs the digest plus the current values of those names.
+    ``stable`` memoizes ``stable_digest`` of the node.
+    """
+
+    __slots__ = ("parts", "param_names", "stable", "_hash")
+
+    def __init__(self, parts, param_names=frozenset()):
+        self.parts = parts
+        self.param_names = param_names
+        self.stable = None
+        self._hash = hash(parts)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, NodeDigest) or self._hash != other._hash:
+            return False
+        return self.parts == other.parts
+
+    def __repr__(self):
+        return f"NodeDigest({self._hash:#x})"
+
+
+def node_digest(node):
+    digest = node._digest
+    if digest is not None:
+        return digest
+
+    # Digest the graph children first, so each node only looks up the
+    # memoized digests of its inputs and deep graphs do not recurse.
+    for pending in _post_order(node, lambda item: item._digest is not None):
+        _digest_node(pending)
+    return node._digest
+
+
+def _post_order(node, done):
+    """Nodes of the graph below ``node`` that are not ``done``, inputs first.
+
+    Materialized textures are leaves, their inputs are never visited.
+    """
+    order = []
+    seen = set()
+    stack = [(node, False)]
+    while stack:
+        current, expanded = stack.pop()
+        if expanded:
+            order.append(current)
+            continue
+        if id(current) in seen or done(current):
+            continue
+        seen.add(id(current))
+        stack.append((current, True))
+        if getattr(current, "tex", None) is None:
+            stack.extend((child, False) for child in _child_nodes(current))
+    return order
+
+
+def _digest_node(node):
+    if getattr(node, "tex", None) is not None:
+        # Textures produced by a renderer are tagged with the key of the node
+        # that rendered them (see ``Renderer._mark_rendered``). Any other
+        # texture is identified by its content, never by id(tex): pooled
+        # textures are reused.
+        hasher = hashlib.sha256(repr(tuple(node.tex.size)).encode())
+        hasher.update(node.tex.read())
+        digest = NodeDigest(
+            ("texture", node.kind, getattr(node, "mode", None), hasher.hexdigest())
+        )
+    else:
+        names = set()
+        inputs = tuple(_static_value(input_, names) for input_ in node.inputs)
+        params = tuple((key, _static_value(value, names)) for key, value in node.params)
+        digest = NodeDigest(
+            (node.kind, node.op, getattr(node, "mode", None), inputs, params),
+            frozenset(names),
+        )
+
+    object.__setattr__(node, "_digest", digest)
+
+
+def _static_value(value, names):
+    if isinstance(value, TextureNode) or isinstance(value, MultiOutputResult):
+        digest = node_digest(value)
+        names.update(digest.param_names)
+        return digest
+    if isinstance(value, dict):
+        return tuple(
+            sorted((key, _static_value(val, names)) for key, val in value.items())
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(_static_value(item, names) for item in value)
+    if isinstance(value, np.ndarray):
+        # Arrays (e.g. instance parameters) are keyed by content.
+        return ("ndarray", value.dtype.str, value.shape, value.tobytes())
+
+    from .expressions import Expr, param_names
+
+    if isinstance(value, Expr):
+        names.update(param_names(value))
+    return value
+
+
+def stable_digest(node):
+    """Return a hex digest of ``node`` that is the same in every process.
+
+    Materialized textures are identified by their content or by the node
+    that rendered them. Other nodes by their op, mode, inputs and unresolved
+    params.
+    """
+    digest = node_digest(node)
+    if digest.stable is None:
+        for pending in _post_order(
+            node, lambda item: node_digest(item).stable is not None
+        ):
+            _stable_digest_node(pending)
+    return digest.stable
+
+
+def _stable_digest_node(node):
+    digest = node_digest(node)
+    hasher = hashlib.sha256()
+    if getattr(node, "tex", None) is not None:
+        _stable_update(hasher, digest.parts)
+    else:
+        _stable_update(
+            hasher,
+            (
+                node.kind,
+                node.op,
+                getattr(node, "mode", None),
+                node.inputs,
+                node.params,
+            ),
+        )
+    digest.stable = hasher.hexdigest()
+
+
+def _stable_update(hasher, value):
+    """Feed a canonical, process-independent encoding of ``value``."""
+    if isinstance(value, TextureNode) or isinstance(value, MultiOutputResult):
+        hasher.update(b"N" + stable_digest(value).encode())
+        return
+    if isinstance(value, dict):
+        value = tuple(sorted(value.items(), key=lambda item: repr(item[0])))
+    if isinstance(value, (list, tuple)):
+        hasher.update(b"(%d:" % len(value))
+        for item in value:
+            _stable_update(hasher, item)
+        hasher.update(b")")
+        return
+    if isinstance(value, np.ndarray):
+        header = f"A{value.dtype.str}{value.shape}:".encode()
+        hasher.update(header + np.ascontiguousarray(value).tobytes())
+        return
+    if value is _MISSING:
+        hasher.update(b"M;")
+        return
+
+    from .expressions import Expr
+
+    if isinstance(value, Expr):
+        hasher.update(f"E{value.op}".encode())
+        _stable_update(hasher, value.args)
+        return
+    hasher.update(f"{type(value).__name__}:{value!r};".encode())
+
+
+@lru_cache(maxsize=None)
+def source_digest():
+    """Hex digest of every ``.py`` and ``.glsl`` file of the package.
+
+    Results stored on disk are keyed with it. Plugins import shared modules
+    (fonts, segments, the jump flood) and render helper graphs of other
+    plugins, so any source file can change what a node renders.
+    """
+    hasher = hashlib.sha256()
+    paths = [*_PACKAGE_ROOT.rglob("*.py"), *_PACKAGE_ROOT.rglob("*.glsl")]
+    for path in sorted(paths):
+        hasher.update(path.relative_to(_PACKAGE_ROOT).as_posix().encode() + b"\0")
+        hasher.update(path.read_bytes())
+    return hasher.hexdigest()
+
+
 @dataclass
 class RenderStats:
     shader_dispatches: int = 0
@@ -37,8 +238,19 @@ class RenderStats:
     cache_misses: int = 0
     cache_writes: int = 0
     cache_skips: int = 0
+    cache_invalidations: int = 0
+    cache_evictions: int = 0
+    cache_evicted_bytes: int = 0
+    cache_rejections: int = 0
+    disk_hits: int = 0
+    disk_misses: int = 0
+    disk_writes: int = 0
     texture_allocations: int = 0
     texture_allocations_by_kind: Dict[str, int] = field(default_factory=dict)
+    texture_reuses: int = 0
+    texture_recycles: int = 0
+    fused_nodes: int = 0
+    color_conversions_removed: int = 0
     render_calls: int = 0
     elapsed_seconds: float = 0.0
 
@@ -54,6 +266,12 @@ class RenderStats:
             self.texture_allocations_by_kind.get(kind, 0) + 1
         )
 
+    def record_texture_reuse(self, kind):
+        self.texture_reuses += 1
+
+    def record_texture_recycle(self, kind):
+        self.texture_recycles += 1
+
     def as_dict(self):
         return {
             "shader_dispatches": self.shader_dispatches,
@@ -62,8 +280,19 @@ class RenderStats:
             "cache_misses": self.cache_misses,
             "cache_writes": self.cache_writes,
             "cache_skips": self.cache_skips,
+            "cache_invalidations": self.cache_invalidations,
+            "cache_evictions": self.cache_evictions,
+            "cache_evicted_bytes": self.cache_evicted_bytes,
+            "cache_rejections": self.cache_rejections,
+            "disk_hits": self.disk_hits,
+            "disk_misses": self.disk_misses,
+            "disk_writes": self.disk_writes,
             "texture_allocations": self.texture_allocations,
             "texture_allocations_by_kind": dict(self.texture_allocations_by_kind),
+            "texture_reuses": self.texture_reuses,
+            "texture_recycles": self.texture_recycles,
+            "fused_nodes": self.fused_nodes,
+            "color_conversions_removed": self.color_conversions_removed,
             "render_calls": self.render_calls,
             "elapsed_seconds": self.elapsed_seconds,
         }
@@ -76,17 +305,53 @@ class RenderCacheInfo:
     misses: int
     writes: int
     skips: int
+    evictions: int = 0
+    rejections: int = 0
+    bytes: int = 0
+    max_bytes: Optional[int] = None
 
 
 class Renderer:
+    """Evaluates render nodes against a context.
+
+    Results are stored in ``cache`` by node key. When no cache is passed in,
+    the cache only lives for this renderer and intermediate results are
+    returned to the context texture pool as soon as their last consumer in
+    the graph has run. Results of ``uncached()`` nodes are always recycled
+    that way. A ``RenderCache`` bounds the cache by texture memory, entries
+    it evicts are recycled as well. Results are offered to it with their
+    render time, so its policy can weigh cost against size.
+
+    ``render(node, params=...)`` renders with different ``param()`` values
+    than the ones the renderer was created with. Cache keys only include the
+    values of the names a subtree depends on, so successive renders reuse
+    every node that does not depend on a changed name. A node that is
+    re-rendered with new values replaces its previous cache entry, and the
+    entries of the helper graphs its plugin rendered that the new render no
+    longer uses.
+    """
+
     def __init__(self, ctx, params=None, cache=None):
         if ctx is None:
             raise ValueError("A Context is required to render a texture")
         self.ctx = ctx
         self.params = params or {}
+        self.retain_results = cache is not None
         self.cache = {} if cache is None else cache
         self.stats = RenderStats()
+        self._base_params = self.params
         self._render_depth = 0
+        self._fingerprint = _context_fingerprint(ctx)
+        self._latest_keys = {}
+        self._returned_keys = set()
+        # Cache keys of the helper graphs each plugin rendered, by the key of
+        # the node whose plugin rendered them, see ``_record_helper``.
+        self._helper_keys = {}
+        self._owners = []
+        self._nested_seconds = []
+        self._last_cost = 0.0
+        self._rewritten = None
+        self._reset_liveness()
 
     def __enter__(self):
         return self
@@ -94,39 +359,131 @@ class Renderer:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
-    def render(self, value):
-        is_root_render = self._render_depth == 0
-        if is_root_render:
-            start = perf_counter()
-            previous_stats = getattr(self.ctx, "_active_render_stats", None)
-            self.ctx._active_render_stats = self.stats
-            self.stats.render_calls += 1
+    def render(self, value, params=None):
+        """Render ``value``.
+
+        Args:
+            value: A render node or a plain value to resolve.
+            params: ``param()`` values for this render, layered over the
+                params of the renderer. Only allowed for top-level renders.
 
+        Returns:
+            The rendered texture (or tuple of textures).
+        """
+        if self._render_depth == 0:
+            self.params = (
+                self._base_params if params is None else {**self._base_params, **params}
+            )
+            with self._root_render():
+                value = self._eliminate_conversions(value)
+                self._last_cost = 0.0
+                result = self._render(value, root=True)
+                disk = getattr(self.cache, "disk", None)
+                if disk is not None and isinstance(value, TextureNode):
+                    self._save_to_disk(disk, value, result, self._last_cost)
+            if self.retain_results and (
+                isinstance(value, TextureNode) or isinstance(value, MultiOutputResult)
+            ):
+                self._returned_keys.add(self._node_key(value))
+            return result
+        if params is not None:
+            raise ValueError("params can only be passed to a top-level render")
+        return self._render(value)
+
+    def compile(self, node):
+        """Flatten ``node`` into a ``RenderPlan`` that can be re-run cheaply.
+
+        Subgraphs that do not depend on any ``param()`` are rendered once
+        here. The rest becomes a list of dispatches that ``plan.run(params)``
+        replays with updated uniforms. See ``sdf_ui.core.plan``.
+        """
+        from .plan import compile_plan
+
+        with self._root_render():
+            return compile_plan(self, self._eliminate_conversions(node))
+
+    def _eliminate_conversions(self, value):
+        if not isinstance(value, TextureNode) or not getattr(
+            self.ctx, "color_conversion_elimination", False
+        ):
+            return value
+        # Sessions usually render the same root over and over.
+        if self._rewritten is None or self._rewritten[0] is not value:
+            from .color import eliminate_conversions
+
+            self._rewritten = (value, *eliminate_conversions(value))
+        _value, root, removed = self._rewritten
+        self.stats.color_conversions_removed += removed
+        return root
+
+    def _render(self, value, root=False):
         self._render_depth += 1
         try:
             if isinstance(value, TextureNode) or isinstance(value, MultiOutputResult):
-                return self._eval(value)
+                if root:
+                    for cached in self.cache.values():
+                        self._use_textures(cached, 1)
+                self._plan_liveness(value)
+                result = self._eval(value)
+                if not root and self.retain_results:
+                    self._pin_helper_result(value, result)
+                return result
             return self._resolve(value)
         finally:
             self._render_depth -= 1
-            if is_root_render:
-                self.stats.elapsed_seconds += perf_counter() - start
-                self.ctx._active_render_stats = previous_stats
-                self.ctx.last_render_stats = self.stats
+
+    def _pin_helper_result(self, node, result):
+        # Graphs rendered by plugin code have no consumer in the graph. Their
+        # results stay pinned for the rest of the render so an eviction can't
+        # recycle a texture the plugin is still working with.
+        if not self._consumers.get(self._node_key(node)):
+            self._use_textures(result, 1)
+
+    @contextmanager
+    def _root_render(self):
+        start = perf_counter()
+        activate = getattr(self.ctx, "activate", None)
+        if callable(activate):
+            activate()
+        previous_stats = getattr(self.ctx, "_active_render_stats", None)
+        self.ctx._active_render_stats = self.stats
+        self.stats.render_calls += 1
+        # The SDF format may have changed on a fallback allocation, keys are
+        # fixed for the duration of a render.
+        self._fingerprint = _context_fingerprint(self.ctx)
+        try:
+            yield
+        finally:
+            self._reset_liveness()
+            self.stats.elapsed_seconds += perf_counter() - start
+            self.ctx._active_render_stats = previous_stats
+            self.ctx.last_render_stats = self.stats
 
     def close(self):
-        self.cache.clear()
+        self.clear_cache()
 
     def clear_cache(self):
         self.cache.clear()
+        self._latest_keys.clear()
+        self._returned_keys.clear()
+        self._helper_keys.clear()
 
     def cache_info(self):
+        from .cache import result_bytes
+
+        total_bytes = getattr(self.cache, "total_bytes", None)
+        if total_bytes is None:
+            total_bytes = sum(result_bytes(value) for value in self.cache.values())
         return RenderCacheInfo(
             entries=len(self.cache),
             hits=self.stats.cache_hits,
             misses=self.stats.cache_misses,
             writes=self.stats.cache_writes,
             skips=self.stats.cache_skips,
+            evictions=self.stats.cache_evictions,
+            rejections=self.stats.cache_rejections,
+            bytes=total_bytes,
+            max_bytes=getattr(self.cache, "max_bytes", None),
         )
 
     def _eval(self, node):
@@ -135,8 +492,13 @@ class Renderer:
 
         cache_key = self._node_key(node)
         if node.should_cache and cache_key in self.cache:
-            self.stats.cache_hits += 1
-            return self.cache[cache_key]
+            # Keys do not include the context, textures of another context
+            # with the same fingerprint are a miss.
+            result = self.cache[cache_key]
+            if self._owned(result):
+                self.stats.cache_hits += 1
+                self._record_helper(cache_key)
+                return result
         if node.should_cache:
             self.stats.cache_misses += 1
         else:
@@ -144,17 +506,381 @@ class Renderer:
 
         from sdf_ui.core.plugins.registry import registry
 
-        plugin = registry.get(node.op)
-        inputs = tuple(self.render(input_) for input_ in node.inputs)
-        params = dict((key, self._resolve(value)) for key, value in node.params)
-        result = plugin.render(self, inputs, params)
+        disk = getattr(self.cache, "disk", None) if node.should_cache else None
+        loaded = None if disk is None else self._load_from_disk(disk, node)
+        if loaded is not None:
+            # The cache policy weighs the result by its render cost, not by
+            # the cheaper load, or loaded results would be evicted first.
+            result, cost = loaded
+            return self._store_result(node, cache_key, result, cost)
 
+        plugin = registry.get(node.op)
+        # Time spent in nested evaluations is excluded from the node's cost,
+        # those results are cached on their own.
+        start = perf_counter()
+        self._nested_seconds.append(0.0)
+        try:
+            fused = self._render_fused(node, plugin)
+            if fused is not None:
+                result, fused_keys = fused
+            else:
+                # A plain loop keeps deep graphs to three frames per level.
+                inputs = []
+                for input_ in node.inputs:
+                    inputs.append(self.render(input_))
+                inputs = tuple(inputs)
+                params = {key: self._resolve(value) for key, value in node.params}
+                if node.should_cache:
+                    self._owners.append(cache_key)
+                try:
+                    result = plugin.render(self, inputs, params)
+                finally:
+                    if node.should_cache:
+                        self._owners.pop()
+                fused_keys = ()
+        finally:
+            elapsed = perf_counter() - start
+            cost = elapsed - self._nested_seconds.pop()
+            if self._nested_seconds:
+                self._nested_seconds[-1] += elapsed
+
+        if disk is not None and cost >= disk.min_cost:
+            self._save_to_disk(disk, node, result, cost)
+        return self._store_result(node, cache_key, result, cost, fused_keys)
+
+    def _store_result(self, node, cache_key, result, cost, fused_keys=()):
+        self._last_cost = cost
+        self._mark_rendered(result, cache_key)
         if node.should_cache:
-            self.cache[cache_key] = result
+            self._invalidate_previous(node, cache_key)
+        if node.should_cache and self._store(cache_key, result, cost):
+            self._use_textures(result, 1)
             self.stats.cache_writes += 1
+            self._record_helper(cache_key)
+            self._evict_over_budget()
 
+        self._release_inputs(node, cache_key, result, fused_keys)
         return result
 
+    def _stable_key(self, node):
+        # Results on disk outlive the code, editing any source file of the
+        # package changes their keys.
+        parts = (source_digest(), *self._node_key(node))
+        return hashlib.sha256(" ".join(parts).encode()).hexdigest()
+
+    def _load_from_disk(self, disk, node):
+        from sdf_ui.core.color import ColorTexture
+        from sdf_ui.core.sdf import SDFTexture
+
+        start = perf_counter()
+        loaded = disk.load(self._stable_key(node))
+        width, height = self.ctx.size
+        if loaded is None or loaded[0].shape[:2] != (height, width):
+            self.stats.disk_misses += 1
+            return None
+
+        array, kind, mode, cost = loaded
+        if kind == TextureKind.SDF:
+            tex = self.ctx.r32f()
+            result = SDFTexture(tex=tex, context=self.ctx)
+        else:
+            tex = self.ctx.rgba8()
+            result = ColorTexture(tex=tex, context=self.ctx, mode=mode)
+        tex.write(memoryview(np.ascontiguousarray(array)))
+        self.stats.disk_hits += 1
+        return result, max(cost, perf_counter() - start)
+
+    def _save_to_disk(self, disk, node, result, cost=0.0):
+        if not isinstance(result, TextureNode) or result.tex is None:
+            return
+        key = self._stable_key(node)
+        if key in disk:
+            return
+
+        width, height = result.tex.size
+        if result.kind == TextureKind.SDF:
+            array = np.frombuffer(result.tex.read(), dtype=np.float32)
+            array = array.reshape((height, width))
+        else:
+            array = np.frombuffer(result.tex.read(), dtype=np.uint8)
+            array = array.reshape((height, width, 4))
+        disk.save(key, array, result.kind, getattr(result, "mode", None), cost)
+        self.stats.disk_writes += 1
+
+    def _render_fused(self, node, plugin):
+        """Evaluate ``node`` and its fusable inputs in a single dispatch.
+
+        Returns ``None`` when there is nothing to fuse.
+        """
+        from sdf_ui.core.operations import run_shader
+        from sdf_ui.core.sdf import SDFTexture
+
+        region = self._fusion_region(node, plugin)
+        if region is None:
+            return None
+        members, shape, externals = region
+
+        ctx = self.ctx
+        inputs = []
+        for child in externals:
+            inputs.append(self.render(child))
+        uniforms = {"destTex": 0}
+        for index, (member, member_plugin) in enumerate(members):
+            if member_plugin.make_uniforms is None:
+                continue
+            params = {key: self._resolve(value) for key, value in member.params}
+            for name, value in member_plugin.make_uniforms(params).items():
+                uniforms[f"n{index}_{name}"] = value
+
+        tex = ctx.r32f()
+        image_bindings = [(tex, 0, False, True)]
+        for location, texture in enumerate(inputs, start=1):
+            uniforms[f"input{location - 1}"] = location
+            image_bindings.append((texture.tex, location, True, False))
+
+        run_shader(
+            ctx,
+            "fused_sdf",
+            uniforms=uniforms,
+            image_bindings=image_bindings,
+            program=ctx.get_fused_shader(shape),
+        )
+        self.stats.fused_nodes += len(shape)
+
+        fused_keys = tuple(self._node_key(member) for member, _ in members[:-1])
+        return SDFTexture(tex=tex, context=ctx), fused_keys
+
+    def _fusion_region(self, node, plugin):
+        """Collect the subgraph below ``node`` that can run as one fused shader.
+
+        Inputs are folded into the program when they are fusable SDF nodes
+        that are not cached and have no other consumer in the graph; every
+        other input is bound as an image. Returns ``(members, shape,
+        externals)`` with members as ``(node, plugin)`` pairs in evaluation
+        order, or ``None`` when there is nothing to fuse.
+        """
+        from sdf_ui.core.fusion import MAX_FUSED_INPUTS, MAX_FUSED_NODES
+        from sdf_ui.core.plugins.registry import registry
+
+        if not plugin.fusable or not getattr(self.ctx, "shader_fusion", False):
+            return None
+
+        # A retained dynamic region keeps its param-independent inputs out of
+        # the program, they are cached on their own and reused by later
+        # renders with other param values.
+        dynamic = self.retain_results and bool(node_digest(node).param_names)
+
+        region = [node]
+        fused = {id(node)}
+        for member in region:
+            for child in member.inputs:
+                if dynamic and not node_digest(child).param_names:
+                    continue
+                if len(region) < MAX_FUSED_NODES and self._can_fuse(child):
+                    region.append(child)
+                    fused.add(id(child))
+        if len(region) == 1:
+            return None
+
+        shape = []
+        members = []
+        externals = {}
+
+        def visit(member):
+            args = []
+            for child in member.inputs:
+                if id(child) in fused:
+                    args.append(("node", visit(child)))
+                    continue
+                key = self._node_key(child)
+                if key not in externals:
+                    externals[key] = (len(externals), child)
+                args.append(("input", externals[key][0]))
+            member_plugin = registry.get(member.op)
+            shape.append(
+                (member_plugin.shader.name, member_plugin.input_uniforms, tuple(args))
+            )
+            members.append((member, member_plugin))
+            return len(shape) - 1
+
+        visit(node)
+        if len(externals) > MAX_FUSED_INPUTS:
+            return None
+        return members, tuple(shape), [child for _index, child in externals.values()]
+
+    def _can_fuse(self, node):
+        from sdf_ui.core.plugins.registry import registry
+
+        if not isinstance(node, TextureNode) or node.kind != TextureKind.SDF:
+            return False
+        if node.tex is not None or not registry.get(node.op).fusable:
+            return False
+        key = self._node_key(node)
+        if self._consumers.get(key, 0) > 1:
+            return False
+        return not (node.should_cache and key in self.cache)
+
+    def _plan_liveness(self, root):
+        """Count how many graph nodes consume each node below ``root``.
+
+        Plugins that render helper graphs call back into ``render``; those
+        graphs are merged into the same bookkeeping.
+        """
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            key = self._node_key(node)
+            if key in self._planned:
+                continue
+            self._planned.add(key)
+
+            child_keys = []
+            for child in _child_nodes(node):
+                if getattr(child, "tex", None) is not None:
+                    self._use_textures(child, 1)
+                    continue
+                child_key = self._node_key(child)
+                self._consumers[child_key] = self._consumers.get(child_key, 0) + 1
+                child_keys.append(child_key)
+                stack.append(child)
+            self._children[key] = child_keys
+
+    def _reset_liveness(self):
+        self._planned = set()
+        self._consumers = {}
+        self._children = {}
+        self._live = {}
+        self._texture_uses = {}
+
+    def _release_inputs(self, node, key, result, fused_keys=()):
+        child_keys = self._children.pop(key, None)
+        if child_keys is None:
+            return
+        # Nodes folded into a fused dispatch never ran on their own, their
+        # inputs are released together with the fused node.
+        for fused_key in fused_keys:
+            child_keys = child_keys + self._children.pop(fused_key, [])
+
+        if self._consumers.get(key, 0) > 0 and key not in self._live:
+            self._live[key] = result
+            self._use_textures(result, 1)
+
+        # Keep the fresh result alive while its inputs are released, it may
+        # share textures with them (e.g. "output" of a multi-output node).
+        self._use_textures(result, 1)
+        for child_key in child_keys:
+            remaining = self._consumers[child_key] - 1
+            self._consumers[child_key] = remaining
+            if remaining == 0:
+                self._release_key(child_key)
+        self._use_textures(result, -1)
+
+    def _release_key(self, key):
+        result = self._live.pop(key, None)
+        if result is None:
+            return
+
+        self._use_textures(result, -1)
+        # Releasing a result is no use of it, peek leaves its priority alone.
+        peek = getattr(self.cache, "peek", self.cache.get)
+        cached = peek(key) is result
+        retained = self.retain_results and cached
+        if not retained and cached:
+            del self.cache[key]
+            self._use_textures(result, -1)
+        self._recycle(result)
+
+    def _invalidate_previous(self, node, key):
+        """Drop the entry cached for ``node`` under older ``param()`` values."""
+        digest = node_digest(node)
+        if not digest.param_names:
+            return
+        previous = self._latest_keys.get(digest)
+        self._latest_keys[digest] = key
+        if previous is None or previous == key:
+            return
+        self._invalidate_helpers(previous, key)
+        result = self.cache.pop(previous, None)
+        if result is None:
+            return
+
+        self.stats.cache_invalidations += 1
+        self._drop_cached(previous, result)
+
+    def _record_helper(self, key):
+        """Tie the entry ``key`` to the plugin rendering it, if there is one.
+
+        Plugins render helper graphs on their resolved inputs and params, e.g.
+        shadow blurs a mask. Those nodes depend on no ``param()`` themselves,
+        every value gives them new keys, so they are dropped together with the
+        entry of the node that rendered them.
+        """
+        if self._owners and self._owners[-1] != key:
+            self._helper_keys.setdefault(self._owners[-1], set()).add(key)
+
+    def _invalidate_helpers(self, previous, key):
+        """Drop the helper entries of ``previous`` that ``key`` did not reuse."""
+        kept = set()
+        pending = [key]
+        while pending:
+            for helper in self._helper_keys.get(pending.pop(), ()):
+                if helper not in kept:
+                    kept.add(helper)
+                    pending.append(helper)
+
+        pending = [previous]
+        while pending:
+            for helper in self._helper_keys.pop(pending.pop(), ()):
+                if helper in kept:
+                    continue
+                pending.append(helper)
+                result = self.cache.pop(helper, None)
+                if result is not None:
+                    self.stats.cache_invalidations += 1
+                    self._drop_cached(helper, result)
+
+    def _store(self, key, result, cost):
+        store = getattr(self.cache, "store", None)
+        if store is None:
+            self.cache[key] = result
+            return True
+        if store(key, result, cost):
+            return True
+        self.stats.cache_rejections += 1
+        return False
+
+    def _evict_over_budget(self):
+        over_budget = getattr(self.cache, "over_budget", None)
+        if over_budget is None:
+            return
+        for key, result, size in over_budget():
+            self.stats.cache_evictions += 1
+            self.stats.cache_evicted_bytes += size
+            self._drop_cached(key, result)
+
+    def _drop_cached(self, key, result):
+        """Recycle a result that was removed from the cache."""
+        self._use_textures(result, -1)
+        # Results handed out by render() may still be held by the caller.
+        if key in self._returned_keys:
+            self._returned_keys.discard(key)
+            return
+        self._recycle(result)
+
+    def _recycle(self, result):
+        for texture_node in _result_nodes(result):
+            tex = texture_node.tex
+            if tex is None or self._texture_uses.get(id(tex), 0) > 0:
+                continue
+            self._texture_uses.pop(id(tex), None)
+            texture_node.tex = None
+            self.ctx.recycle_texture(tex)
+
+    def _use_textures(self, result, delta):
+        for texture_node in _result_nodes(result):
+            tex_id = id(texture_node.tex)
+            self._texture_uses[tex_id] = self._texture_uses.get(tex_id, 0) + delta
+
     def _resolve(self, value):
         if isinstance(value, TextureNode) or isinstance(value, MultiOutputResult):
             return self._eval(value)
@@ -176,37 +902,66 @@ class Renderer:
         return value
 
     def _node_key(self, node):
-        if getattr(node, "tex", None) is not None:
-            return (
-                id(node.context),
-                node.kind,
-                id(node.tex),
-                getattr(node, "mode", None),
-            )
+        """Key of ``node`` made of strings that are the same in every process.
+
+        It combines the canvas fingerprint, ``stable_digest(node)`` and a hash
+        of the values of the ``param()`` names the node depends on.
+        """
+        digest = node_digest(node)
+        if not digest.param_names:
+            return self._fingerprint, stable_digest(node)
+        hasher = hashlib.sha256()
+        for name in sorted(digest.param_names):
+            _stable_update(hasher, (name, self.params.get(name, _MISSING)))
+        return self._fingerprint, stable_digest(node), hasher.hexdigest()
+
+    def _mark_rendered(self, result, key):
+        # A result is identified by the key of the node that rendered it, so
+        # graphs built from rendered textures get stable keys without reading
+        # the textures back.
+        for index, texture_node in enumerate(_result_nodes(result)):
+            if texture_node._digest is None:
+                parts = (
+                    "texture",
+                    texture_node.kind,
+                    getattr(texture_node, "mode", None),
+                )
+                digest = NodeDigest(parts + (key, index))
+                object.__setattr__(texture_node, "_digest", digest)
 
-        context_key = (id(self.ctx), self.ctx.size)
-        input_keys = tuple(
-            self._node_key(input_)
-            if isinstance(input_, TextureNode) or isinstance(input_, MultiOutputResult)
-            else self._freeze_runtime(self._resolve(input_))
-            for input_ in node.inputs
-        )
-        param_keys = tuple(
-            (key, self._freeze_runtime(self._resolve(value)))
-            for key, value in node.params
-        )
-        return context_key, node.kind, node.op, input_keys, param_keys
+    def _owned(self, result):
+        return all(node.context is self.ctx for node in _result_nodes(result))
+
+
+def _context_fingerprint(ctx):
+    width, height = ctx.size
+    return f"{int(width)}x{int(height)}:{getattr(ctx, '_sdf_image_dtype', 'f4')}"
 
-    def _freeze_runtime(self, value):
+
+def _child_nodes(node):
+    nodes = []
+
+    def collect(value):
         if isinstance(value, TextureNode) or isinstance(value, MultiOutputResult):
-            return self._node_key(value)
-        if isinstance(value, dict):
-            return tuple(
-                sorted((key, self._freeze_runtime(val)) for key, val in value.items())
-            )
-        if isinstance(value, (list, tuple)):
-            return tuple(self._freeze_runtime(item) for item in value)
-        return value
+            nodes.append(value)
+        elif isinstance(value, dict):
+            for item in value.values():
+                collect(item)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                collect(item)
+
+    collect(node.inputs)
+    collect(tuple(value for _key, value in node.params))
+    return nodes
+
+
+def _result_nodes(result):
+    if isinstance(result, TextureNode):
+        return (result,) if result.tex is not None else ()
+    if isinstance(result, (list, tuple)):
+        return tuple(node for item in result for node in _result_nodes(item))
+    return ()
 
 
 class TextureNode(ABC):
@@ -234,6 +989,7 @@ class TextureNode(ABC):
         )
         self.label = label
         self.should_cache = should_cache
+        self._digest = None
 
         if tex is not None and context is None:
             raise ValueError("context can't be None for a materialized texture")
@@ -243,11 +999,9 @@ class TextureNode(ABC):
     def __del__(self):
         if getattr(self, "tex", None) is not None:
             try:
-                self.tex.release()
+                self.context.release_texture(self.tex)
             except Exception:
                 pass
-            else:
-                decrease_tex_registry()
 
     def __getattr__(self, name):
         from sdf_ui.core.plugins.registry import registry
@@ -319,6 +1073,10 @@ class TextureNode(ABC):
             _save, ctx=ctx, params=params, cache=cache, size=size
         )
 
+    @property
+    def digest(self):
+        return node_digest(self)
+
     def named(self, label: str):
         return self._clone(label=label, should_cache=self.should_cache)
 
@@ -407,6 +1165,13 @@ class MultiOutputResult:
     label: Optional[str] = None
     should_cache: bool = True
     kind: str = "multi_output"
+    _digest: Optional[NodeDigest] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def digest(self):
+        return node_digest(self)
 
     def render(self, ctx, params=None, cache=None):
         return Renderer(ctx, params=params, cache=cache).render(self)
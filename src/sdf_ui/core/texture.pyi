@@ -1,14 +1,29 @@
 from __future__ import annotations
 
-from typing import Any, Iterator, Optional, TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Iterator, Optional
 
 if TYPE_CHECKING:
     from .color import ColorTexture
 
 class TextureNode:
     def render(self, ctx: Any = None, params: Any = None, cache: Any = None) -> Any: ...
-    def show(self, ctx: Any = None, params: Any = None, cache: Any = None, conversion: Any = True, size: Any = None) -> None: ...
-    def save(self, name: Any = './image.png', ctx: Any = None, params: Any = None, cache: Any = None, conversion: Any = True, size: Any = None) -> None: ...
+    def show(
+        self,
+        ctx: Any = None,
+        params: Any = None,
+        cache: Any = None,
+        conversion: Any = True,
+        size: Any = None,
+    ) -> None: ...
+    def save(
+        self,
+        name: Any = "./image.png",
+        ctx: Any = None,
+        params: Any = None,
+        cache: Any = None,
+        conversion: Any = True,
+        size: Any = None,
+    ) -> None: ...
     def named(self, label: Any) -> Any: ...
     def cache(self, label: Any = None) -> Any: ...
     def uncached(self) -> Any: ...
@@ -16,11 +31,12 @@ class TextureNode:
 class PostNamespace:
     def to_lab(self) -> ColorTexture: ...
     def to_rgb(self) -> ColorTexture: ...
-    def blur(self, n: Any = 0, base: Any = 9) -> ColorTexture: ...
+    def blur(self, n: Any = 0, base: Any = 9, sigma: Any = None) -> ColorTexture: ...
     def blur_13(self, n: Any = 0) -> ColorTexture: ...
     def blur_9(self, n: Any = 0) -> ColorTexture: ...
     def dither_1bit(self) -> ColorTexture: ...
     def dithering(self) -> ColorTexture: ...
+    def gaussian_blur(self, sigma: Any) -> ColorTexture: ...
     def invert(self) -> ColorTexture: ...
 
 class MultiOutputResult:
@@ -30,5 +46,7 @@ class MultiOutputResult:
     label: Optional[str]
     should_cache: bool
     kind: str
-    def render(self, ctx: Any, params: Optional[dict[str, Any]] = ..., cache: Any = ...) -> Any: ...
+    def render(
+        self, ctx: Any, params: Optional[dict[str, Any]] = ..., cache: Any = ...
+    ) -> Any: ...
     def __iter__(self) -> Iterator[Any]: ...
@@ -3,7 +3,17 @@ __docformat__ = "google"
 from .core.plugins.common import build
 
 
-def glyph(char, scale, ox, oy, path="fonts/SFUIDisplay-Bold.ttf", samples=16):
+def glyph(
+    char,
+    scale,
+    ox,
+    oy,
+    path="fonts/SFUIDisplay-Bold.ttf",
+    tolerance=0.1,
+    band=64.0,
+    *,
+    samples=None,
+):
     """
     Generate the signed distance field (SDF) for a glyph.
 
@@ -12,7 +22,12 @@ def glyph(char, scale, ox, oy, path="fonts/SFUIDisplay-Bold.ttf", samples=16):
     - scale (float): Scaling factor for the glyph.
     - ox, oy (float): Offset of the glyph.
     - path (str): Path to the font file.
-    - samples (int): Number of line segments used per quadratic Bezier.
+    - tolerance (float): Largest distance in pixels between the flattened
+      outline and its curves.
+    - band (float): Distance band around the glyph. The field is only computed
+      within this distance of the glyph's bounding box and clamped to it.
+    - samples: Deprecated and ignored, outlines are flattened to
+      ``tolerance`` instead. Passing it emits a ``DeprecationWarning``.
 
     Returns:
         SDFTexture: A render node producing the filled glyph SDF.
@@ -26,6 +41,8 @@ def glyph(char, scale, ox, oy, path="fonts/SFUIDisplay-Bold.ttf", samples=16):
         ox=ox,
         oy=oy,
         path=path,
+        tolerance=tolerance,
+        band=band,
         samples=samples,
     )
 
@@ -36,20 +53,35 @@ def text(
     ox=0,
     oy=0,
     path="fonts/georgia_regular.ttf",
-    samples=16,
+    tolerance=0.1,
     cache_size=128,
     line_height=1.2,
     oversample=2.0,
     min_render_size=64,
+    band=64.0,
+    msdf=False,
+    *,
+    samples=None,
 ):
     """
     Generate a signed distance field (SDF) for a text run.
 
-    Glyph SDF patches are cached by font, character, curve sampling, and
+    Glyph SDF patches are cached by font, character, curve tolerance, and
     requested pixel size. ``cache_size`` sets the minimum cached pixels-per-em
     value, ``oversample`` raises the cache resolution for larger text, and
     ``min_render_size`` keeps small text from losing too much SDF distance when
     resized down.
+
+    The field is clamped to ``band`` and filled with it away from the text.
+
+    ``tolerance`` is the largest distance in atlas pixels between the
+    flattened outline and its curves. ``samples``, the number of segments
+    per curve it replaced, is deprecated and ignored with a
+    ``DeprecationWarning``.
+
+    ``msdf`` stores multi-channel glyph SDFs that keep corners sharp when
+    magnified. Their atlas resolution is ``cache_size`` pixels per em for any
+    text size, so a much smaller ``cache_size``, e.g. 32, is enough.
     """
     return build(
         "text",
@@ -58,9 +90,12 @@ def text(
         ox=ox,
         oy=oy,
         path=path,
-        samples=samples,
+        tolerance=tolerance,
         cache_size=cache_size,
         line_height=line_height,
         oversample=oversample,
         min_render_size=min_render_size,
+        band=band,
+        msdf=msdf,
+        samples=samples,
     )
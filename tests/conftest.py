@@ -1,9 +1,20 @@
-from pathlib import Path
 import sys
+from pathlib import Path
 
+import pytest
 
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
+
+
+@pytest.fixture(autouse=True)
+def font_atlas_directory(tmp_path, monkeypatch):
+    """Keep font atlases written by tests out of the user's cache."""
+    from sdf_ui.core.fonts import FontAtlas
+
+    directory = tmp_path / "fonts"
+    monkeypatch.setattr(FontAtlas, "directory", directory)
+    return directory
@@ -319,3 +319,36 @@ def test_multi_output_results_unpack_to_typed_outputs():
 
     with pytest.raises(TypeError, match="not iterable"):
         list(MultiOutputResult(op="not_masked_union"))
+
+
+def test_node_digest_is_structural_and_tracks_param_dependencies():
+    left = sdf.circle((8, 8), param("radius", 4)) | sdf.circle((12, 8), 3)
+    right = sdf.circle((8, 8), param("radius", 4)) | sdf.circle((12, 8), 3)
+    other = sdf.circle((8, 8), 5) | sdf.circle((12, 8), 3)
+
+    assert left.digest is left.digest
+    assert left.digest == right.digest
+    assert hash(left.digest) == hash(right.digest)
+    assert left.digest != other.digest
+    assert left.digest.param_names == frozenset({"radius"})
+    assert other.digest.param_names == frozenset()
+
+    result = left.masked_union(other)
+    assert result.digest == left.masked_union(other).digest
+    assert list(result)[0].digest.param_names == frozenset({"radius"})
+
+
+def test_renderer_node_key_only_varies_with_referenced_params():
+    from sdf_ui.core.texture import Renderer
+
+    shape = sdf.circle((8, 8), param("radius", 4)).fill("#fff")
+    static = sdf.circle((8, 8), 4).fill("#fff")
+    ctx = FakeContext((16, 16))
+
+    small = Renderer(ctx, params={"radius": 2, "unused": 1})
+    large = Renderer(ctx, params={"radius": 6, "unused": 1})
+    other_unused = Renderer(ctx, params={"radius": 2, "unused": 9})
+
+    assert small._node_key(shape) != large._node_key(shape)
+    assert small._node_key(shape) == other_unused._node_key(shape)
+    assert small._node_key(static) == large._node_key(static)
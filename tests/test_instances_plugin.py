@@ -0,0 +1,127 @@
+import unittest
+from functools import reduce
+
+import numpy as np
+
+from sdf_ui import Canvas, sdf
+from sdf_ui.core.plugins.registry import registry
+
+
+def _distances(texture):
+    width, height = texture.tex.size
+    return (
+        np.frombuffer(texture.tex.read(), dtype=np.float32)
+        .reshape((height, width))
+        .copy()
+    )
+
+
+def _circle_field(size, centers, radii):
+    yy, xx = np.mgrid[0 : size[1], 0 : size[0]].astype(np.float32)
+    field = np.full((size[1], size[0]), np.inf, dtype=np.float32)
+    for (x, y), radius in zip(centers, radii):
+        field = np.minimum(field, np.hypot(xx - x, yy - y) - radius)
+    return field
+
+
+class InstancesPluginTests(unittest.TestCase):
+    def test_instanced_plugins_are_registered(self):
+        registry.ensure_loaded()
+
+        self.assertIn("circles", registry.public_names())
+        self.assertIn("instances", registry.public_names())
+        self.assertEqual(registry.get("circles").family, "primitive")
+
+    def test_circles_match_a_union_of_circles_in_one_dispatch(self):
+        rng = np.random.default_rng(3)
+        centers = rng.uniform(0, 64, (40, 2))
+        radii = rng.uniform(1, 5, 40)
+        union = reduce(
+            lambda a, b: a | b,
+            (sdf.circle(tuple(c), float(r)) for c, r in zip(centers, radii)),
+        )
+
+        with Canvas((64, 64)) as ctx:
+            instanced = _distances(sdf.circles(centers, radii).render(ctx))
+            stats = ctx.last_render_stats
+            expected = _distances(union.render(ctx))
+
+        self.assertEqual(stats.shader_dispatches_by_name, {"instances": 1})
+        self.assertEqual(stats.texture_allocations, 1)
+        np.testing.assert_allclose(instanced, expected, atol=1e-3)
+
+    def test_rect_and_capsule_instances_match_single_primitives(self):
+        rects = np.array([[16, 16, 8, 5, 2], [44, 40, 6, 10, 0]])
+        capsules = [[8, 50, 30, 58, 3]]
+
+        with Canvas((64, 64)) as ctx:
+            rect_field = _distances(sdf.instances("rect", rects).render(ctx))
+            single_rect = _distances(
+                sdf.rect((16, 16), (8, 5), (2, 2, 2, 2)).render(ctx)
+            )
+            capsule_field = _distances(sdf.instances("capsule", capsules).render(ctx))
+            single_capsule = _distances(sdf.capsule((8, 50), (30, 58), 3).render(ctx))
+
+        np.testing.assert_allclose(
+            rect_field[:24, :24], single_rect[:24, :24], atol=1e-3
+        )
+        np.testing.assert_allclose(capsule_field, single_capsule, atol=1e-3)
+
+    def test_smooth_instances_blend_between_neighbours(self):
+        centers = [(24, 32), (40, 32)]
+
+        with Canvas((64, 64)) as ctx:
+            hard = _distances(sdf.circles(centers, 7).render(ctx))
+            smooth = _distances(sdf.circles(centers, 7, k=6.0).render(ctx))
+
+        self.assertLess(smooth[32, 32], hard[32, 32] - 0.5)
+        self.assertAlmostEqual(float(smooth[32, 4]), float(hard[32, 4]), places=3)
+
+    def test_instance_arrays_are_keyed_by_content(self):
+        centers = np.array([[10.0, 10.0], [30.0, 30.0]])
+        cache = {}
+
+        with Canvas((48, 48)) as ctx:
+            sdf.circles(centers, 4).render(ctx, cache=cache)
+            sdf.circles(centers.copy(), 4).render(ctx, cache=cache)
+            hits = ctx.last_render_stats.cache_hits
+            moved = centers + 5
+            sdf.circles(moved, 4).render(ctx, cache=cache)
+
+        self.assertEqual(hits, 1)
+        self.assertEqual(len(cache), 2)
+
+    def test_tile_binning_keeps_dense_layers_exact(self):
+        rng = np.random.default_rng(11)
+        centers = rng.uniform(-8, 104, (3000, 2)).astype(np.float32)
+        radii = rng.uniform(0.5, 2.0, 3000).astype(np.float32)
+        # More instances overlap the first tile than fit in its shared list.
+        crowd = rng.uniform(2, 14, (1500, 2)).astype(np.float32)
+        crowd_radii = np.full(1500, 0.5, dtype=np.float32)
+        expected = _circle_field((96, 96), centers, radii)
+
+        with Canvas((96, 96)) as ctx:
+            exact = _distances(sdf.circles(centers, radii).render(ctx))
+            banded = _distances(sdf.circles(centers, radii, max_distance=3).render(ctx))
+            crowded = _distances(sdf.circles(crowd, crowd_radii).render(ctx))
+
+        np.testing.assert_allclose(exact, expected, atol=1e-3)
+        np.testing.assert_allclose(banded, np.minimum(expected, 3), atol=1e-3)
+        np.testing.assert_allclose(
+            crowded[:32, :32],
+            _circle_field((32, 32), crowd, crowd_radii),
+            atol=1e-3,
+        )
+
+    def test_invalid_instance_parameters_are_rejected(self):
+        with Canvas((16, 16)) as ctx:
+            with self.assertRaisesRegex(ValueError, "Unknown instance kind"):
+                sdf.instances("hexagon", [[1, 2, 3]]).render(ctx)
+            with self.assertRaisesRegex(ValueError, "need 3 columns"):
+                sdf.instances("circle", [[1, 2]]).render(ctx)
+            with self.assertRaisesRegex(ValueError, "non-empty"):
+                sdf.circles(np.zeros((0, 2)), 1).render(ctx)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from sdf_ui import Canvas, sdf
 from sdf_ui.core.plugins.registry import registry
 from tests.helpers import rgba_array
@@ -43,6 +45,23 @@ class PolygonPluginTests(unittest.TestCase):
 
         self.assertGreater(inside, notch + 50)
 
+    def test_polygon_shader_matches_the_numpy_reference(self):
+        angles = np.linspace(0.0, 2.0 * np.pi, 300, endpoint=False)
+        radii = 30.0 + 12.0 * np.sin(7.0 * angles)
+        points = np.column_stack(
+            (48.0 + radii * np.cos(angles), 40.0 + radii * np.sin(angles))
+        )
+        with Canvas((96, 80)) as ctx:
+            gpu = sdf.polygon(points).render(ctx)
+            dispatches = dict(ctx.last_render_stats.shader_dispatches_by_name)
+            gpu_field = np.frombuffer(gpu.tex.read(), dtype=np.float32)
+            ctx.cpu_compositing = True
+            cpu = sdf.polygon(points).render(ctx)
+            cpu_field = np.frombuffer(cpu.tex.read(), dtype=np.float32)
+
+        self.assertEqual(dispatches, {"polygon": 1})
+        np.testing.assert_allclose(gpu_field, cpu_field, atol=1e-3)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,326 @@
+import ast
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+from sdf_ui import Canvas, color, sdf
+from sdf_ui.core import RenderCache
+from sdf_ui.core.cache import DiskCache, GreedyDualSizePolicy, result_bytes
+from sdf_ui.core.expressions import param
+from tests.helpers import SRC_ROOT
+
+
+def _result(width, height, components=1, dtype="f4"):
+    return SimpleNamespace(
+        tex=SimpleNamespace(size=(width, height), components=components, dtype=dtype)
+    )
+
+
+def test_render_cache_tracks_bytes_and_evicts_least_recently_used():
+    cache = RenderCache(max_bytes=200)
+    cache["a"] = _result(5, 5)
+    cache["b"] = _result(5, 5, components=4, dtype="f1")
+    cache["a"]
+    cache["c"] = _result(5, 5)
+
+    assert cache.total_bytes == 300
+    assert result_bytes((cache["a"], cache["c"])) == 200
+    evicted = cache.over_budget()
+
+    assert [key for key, _value, _size in evicted] == ["b"]
+    assert list(cache) == ["a", "c"]
+    assert cache.total_bytes == 200
+    assert cache.evictions == 1
+
+
+def test_render_cache_keeps_the_newest_entry_above_the_budget():
+    cache = RenderCache(max_bytes=10)
+    cache["a"] = _result(4, 4)
+    cache["b"] = _result(4, 4)
+
+    assert [key for key, _value, _size in cache.over_budget()] == ["a"]
+    assert list(cache) == ["b"]
+
+
+def test_render_cache_peek_does_not_count_as_a_use():
+    cache = RenderCache(max_bytes=200)
+    cache["a"] = _result(5, 5)
+    cache["b"] = _result(5, 5)
+    assert cache.peek("a") is not None and cache.peek("missing") is None
+    cache["c"] = _result(5, 5)
+
+    assert [key for key, _value, _size in cache.over_budget()] == ["a"]
+
+
+def test_render_cache_skips_stale_priorities_while_evicting():
+    cache = RenderCache(max_bytes=1000)
+    for index in range(5000):
+        cache[index] = _result(5, 5)
+        cache[index - 1 if index else 0]
+        cache.over_budget()
+
+    assert list(cache) == list(range(4990, 5000))
+    assert cache.evictions == 4990
+    assert len(cache._heap) <= 2 * len(cache) + 64
+
+
+def test_greedy_dual_size_keeps_expensive_results_over_recent_cheap_ones():
+    cache = RenderCache(max_bytes=300, policy=GreedyDualSizePolicy())
+    cache.store("text", _result(5, 5), cost=0.2)
+    cache.store("circle", _result(5, 5), cost=0.0001)
+    cache.store("ring", _result(5, 5), cost=0.0002)
+    cache.store("rect", _result(5, 5), cost=0.0001)
+
+    assert [key for key, _value, _size in cache.over_budget()] == ["circle"]
+    assert cache.inflation == 0.0001 / 100
+
+    # Entries that are not used again age out as the inflation grows.
+    for index in range(3):
+        cache.store(index, _result(5, 5), cost=0.0001)
+        cache.over_budget()
+    assert "text" in cache and "ring" not in cache
+
+
+def test_greedy_dual_size_skips_results_cheaper_than_their_memory():
+    cache = RenderCache(policy=GreedyDualSizePolicy(min_cost_per_mib=0.01))
+
+    assert not cache.store("cheap", _result(1024, 256), cost=0.001)
+    assert cache.store("expensive", _result(1024, 256), cost=0.05)
+    assert list(cache) == ["expensive"]
+    assert cache.rejections == 1
+
+
+def test_rejected_results_are_recycled_like_uncached_nodes():
+    scene = (sdf.circle((16, 16), 8) | sdf.circle((8, 8), 3)).abs()
+    cache = RenderCache(policy=GreedyDualSizePolicy(min_cost_per_mib=1e6))
+
+    with Canvas((32, 32)) as ctx:
+        ctx.shader_fusion = False
+        with ctx.session(cache=cache) as renderer:
+            texture = renderer.render(scene)
+            expected = scene.render(ctx)
+            assert np.array_equal(texture.tex.read(), expected.tex.read())
+            info = renderer.cache_info()
+            stats = renderer.stats
+
+    assert info.entries == 0
+    assert info.rejections == stats.cache_rejections == 4
+    assert stats.texture_recycles == 3
+
+
+def test_session_cache_stays_within_its_byte_budget():
+    scene = (sdf.circle((16, 16), 8) | sdf.circle((param("x"), 8), 3)).abs()
+    texture_size = 32 * 32 * 4
+    cache = RenderCache(max_bytes=3 * texture_size)
+
+    with Canvas((32, 32)) as ctx:
+        ctx.shader_fusion = False
+        with ctx.session(cache=cache) as renderer:
+            for x in range(4, 28, 4):
+                texture = renderer.render(scene, params={"x": x})
+                assert cache.total_bytes <= cache.max_bytes
+
+            expected = scene.render(ctx, params={"x": 24})
+            assert np.allclose(
+                np.frombuffer(texture.tex.read(), dtype=np.float32),
+                np.frombuffer(expected.tex.read(), dtype=np.float32),
+            )
+            info = renderer.cache_info()
+            stats = renderer.stats
+
+    assert info.entries == 3
+    assert info.bytes == 3 * texture_size
+    assert info.max_bytes == 3 * texture_size
+    assert info.evictions == stats.cache_evictions > 0
+    assert stats.cache_evicted_bytes == stats.cache_evictions * texture_size
+    assert stats.texture_recycles > 0
+
+
+def test_disk_cache_trims_least_recently_used_files(tmp_path):
+    disk = DiskCache(tmp_path, max_bytes=3500)
+    for index, key in enumerate(("a", "b", "c")):
+        disk.save(key, np.full((16, 16), index, dtype=np.float32), "sdf")
+        os.utime(tmp_path / f"{key}.sdf.-.0.npy", (index, index))
+    disk.load("a")
+    disk.save("d", np.zeros((16, 16, 4), dtype=np.uint8), "color", "RGB")
+
+    assert sorted(DiskCache(tmp_path)._index) == ["a", "c", "d"]
+    assert disk.evictions == 1
+    array, kind, mode, _cost = disk.load("d")
+    assert (array.shape, kind, mode) == ((16, 16, 4), "color", "RGB")
+
+
+def test_disk_cache_finds_files_written_by_another_process(tmp_path):
+    reader = DiskCache(tmp_path)
+    writer = DiskCache(tmp_path)
+    assert "a" not in reader and reader.load("a") is None
+
+    writer.save("a", np.ones((4, 4, 4), dtype=np.uint8), "color", "RGB", 0.25)
+
+    assert "a" in reader
+    array, kind, mode, cost = reader.load("a")
+    assert (array.shape, kind, mode, cost) == ((4, 4, 4), "color", "RGB", 0.25)
+    assert reader.total_bytes == (tmp_path / "a.color.RGB.250000.npy").stat().st_size
+
+
+def test_disk_cache_misses_only_rescan_a_changed_directory(tmp_path, monkeypatch):
+    import time
+
+    DiskCache(tmp_path).save("a", np.ones((4, 4), dtype=np.float32), "sdf")
+    time.sleep(0.1)
+    cache = DiskCache(tmp_path)
+    scans = []
+    scan = DiskCache._scan
+    monkeypatch.setattr(DiskCache, "_scan", lambda self: scans.append(scan(self)))
+
+    for index in range(100):
+        assert f"missing{index}" not in cache
+    assert scans == []
+
+    os.utime(tmp_path, ns=(0, 0))
+    assert "missing" not in cache and "a" in cache
+    assert len(scans) == 1
+
+
+def test_disk_tier_restores_results_in_a_new_context(tmp_path):
+    shape = sdf.circle((16, 16), 8) | sdf.rect((8, 8), (4, 4), (1, 1, 1, 1), 0.0)
+    scene = color.clear((1.0, 1.0, 1.0, 1.0)).alpha_overlay(
+        shape.fill((0.2, 0.4, 0.8, 1.0), (0.2, 0.4, 0.8, 0.0))
+    )
+
+    def run():
+        cache = RenderCache(disk=DiskCache(tmp_path, min_cost=float("inf")))
+        with Canvas((32, 32)) as ctx, ctx.session(cache=cache) as renderer:
+            texture = renderer.render(scene)
+            return texture.mode, texture.tex.read(), renderer.stats
+
+    first_mode, first, first_stats = run()
+    second_mode, second, second_stats = run()
+
+    assert first_stats.disk_writes == 1
+    assert second_stats.disk_hits == 1
+    assert second_stats.shader_dispatches == 0
+    assert second_mode == first_mode
+    assert second == first
+
+
+def test_results_loaded_from_disk_keep_their_render_cost(tmp_path):
+    scene = sdf.circle((16, 16), 8).fill((0.2, 0.4, 0.8, 1.0), (0.2, 0.4, 0.8, 0.0))
+    with Canvas((32, 32)) as ctx, ctx.session(
+        cache=RenderCache(disk=DiskCache(tmp_path))
+    ) as renderer:
+        renderer.render(scene)
+    for saved in tmp_path.glob("*.npy"):
+        key, kind, mode, _micros, suffix = saved.name.split(".")
+        saved.rename(tmp_path / ".".join((key, kind, mode, "10000000", suffix)))
+
+    # Loading is far cheaper than the recorded cost of 10 seconds.
+    policy = GreedyDualSizePolicy(min_cost_per_mib=100.0)
+    cache = RenderCache(policy=policy, disk=DiskCache(tmp_path))
+    with Canvas((32, 32)) as ctx, ctx.session(cache=cache) as renderer:
+        renderer.render(scene)
+        assert renderer.stats.disk_hits == 1
+        assert renderer.cache_info().entries == 1
+        assert renderer.stats.cache_rejections == 0
+
+
+def test_disk_keys_change_with_any_source_file_of_the_package(monkeypatch):
+    from pathlib import Path
+
+    from sdf_ui.core import texture
+
+    package = Path(texture.__file__).parent.parent
+    scene = sdf.circle((8, 8), 4)
+    renderer = texture.Renderer(SimpleNamespace(size=(16, 16)))
+    texture.source_digest.cache_clear()
+    before = renderer._stable_key(scene)
+    read_bytes = Path.read_bytes
+
+    # Modules the plugins import and shaders of helper plugins.
+    for name in ("core/segments.py", "core/fonts.py", "core/plugins/postprocessing"):
+        edited = package / name
+        if edited.is_dir():
+            edited = next(edited.rglob("*.glsl"))
+
+        def read_edited(self, edited=edited):
+            return read_bytes(self) + (b"\n" if self == edited else b"")
+
+        monkeypatch.setattr(Path, "read_bytes", read_edited)
+        texture.source_digest.cache_clear()
+        assert renderer._stable_key(scene) != before
+
+    monkeypatch.undo()
+    texture.source_digest.cache_clear()
+    assert renderer._stable_key(scene) == before
+
+
+_KEY_SCRIPT = """
+import numpy as np
+from types import SimpleNamespace
+from sdf_ui import sdf
+from sdf_ui.core.expressions import param
+from sdf_ui.core.sdf import SDFTexture
+from sdf_ui.core.texture import Renderer
+
+tex = SimpleNamespace(size=(4, 4), read=lambda: bytes(range(64)))
+ctx = SimpleNamespace(size=(32, 32), _sdf_image_dtype="f4")
+image = SDFTexture(tex=tex, context=ctx)
+scene = (
+    sdf.circles(np.array([[4.0, 4.0], [9.0, 9.0]]), 2)
+    .smooth_union(sdf.circle((param("x"), "50%y"), 3), 1.5)
+    .subtract(image)
+)
+print(Renderer(ctx, params={"x": 12.5})._node_key(scene))
+"""
+
+
+def test_node_keys_are_the_same_in_every_process():
+    keys = set()
+    for seed in ("1", "2"):
+        env = {**os.environ, "PYTHONHASHSEED": seed, "PYTHONPATH": str(SRC_ROOT)}
+        output = subprocess.run(
+            [sys.executable, "-c", _KEY_SCRIPT],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        keys.add(output.strip())
+
+    assert len(keys) == 1
+    fingerprint, structure, values = ast.literal_eval(keys.pop())
+    assert fingerprint == "32x32:f4"
+    assert len(structure) == len(values) == 64
+
+
+def test_shared_cache_does_not_hand_out_textures_of_another_context():
+    scene = sdf.circle((8, 8), 4).fill((1.0, 1.0, 1.0, 1.0), (0.0, 0.0, 0.0, 1.0))
+    cache = {}
+
+    with Canvas((16, 16)) as first, Canvas((16, 16)) as second:
+        rendered = scene.render(first, cache=cache)
+        key = list(cache)[-1]
+        other = scene.render(second, cache=cache)
+
+        assert other is not rendered
+        assert other.context is second
+        assert cache[key] is other
+        # Rendered textures are keyed by the node that produced them.
+        assert rendered.digest.parts[-2] == key
+
+
+def test_deep_graphs_are_keyed_and_rendered_without_recursion():
+    from functools import reduce
+
+    from sdf_ui.core.texture import stable_digest
+
+    circles = [sdf.circle((index % 30, 10), 3) for index in range(300)]
+    scene = reduce(lambda left, right: left.union(right), circles)
+
+    assert len(stable_digest(scene)) == 64
+    with Canvas((32, 32)) as ctx:
+        rendered = scene.render(ctx, cache=RenderCache())
+        assert rendered.tex is not None
@@ -129,6 +129,107 @@ def test_color_compositing_and_transparency_render_predictably():
     assert transparency_pixels[0, 0, 3] == 128
 
 
+def test_layer_operations_run_on_the_gpu_and_match_the_cpu_fallback():
+    top = sdf.circle((10, 10), 6).fill((230, 50, 25, 180), (230, 50, 25, 0))
+    bottom = sdf.rect((14, 12), (7, 5), (1, 1, 1, 1), 0.0).fill(
+        (25, 100, 230, 200), (25, 100, 230, 25)
+    )
+    background = color.linear_gradient(
+        (0, 0), (24, 24), (255, 255, 0, 255), (0, 128, 255, 128)
+    )
+    scenes = {
+        "overlay": background.alpha_overlay(top).alpha_overlay(bottom),
+        "multiply": background.multiply(top),
+        "layer_mask": top.mask(bottom, background),
+    }
+
+    with Canvas((24, 24)) as ctx:
+        for shader_name, scene in scenes.items():
+            gpu = rgba_array(scene.render(ctx)).copy()
+            assert ctx.last_render_stats.shader_dispatches_by_name[shader_name] >= 1
+
+            ctx.cpu_compositing = True
+            cpu = rgba_array(scene.render(ctx)).copy()
+            assert shader_name not in ctx.last_render_stats.shader_dispatches_by_name
+            ctx.cpu_compositing = False
+
+            assert np.abs(gpu.astype(int) - cpu.astype(int)).max() <= 1
+
+
+def test_stack_matches_chained_overlays_in_one_dispatch_per_seven_layers():
+    layers = [color.clear((1.0, 1.0, 1.0, 1.0))] + [
+        sdf.circle((4 + 2 * index, 12), 4 + index).fill(
+            (0.1 * index, 0.5, 1.0 - 0.1 * index, 0.6), (0.3, 0.2, 0.1, 0.0)
+        )
+        for index in range(9)
+    ]
+    chained = layers[0]
+    for layer in layers[1:]:
+        chained = chained.alpha_overlay(layer)
+    modes = ("normal", "multiply", "screen", "add", "darken", "lighten", "overlay")
+    blended = color.stack(layers[:7], modes, opacities=0.7)
+
+    with Canvas((24, 24)) as ctx:
+        expected = rgba_array(chained.render(ctx)).copy()
+        stacked = rgba_array(color.stack(tuple(layers)).render(ctx)).copy()
+        dispatches = ctx.last_render_stats.shader_dispatches_by_name
+        gpu = rgba_array(blended.render(ctx)).copy()
+        ctx.cpu_compositing = True
+        cpu = rgba_array(blended.render(ctx)).copy()
+        numpy_opacity = rgba_array(
+            color.stack(layers[:7], modes, opacities=np.float32(0.7)).render(ctx)
+        ).copy()
+        with pytest.raises(ValueError, match="Unknown blend mode"):
+            color.stack(layers[:2], "dodge").render(ctx)
+
+    assert dispatches["stack"] == 2
+    assert np.array_equal(numpy_opacity, cpu)
+    assert "overlay" not in dispatches
+    assert np.abs(stacked.astype(int) - expected.astype(int)).max() <= 1
+    assert np.abs(gpu.astype(int) - cpu.astype(int)).max() <= 1
+
+
+def test_redundant_color_conversions_are_removed_from_the_graph():
+    shape = sdf.circle((12, 12), 6)
+    fill = shape.fill((0.9, 0.3, 0.2, 1.0), (0.9, 0.3, 0.2, 0.0))
+    scene = (
+        color.clear((1.0, 1.0, 1.0, 1.0))
+        .alpha_overlay(shape.shadow(2))
+        .alpha_overlay(fill.blur(1).transparency(0.5))
+        .alpha_overlay(fill.to_rgb().to_lab())
+    )
+
+    with Canvas((24, 24)) as ctx:
+        ctx.color_conversion_elimination = False
+        expected = rgba_array(scene.render(ctx)).copy()
+        before = ctx.last_render_stats.shader_dispatches_by_name
+        ctx.color_conversion_elimination = True
+        pixels = rgba_array(scene.render(ctx)).copy()
+        stats = ctx.last_render_stats
+
+    assert before["to_rgb"] + before["to_lab"] == 8
+    assert stats.shader_dispatches_by_name["to_rgb"] == 3
+    assert "to_lab" not in stats.shader_dispatches_by_name
+    assert stats.color_conversions_removed == 5
+    assert np.abs(pixels.astype(int) - expected.astype(int)).max() <= 1
+
+
+def test_conversion_elimination_keeps_the_space_of_rgb_output_nodes():
+    _sdf_result, mask_result = sdf.circle((8, 8), 5).masked_union(
+        sdf.circle((10, 8), 5)
+    )
+    scene = color.clear((1.0, 1.0, 1.0, 1.0)).alpha_overlay(mask_result)
+
+    with Canvas((16, 16)) as ctx:
+        ctx.color_conversion_elimination = False
+        expected = rgba_array(scene.render(ctx)).copy()
+        ctx.color_conversion_elimination = True
+        pixels = rgba_array(scene.render(ctx)).copy()
+
+    assert expected[8, 8].tolist() == [255, 255, 255, 255]
+    assert np.array_equal(pixels, expected)
+
+
 def test_rgb_layer_operations_normalize_tuple_colors():
     red = color.clear((255, 0, 0, 255))
     blue = color.clear((0, 0, 255, 255))
@@ -173,6 +274,27 @@ def test_blur_preserves_a_solid_white_image():
     assert pixels.min() >= 245
 
 
+@pytest.mark.parametrize("sigma", [1.5, 6.0, 24.0])
+def test_gaussian_blur_has_the_requested_sigma_in_few_dispatches(sigma):
+    from sdf_ui.core.plugins.common import rgb_texture_from_array
+
+    with Canvas((256, 32)) as ctx:
+        step = np.full((32, 256, 4), 255.0)
+        step[:, 128:, :3] = 0.0
+        edge = rgb_texture_from_array(ctx, step)
+        row = rgba_array(edge.gaussian_blur(sigma).render(ctx))[16, :, 0] / 255.0
+        dispatches = ctx.last_render_stats.shader_dispatches
+
+    # The derivative of a blurred step is the blur kernel.
+    kernel = -np.diff(row)
+    x = np.arange(kernel.size)
+    mean = (kernel * x).sum() / kernel.sum()
+    measured = np.sqrt((kernel * (x - mean) ** 2).sum() / kernel.sum())
+
+    assert measured == pytest.approx(sigma, rel=0.05)
+    assert dispatches <= 8
+
+
 def test_invert_turns_white_into_black():
     pixels = rgba_array(render(color.clear("#ffffff").invert().to_rgb(), size=(8, 8)))
 
@@ -202,6 +324,27 @@ def test_gradient_factories_produce_distinct_pixels(factory_name, point_a, point
     assert not np.array_equal(pixels[point_a], pixels[point_b])
 
 
+def test_analytic_shadow_matches_the_blurred_mask_in_one_dispatch():
+    shape = sdf.circle((48, 48), 20)
+
+    with Canvas((96, 96)) as ctx:
+        blurred = rgba_array(shape.shadow(10, inflate=2).render(ctx)).copy()
+        analytic = rgba_array(shape.shadow(10, inflate=2, analytic=True).render(ctx))
+        dispatches = dict(ctx.last_render_stats.shader_dispatches_by_name)
+        offset = rgba_array(
+            shape.soft_shadow(offset=(10, 0), blur=4, color=(255, 0, 0, 255)).render(ctx)
+        ).copy()
+        glow = rgba_array(shape.glow(blur=6, spread=4).render(ctx)).copy()
+
+    assert dispatches == {"circle": 1, "soft_shadow": 1}
+    # The profile is exact for straight edges, a blurred disc is a bit smaller.
+    assert np.abs(analytic[..., 3].astype(int) - blurred[..., 3]).max() <= 16
+    assert tuple(offset[48, 64]) == (255, 0, 0, 255)
+    assert offset[48, 34, 3] < 128 < offset[48, 42, 3]
+    assert glow[48, 48, 3] == 255
+    assert 0 < glow[48, 76, 3] < glow[48, 72, 3] < 255
+
+
 def test_outline_shadow_light_and_partial_derivative_render_distinct_features():
     outline_pixels = rgba_array(
         render(
@@ -408,3 +551,101 @@ def test_canvas_session_exposes_render_stats_and_cache_info():
         "clear_color": 1,
         "to_rgb": 1,
     }
+
+
+def test_session_rerenders_only_nodes_that_depend_on_changed_params():
+    from sdf_ui.core.expressions import param
+
+    static = sdf.ring((16, 16), 8, 2).translate((1, 1))
+    scene = (static | sdf.circle((param("x"), 12), 4)).fill(
+        (255, 255, 255, 255), (0, 0, 0, 255)
+    )
+
+    with Canvas((32, 32)) as ctx:
+        with ctx.session() as renderer:
+            first = rgba_array(renderer.render(scene, params={"x": 8})).copy()
+            dispatches = renderer.stats.shader_dispatches
+            moved = renderer.render(scene, params={"x": 24})
+            rerendered = renderer.stats.shader_dispatches - dispatches
+            expected = rgba_array(scene.render(ctx, params={"x": 24}))
+
+            assert np.array_equal(rgba_array(moved), expected)
+            assert not np.array_equal(first, expected)
+            assert rerendered == 2
+            assert renderer.stats.shader_dispatches_by_name["ring"] == 1
+            assert renderer.stats.cache_invalidations == 2
+            assert renderer.cache_info().entries == 4
+
+            renderer.render(scene, params={"x": 24})
+            assert renderer.stats.shader_dispatches == dispatches + rerendered
+
+
+def test_session_drops_helper_graphs_of_nodes_rendered_with_old_params():
+    from sdf_ui.core.expressions import param
+
+    scene = sdf.circle((32, 24), 10).shadow(distance=param("d"))
+
+    with Canvas((64, 48)) as ctx:
+        with ctx.session() as renderer:
+            entries = []
+            for distance in range(2, 42):
+                last = renderer.render(scene, params={"d": distance})
+                entries.append(renderer.cache_info().entries)
+            expected = rgba_array(scene.render(ctx, params={"d": 41}))
+
+            assert np.array_equal(rgba_array(last), expected)
+            assert max(entries) == entries[0]
+
+
+def test_one_shot_render_recycles_intermediate_textures_into_the_pool():
+    from functools import reduce
+
+    discs = [sdf.circle((4 + 6 * index, 16), 3) for index in range(5)]
+    scene = reduce(lambda a, b: a | b, discs).fill((255, 255, 255, 255), (0, 0, 0, 255))
+
+    with Canvas((32, 32)) as ctx:
+        ctx.shader_fusion = False
+        pooled = rgba_array(scene.render(ctx)).copy()
+        stats = ctx.last_render_stats
+        retained = rgba_array(scene.render(ctx, cache={})).copy()
+
+    assert stats.texture_recycles > 0
+    assert stats.texture_reuses > 0
+    assert stats.texture_allocations < 10
+    assert np.array_equal(pooled, retained)
+
+
+def test_recycling_keeps_textures_shared_between_multi_output_nodes():
+    sdf_result, mask_result = sdf.circle((12, 16), 8).masked_union(
+        sdf.circle((20, 16), 8)
+    )
+    scene = sdf_result.fill((255, 255, 255, 255), (0, 0, 0, 255)).alpha_overlay(
+        mask_result.transparency(0.5)
+    )
+
+    with Canvas((32, 32)) as ctx:
+        pooled = rgba_array(scene.render(ctx)).copy()
+        retained = rgba_array(scene.render(ctx, cache={})).copy()
+
+    assert np.array_equal(pooled, retained)
+
+
+def test_texture_release_does_not_touch_other_live_contexts():
+    first = Canvas((16, 16))
+    first_texture = sdf.circle((8, 8), 5).render(first)
+    second = Canvas((16, 16))
+
+    try:
+        del first_texture
+        pixels = rgba_array(
+            sdf.circle((8, 8), 5)
+            .fill((255, 255, 255, 255), (0, 0, 0, 255))
+            .to_rgb()
+            .render(second)
+        )
+    finally:
+        second.close()
+        first.close()
+
+    assert pixels[8, 8, 0] > 200
+    assert pixels[0, 0, 0] < 20
@@ -0,0 +1,93 @@
+import numpy as np
+
+from sdf_ui import Canvas, color, sdf
+from sdf_ui.core.expressions import param
+
+
+def _pixels(texture):
+    width, height = texture.tex.size
+    components = texture.tex.components
+    return (
+        np.frombuffer(texture.tex.read(), dtype=np.uint8)
+        .reshape((height, width, components))
+        .copy()
+    )
+
+
+def _distances(texture):
+    width, height = texture.tex.size
+    return (
+        np.frombuffer(texture.tex.read(), dtype=np.float32)
+        .reshape((height, width))
+        .copy()
+    )
+
+
+def test_plan_runs_match_regular_renders():
+    shape = sdf.circle((32, 24), 14).smooth_union(sdf.circle((param("x"), 24), 8), 4.0)
+    scene = color.clear((1.0, 1.0, 1.0, 1.0)).alpha_overlay(
+        shape.fill((0.4, 0.7, 0.3, 1.0), (0.4, 0.7, 0.3, 0.0))
+    )
+
+    with Canvas((64, 48)) as ctx:
+        plan = ctx.compile(scene, params={"x": 20})
+        for x in (20, 40, 52):
+            planned = _pixels(plan.run({"x": x}))
+            rendered = _pixels(scene.render(ctx, params={"x": x}))
+            assert np.array_equal(planned, rendered)
+
+
+def test_plan_only_replays_steps_that_depend_on_changed_params():
+    static = sdf.ring((24, 24), 12, 2).translate((2, 2))
+    scene = (static | sdf.circle(param("center"), param("radius"))).abs()
+
+    with Canvas((48, 48)) as ctx:
+        plan = ctx.compile(scene, params={"center": (10, 10), "radius": 4})
+        stats = ctx.last_render_stats
+        compile_dispatches = stats.shader_dispatches
+
+        plan.run()
+        first_run = stats.shader_dispatches - compile_dispatches
+        plan.run()
+        unchanged_run = stats.shader_dispatches - compile_dispatches - first_run
+        distances = _distances(plan.run({"radius": 6}))
+
+    assert compile_dispatches == 2
+    assert first_run == 1
+    assert unchanged_run == 0
+    assert stats.shader_dispatches_by_name["fused_sdf"] == 2
+    assert distances[10, 10] == np.float32(6.0)
+
+
+def test_plan_reruns_python_plugins_with_new_params():
+    scene = sdf.ngon((24, 24), param("radius"), 5) | sdf.circle((8, 8), 3)
+
+    with Canvas((48, 48)) as ctx:
+        plan = ctx.compile(scene, params={"radius": 10})
+        small = _distances(plan.run())
+        large = _distances(plan.run({"radius": 18}))
+        expected = _distances(scene.render(ctx, params={"radius": 18}))
+
+    assert len(plan) == 2
+    assert not np.allclose(small, large)
+    assert np.allclose(large, expected, atol=1e-4)
+
+
+def test_plan_slots_the_layers_of_stacks():
+    background = color.clear((1.0, 1.0, 1.0, 1.0))
+    layer = sdf.circle((param("x"), 24), 8).fill(
+        (0.4, 0.7, 0.3, 1.0), (0.4, 0.7, 0.3, 0.0)
+    )
+    scene = color.stack((background, layer), "multiply")
+
+    with Canvas((64, 48)) as ctx:
+        plan = ctx.compile(scene, params={"x": 20})
+        stats = ctx.last_render_stats
+        left = _pixels(plan.run())
+        right = _pixels(plan.run({"x": 40}))
+        expected = scene.render(ctx, params={"x": 40})
+        assert np.array_equal(right, _pixels(expected))
+
+    assert not np.array_equal(left, right)
+    # The static background is rendered once while compiling.
+    assert stats.shader_dispatches_by_name["clear_color"] == 1
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from sdf_ui import Canvas, sdf
+from sdf_ui.core.expressions import param
+from sdf_ui.core.fusion import fused_shader_source, shader_fragment
+from sdf_ui.core.shaders import ShaderLibrary
+
+
+def _distances(texture):
+    width, height = texture.tex.size
+    return np.frombuffer(texture.tex.read(), dtype=np.float32).reshape((height, width))
+
+
+def _render_both(scene, size=(48, 48), params=None):
+    with Canvas(size) as ctx:
+        fused = _distances(scene.render(ctx, params=params)).copy()
+        fused_stats = ctx.last_render_stats
+        ctx.shader_fusion = False
+        unfused = _distances(scene.render(ctx, params=params)).copy()
+        unfused_stats = ctx.last_render_stats
+    return fused, fused_stats, unfused, unfused_stats
+
+
+def test_fused_boolean_scene_matches_node_by_node_rendering():
+    scene = (
+        (sdf.circle((12, 12), 8) | sdf.rect((30, 20), (8, 6), (2, 2, 2, 2), 0.3))
+        .smooth_union(sdf.ngon((24, 34), 9, 5), 4.0)
+        .subtract(sdf.ring((24, 24), 6, 2))
+        .interpolate(sdf.arc((24, 24), 14, 0.2, 2.5).abs(), 0.25)
+        .intersection(sdf.sector((20, 20), 30, 0.0, 5.0))
+    )
+
+    fused, fused_stats, unfused, unfused_stats = _render_both(scene)
+
+    assert np.allclose(fused, unfused, atol=1e-3)
+    assert fused_stats.shader_dispatches < unfused_stats.shader_dispatches
+    assert fused_stats.shader_dispatches_by_name["fused_sdf"] == 2
+    assert fused_stats.fused_nodes > 10
+    assert fused_stats.texture_allocations < unfused_stats.texture_allocations
+
+
+def test_fusion_keeps_shared_and_cached_nodes_as_image_inputs():
+    shared = sdf.circle((16, 16), 6) | sdf.circle((30, 16), 6)
+    scene = shared.subtract(sdf.circle((22, 16), 4)) | shared.translate((0, 16))
+
+    fused, fused_stats, unfused, _unfused_stats = _render_both(scene)
+
+    assert np.allclose(fused, unfused, atol=1e-3)
+    assert fused_stats.shader_dispatches_by_name == {"fused_sdf": 2, "transform": 1}
+
+    cache = {}
+    with Canvas((48, 48)) as ctx:
+        shared.render(ctx, cache=cache)
+        scene.render(ctx, cache=cache)
+        stats = ctx.last_render_stats
+
+    assert stats.cache_hits >= 1
+    assert stats.shader_dispatches_by_name["fused_sdf"] == 1
+
+
+def test_fused_programs_are_cached_by_subgraph_shape():
+    scene = sdf.circle(param("center"), 5) | sdf.circle((8, 8), param("radius"))
+
+    with Canvas((24, 24)) as ctx:
+        first = _distances(
+            scene.render(ctx, params={"center": (4, 4), "radius": 2})
+        ).copy()
+        second = _distances(
+            scene.render(ctx, params={"center": (12, 12), "radius": 6})
+        ).copy()
+        fused_programs = [
+            key for key in ctx._shader_library._cache if isinstance(key, tuple)
+        ]
+
+    assert len(fused_programs) == 1
+    assert not np.allclose(first, second)
+    assert second[12, 12] == pytest.approx(-5.0, abs=1e-3)
+
+
+def test_shader_fragments_prefix_globals_and_reject_non_texel_shaders():
+    library = ShaderLibrary(None)
+    shape = (
+        ("arc", (), ()),
+        ("sector", (), ()),
+        ("union", ("sdf0", "sdf1"), (("node", 0), ("node", 1))),
+        ("abs", ("sdf0",), (("input", 0),)),
+    )
+
+    code = fused_shader_source(shape, library.source)
+
+    assert "float n0_normalize_angle(" in code
+    assert "float n1_normalize_angle(" in code
+    assert "uniform float n1_start_angle;" in code
+    assert "float v2 = n2_eval(texelPos, v0, v1);" in code
+    assert "float v3 = n3_eval(texelPos, i0);" in code
+    assert code.count("imageStore") == 1
+
+    with pytest.raises(ValueError, match="outside of texelPos"):
+        shader_fragment("repeat", library.source("repeat"), ("sdf0",))
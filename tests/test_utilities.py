@@ -4,13 +4,17 @@ import numpy as np
 import pytest
 from PIL import Image
 
-from sdf_ui import Canvas
+from sdf_ui import Canvas, color
 from sdf_ui.bw_to_sdf import image_to_sdf
+from sdf_ui.core.fonts import FontAtlas, FontFace, flatten_contours, font_face
+from sdf_ui.core.msdf import multi_channel_signed_distance
 from sdf_ui.core.plugins.primitives.text.plugin import (
-    _cached_glyph_sdf,
+    _font_atlas,
     _glyph_cache_size,
+    _sample_patches,
     _sample_sdf,
 )
+from sdf_ui.core.segments import SegmentIndex
 from sdf_ui.text import glyph, text
 from sdf_ui.util import hex_col
 from tests.helpers import PROJECT_ROOT, render, rgba_array
@@ -41,6 +45,90 @@ def test_image_to_sdf_rejects_images_without_dark_pixels(tmp_path):
         image_to_sdf(str(image_path), resize=False, preview=False)
 
 
+@pytest.mark.parametrize(
+    ("cpu", "expected_dispatches"),
+    [(False, {"jfa_seed": 1, "jfa_step": 7, "jfa_distance": 1}), (True, {})],
+)
+def test_mask_to_sdf_matches_the_exact_distance(cpu, expected_dispatches):
+    height, width = 40, 48
+    yy, xx = np.mgrid[0:height, 0:width]
+    inside = ((xx - 18) ** 2 + (yy - 20) ** 2 < 120) | (
+        (abs(xx - 36) < 6) & (abs(yy - 12) < 9)
+    )
+    pixels = np.where(inside, 255, 0).astype(np.uint8)
+
+    with Canvas((width, height)) as ctx:
+        ctx.cpu_compositing = cpu
+        texture = color.image(pixels).mask_to_sdf().render(ctx)
+        dispatches = dict(ctx.last_render_stats.shader_dispatches_by_name)
+        field = np.frombuffer(texture.tex.read(), dtype=np.float32)
+
+    # Brute force distance to the nearest pixel on the other side, the edge
+    # lies halfway between them. Texture rows run bottom to top.
+    inside = np.flipud(inside)
+    points = np.stack((yy, xx), axis=-1).reshape(-1, 1, 2)
+
+    def nearest(mask):
+        return np.sqrt(((points - np.argwhere(mask)) ** 2).sum(-1)).min(-1)
+
+    flat = inside.ravel()
+    expected = np.where(flat, 0.5 - nearest(~inside), nearest(inside) - 0.5)
+
+    assert dispatches == expected_dispatches
+    assert np.allclose(field, expected, atol=1e-4)
+
+
+def test_segment_index_matches_brute_force_distance_and_winding():
+    angles = np.linspace(0.0, 2.0 * np.pi, 120, endpoint=False)
+    radii = 20.0 + 8.0 * np.sin(5.0 * angles)
+    outer = np.column_stack((np.cos(angles), np.sin(angles))) * radii[:, None]
+    hole = np.column_stack((np.cos(-angles), np.sin(-angles))) * 6.0
+    contours = [
+        np.vstack((points, points[:1])) + (40.0, 30.0) for points in (outer, hole)
+    ]
+    index = SegmentIndex.from_contours(contours, tile_size=8)
+
+    origin, shape = (-3.5, 2.0), (60, 90)
+    yy, xx = np.mgrid[0 : shape[0], 0 : shape[1]]
+    points = np.stack((xx + origin[0], yy + origin[1]), axis=-1).reshape(-1, 1, 2)
+    starts = np.vstack([contour[:-1] for contour in contours])
+    deltas = np.vstack([np.diff(contour, axis=0) for contour in contours])
+    t = np.clip(((points - starts) * deltas).sum(-1) / (deltas**2).sum(-1), 0.0, 1.0)
+    expected = ((points - starts - t[..., None] * deltas) ** 2).sum(-1).min(-1)
+    expected = expected.reshape(shape)
+
+    assert np.allclose(index.distance_sq(origin, shape), expected, rtol=1e-5)
+    assert np.allclose(
+        index.distance_sq(origin, shape, max_distance=4.0),
+        np.minimum(expected, 16.0),
+        rtol=1e-5,
+    )
+    winding = index.winding(origin, shape)
+    assert set(np.unique(winding)) == {0, 1}
+    assert winding[28, 44] == 0  # hole
+    assert winding[28, 57] == 1
+    assert winding[0, 0] == 0
+
+
+def test_multi_channel_sdf_keeps_corners_sharp_when_magnified():
+    low, high = 2.3, 9.6
+    square = [(low, low), (high, low), (high, high), (low, high), (low, low)]
+    shape = (12, 12)
+    single = SegmentIndex.from_contours([square]).signed_distance((0, 0), shape)
+    segments = list(zip(square, square[1:]))
+    multi = multi_channel_signed_distance(segments, [4], [True] * 4, (0, 0), shape)
+
+    # Sample both fields eight times denser than they were computed.
+    yy, xx = np.mgrid[0:96, 0:96] / 8.0
+    x, y = xx.ravel(), yy.ravel()
+    exact = (x > low) & (x < high) & (y > low) & (y < high)
+    single_inside = _sample_patches(single.ravel(), x, y, 8.0, 0, 12, 12) < 0
+    multi_inside = _sample_patches(multi.reshape(-1, 3), x, y, 8.0, 0, 12, 12) < 0
+
+    assert np.count_nonzero(single_inside != exact) > 0
+    assert np.count_nonzero(multi_inside != exact) == 0
+
+
 def test_hex_col_supports_short_and_long_alpha_forms():
     assert hex_col("#fff") == (1.0, 1.0, 1.0, 1.0)
     assert hex_col("#fff0") == (1.0, 1.0, 1.0, 0.0)
@@ -110,35 +198,209 @@ def test_glyph_fill_normalizes_255_tuple_colors():
     assert int(pixels[55, 60, 3]) == 0
 
 
-def test_text_renders_multiple_glyphs_from_cached_sdf_patches():
-    font_path = PROJECT_ROOT / "fonts" / "georgia_regular.ttf"
-    _cached_glyph_sdf.cache_clear()
-    scene = text(
-        "ii",
-        size=72,
-        ox=12,
-        oy=12,
-        path=str(font_path),
-        cache_size=96,
-        oversample=2.0,
+def test_font_face_lays_out_lines_with_advances_and_kerning():
+    import pickle
+
+    face = FontFace(PROJECT_ROOT / "fonts" / "georgia_regular.ttf")
+    a, v, x = (int(glyph) for glyph in face.glyph_index([ord("A"), ord("V"), ord("x")]))
+    face.kerning[(a, v)] = -80.0
+    face._index_kerning()
+
+    glyphs, pens = face.layout("AVx\nVA\u4e00", line_height=1.5)
+
+    line = -1.5 * face.units_per_em
+    assert glyphs.tolist() == [a, v, x, v, a, 0]
+    assert np.allclose(
+        pens,
+        [
+            (0.0, 0.0),
+            (face.advances[a] - 80.0, 0.0),
+            (face.advances[a] - 80.0 + face.advances[v], 0.0),
+            (0.0, line),
+            (face.advances[v], line),
+            (face.advances[v] + face.advances[a], line),
+        ],
     )
-
-    with Canvas((160, 96)) as ctx:
-        texture = scene.render(ctx)
-        distances = np.frombuffer(texture.tex.read(), dtype=np.float32).reshape(
-            (96, 160)
+    assert len(face.segments(a, 1.0)[1]) == 2
+    assert len(face.segments(int(face.glyph_index(ord(" "))), 1.0)[0]) == 0
+
+    copy = pickle.loads(pickle.dumps(face))
+    assert np.array_equal(copy.layout("AVx\nVA")[1], face.layout("AVx\nVA")[1])
+    assert np.array_equal(copy.segments(a, 1.0)[0], face.segments(a, 1.0)[0])
+
+
+def test_flatten_contours_keeps_segments_within_the_tolerance():
+    # A circle of radius 100 from eight off-curve points, and a triangle.
+    angles = np.arange(8) * np.pi / 4
+    circle = 100.0 * np.stack((np.cos(angles), np.sin(angles)), axis=-1)
+    circle /= np.cos(np.pi / 8)
+    triangle = [(0.0, 0.0), (50.0, 0.0), (0.0, 50.0)]
+    points = np.concatenate((circle, triangle))
+    on_curve = [False] * 8 + [True] * 3
+
+    segments, ends, corners = flatten_contours(points, on_curve, [8, 11], 0.5)
+    fine, fine_ends, _corners = flatten_contours(points, on_curve, [8, 11], 1e-3)
+
+    assert ends.tolist() == [ends[0], ends[0] + 3]
+    assert corners.tolist() == [False] * ends[0] + [True] * 3
+    assert len(segments) < len(fine) / 4
+    # Fine points on the circle stay within the tolerance of the coarse chords.
+    distance = np.sqrt(
+        SegmentIndex(segments[: ends[0]])
+        ._point_distance_sq(fine[: fine_ends[0], 0].astype(np.float64), slice(None))
+        .min(axis=1)
+    )
+    assert distance.max() <= 0.5
+    with pytest.raises(ValueError):
+        flatten_contours(points, on_curve, [8, 11], 0.0)
+
+
+def test_text_renders_glyphs_from_an_atlas_stored_on_disk():
+    font_path = str(PROJECT_ROOT / "fonts" / "georgia_regular.ttf")
+    _font_atlas.cache_clear()
+
+    def scene():
+        return text(
+            "ii",
+            size=72,
+            ox=12,
+            oy=12,
+            path=font_path,
+            cache_size=96,
+            oversample=2.0,
         )
 
-    cache_info = _cached_glyph_sdf.cache_info()
+    with Canvas((160, 96)) as ctx:
+        texture = scene().render(ctx)
+        dispatches = dict(ctx.last_render_stats.shader_dispatches_by_name)
+        distances = np.frombuffer(texture.tex.read(), dtype=np.float32)
+        ctx.cpu_compositing = True
+        cpu = scene().render(ctx)
+        reference = np.frombuffer(cpu.tex.read(), dtype=np.float32)
+
+    atlas = _font_atlas(font_path, 0.1, 144)
+    glyph_i = int(font_face(font_path).glyph_index(ord("i")))
     assert texture.kind == "sdf"
-    assert cache_info.hits == 1
-    assert cache_info.misses == 1
+    assert dispatches == {"text": 1}
+    assert list(atlas._glyphs) == [glyph_i]
     assert distances.min() < 0
+    assert np.allclose(distances, reference, atol=1e-3)
+
+    # Another process loads the glyphs instead of rasterizing them again.
+    _font_atlas.cache_clear()
+    reloaded = _font_atlas(font_path, 0.1, 144)
+    assert glyph_i in reloaded
+    assert np.array_equal(reloaded.patch(glyph_i), atlas.patch(glyph_i))
+
+
+def test_font_atlases_prune_old_formats_and_the_oldest_files(
+    font_atlas_directory, monkeypatch
+):
+    import os
+
+    from sdf_ui.core.fonts import _atlas_directory
+
+    font_atlas_directory.mkdir()
+    stale = font_atlas_directory / f"{'0' * 24}-128-16.npz"
+    oldest = font_atlas_directory / f"v1-{'1' * 24}-128-0.1.npz"
+    unrelated = font_atlas_directory / "notes.npz"
+    for index, path in enumerate((stale, oldest, unrelated)):
+        path.write_bytes(bytes(4096))
+        os.utime(path, (index, index))
+
+    monkeypatch.setattr(FontAtlas, "max_bytes", 4096)
+    atlas = FontAtlas(f"v1-{'2' * 24}-128-0.1", 1.0, width=8)
+    atlas.add(7, np.ones((4, 4), dtype=np.float32), (0.0, 0.0))
+    atlas.save()
+
+    assert sorted(path.name for path in font_atlas_directory.iterdir()) == [
+        "notes.npz",
+        f"{atlas.key}.npz",
+    ]
+
+    monkeypatch.setenv("SDF_UI_FONT_CACHE", str(font_atlas_directory))
+    assert _atlas_directory() == font_atlas_directory
+    monkeypatch.setenv("SDF_UI_FONT_CACHE", "")
+    assert _atlas_directory() is None
+
+
+def test_msdf_text_renders_from_a_small_multi_channel_atlas(font_atlas_directory):
+    font_path = str(PROJECT_ROOT / "fonts" / "georgia_regular.ttf")
+    _font_atlas.cache_clear()
+
+    def scene(**kwargs):
+        return text("AV", size=96, ox=8, oy=16, path=font_path, **kwargs)
+
+    with Canvas((160, 112)) as ctx:
+        texture = scene(cache_size=32, msdf=True).render(ctx)
+        dispatches = dict(ctx.last_render_stats.shader_dispatches_by_name)
+        distances = np.frombuffer(texture.tex.read(), dtype=np.float32)
+        ctx.cpu_compositing = True
+        cpu = scene(cache_size=32, msdf=True).render(ctx)
+        reference = np.frombuffer(cpu.tex.read(), dtype=np.float32)
+        single = scene(cache_size=96, oversample=1.0).render(ctx)
+        single_channel = np.frombuffer(single.tex.read(), dtype=np.float32)
+
+    atlas = _font_atlas(font_path, 0.1, 32, True)
+    assert dispatches == {"text": 1}
+    assert atlas.channels == 3
+    assert atlas.field.shape[2] == 3
+    assert atlas.field.shape[0] < 32
+    assert len(list(font_atlas_directory.glob("*-3ch.npz"))) == 1
+    assert np.allclose(distances, reference, atol=1e-3)
+    away_from_edges = np.abs(single_channel) > 0.5
+    mismatch = (distances < 0) != (single_channel < 0)
+    assert np.count_nonzero(mismatch & away_from_edges) < 0.01 * np.sum(
+        single_channel < 0
+    )
+
+
+def test_glyph_and_text_only_render_the_band_around_the_glyphs():
+    font_path = str(PROJECT_ROOT / "fonts" / "georgia_regular.ttf")
+    scenes = {
+        "glyph": glyph("o", 0.02, 40, 40, path=font_path, band=6.0),
+        "text": text("oo", size=24, ox=40, oy=40, path=font_path, band=6.0),
+    }
+
+    with Canvas((400, 300)) as ctx:
+        for name, scene in scenes.items():
+            texture = scene.render(ctx)
+            distances = np.frombuffer(texture.tex.read(), dtype=np.float32)
+            distances = distances.reshape((300, 400))
+
+            assert distances.min() < 0, name
+            assert distances.max() == 6.0, name
+            assert np.all(distances[:, 120:] == 6.0), name
+            assert np.all(distances[90:] == 6.0), name
+
+
+def test_glyph_and_text_still_accept_the_deprecated_samples_keyword():
+    from sdf_ui import sdf
+
+    font_path = str(PROJECT_ROOT / "fonts" / "georgia_regular.ttf")
+    with pytest.warns(DeprecationWarning, match="samples") as warned:
+        scenes = (
+            glyph("o", 0.02, 40, 40, path=font_path, samples=16),
+            text("oo", size=24, ox=40, oy=40, path=font_path, samples=16),
+            sdf.text("oo", size=24, ox=40, oy=40, path=font_path, samples=16),
+        )
+    assert [warning.filename for warning in warned] == [__file__] * 3
+    expected = (
+        glyph("o", 0.02, 40, 40, path=font_path),
+        text("oo", size=24, ox=40, oy=40, path=font_path),
+        text("oo", size=24, ox=40, oy=40, path=font_path),
+    )
+
+    with Canvas((128, 96)) as ctx:
+        for scene, reference in zip(scenes, expected):
+            assert "samples" not in scene.params
+            assert scene.render(ctx).tex.read() == reference.render(ctx).tex.read()
 
 
-def test_text_cache_uses_effective_render_size_buckets():
+def test_text_cache_uses_effective_render_size_buckets(tmp_path, monkeypatch):
+    monkeypatch.setattr(FontAtlas, "directory", tmp_path)
     font_path = PROJECT_ROOT / "fonts" / "georgia_regular.ttf"
-    _cached_glyph_sdf.cache_clear()
+    _font_atlas.cache_clear()
 
     small = text(
         "i",
@@ -166,9 +428,10 @@ def test_text_cache_uses_effective_render_size_buckets():
         large.render(ctx)
         small.render(ctx)
 
-    cache_info = _cached_glyph_sdf.cache_info()
+    cache_info = _font_atlas.cache_info()
     assert cache_info.hits == 1
     assert cache_info.misses == 2
+    assert len(list(tmp_path.glob("*.npz"))) == 2
     assert _glyph_cache_size(24, 2.0, 128) == 128
     assert _glyph_cache_size(48, 2.0, 128) == 128
     assert _glyph_cache_size(96, 2.0, 128) == 192